@@ -0,0 +1,424 @@
+"""Performance benchmarks for vcut on synthetic, locally generated media.
+
+    python benchmarks/bench.py                       # everything -> results/<commit>.json
+    python benchmarks/bench.py --suite parse --quick
+    python benchmarks/bench.py --compare results/abc1234.json --threshold 0.15
+
+Inputs are generated with ffmpeg's lavfi sources (testsrc2 and sine) and
+seeded random data, and cached in benchmarks/.media, so two runs on the
+same machine time the same work. Each case is timed --repeat times; the
+median is what gets compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from vcut.audio import SAMPLE_RATE, WINDOW_SECONDS, probe_duration, stream_audio  # noqa: E402
+from vcut.editor import parse_edited_file  # noqa: E402
+from vcut.keyframes import load_index  # noqa: E402
+from vcut.render import render, render_single_pass  # noqa: E402
+from vcut.transcribe import format_timestamp, load_model, merge_words_into_chunks, transcribe  # noqa: E402
+
+BENCH_DIR = Path(__file__).resolve().parent
+MEDIA_DIR = BENCH_DIR / ".media"
+RESULTS_DIR = BENCH_DIR / "results"
+RESULTS_VERSION = 1
+SEED = 1234
+
+# (duration seconds, frame size, keyframe interval seconds)
+VIDEOS = [
+    (60, "640x360", 2),
+    (60, "1280x720", 2),
+    (300, "1280x720", 5),
+]
+QUICK_VIDEOS = VIDEOS[:1]
+# Long, high-bitrate inputs where disk traffic dominates stream copy (--large)
+LARGE_VIDEOS = [(1800, "1920x1080", 2)]
+RENDER_MODES = ["copy", "single-pass", "smart", "reencode"]
+SEGMENT_COUNTS = [10, 50]
+LARGE_SEGMENT_COUNTS = [50, 200]
+QUICK_SEGMENT_COUNTS = [10]
+TRANSCRIPT_LINES = [100_000, 1_000_000]
+QUICK_TRANSCRIPT_LINES = [100_000]
+WORD_COUNTS = [100_000, 1_000_000]
+QUICK_WORD_COUNTS = [100_000]
+# Hours of synthetic speech (about 2.5 words per second) for the memory suite
+MEMORY_HOURS = [1, 10]
+QUICK_MEMORY_HOURS = [1]
+# Sequential vs --batch-size transcription of a synthetic speech clip
+SPEECH_SECONDS = 600
+QUICK_SPEECH_SECONDS = 120
+TRANSCRIBE_MODEL = "base.en"
+QUICK_TRANSCRIBE_MODEL = "tiny.en"
+BATCH_SIZES = [8, 16]
+QUICK_BATCH_SIZES = [8]
+SPEECH_TEXT = (
+    "Welcome back to the workshop. Today we are going to trim a long recording down to the parts "
+    "that matter. First we transcribe the video, then we delete the lines we do not want, and "
+    "finally we render the result. Cutting on keyframes keeps the render fast, while re-encoding "
+    "gives frame accurate edits at the cost of time."
+)
+
+
+def generate_video(duration: int, size: str, gop: int) -> Path:
+    """H.264/AAC test video, generated once and kept in MEDIA_DIR."""
+    path = MEDIA_DIR / f"testsrc2_{duration}s_{size}_gop{gop}.mp4"
+    if path.is_file():
+        return path
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    rate = 30
+    tmp = path.with_name(path.name + ".tmp.mp4")
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-f", "lavfi", "-i", f"testsrc2=duration={duration}:size={size}:rate={rate}",
+            "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+            "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p",
+            "-g", str(gop * rate), "-keyint_min", str(gop * rate), "-sc_threshold", "0",
+            "-c:a", "aac", "-shortest", "-fflags", "+bitexact", "-flags", "+bitexact",
+            str(tmp),
+        ],
+        check=True,
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def generate_speech(duration: int) -> Path | None:
+    """Mono 16 kHz speech from ffmpeg's flite source, repeated with pauses to fill duration.
+
+    None if this ffmpeg is built without libflite.
+    """
+    path = MEDIA_DIR / f"speech_{duration}s.wav"
+    if path.is_file():
+        return path
+    filters = subprocess.run(["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True).stdout
+    if " flite " not in filters:
+        return None
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    text = MEDIA_DIR / "speech.txt"
+    text.write_text(SPEECH_TEXT + "\n")
+    tmp = path.with_name(path.name + ".tmp.wav")
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-f", "lavfi", "-i", f"flite=textfile={text}:voice=slt",
+            "-af", f"apad=pad_dur=1.5,aloop=loop=-1:size=2e9,atrim=duration={duration}",
+            "-ac", "1", "-ar", str(SAMPLE_RATE), "-fflags", "+bitexact", "-flags", "+bitexact",
+            str(tmp),
+        ],
+        check=True,
+    )
+    os.replace(tmp, path)
+    return path
+
+
+def random_segments(duration: float, count: int, seed: int = SEED) -> list[tuple[float, float]]:
+    """count non-overlapping segments of 0.5-3s spread over duration."""
+    rng = random.Random(seed)
+    slot = duration / count
+    segments = []
+    for i in range(count):
+        length = rng.uniform(0.5, min(3.0, slot * 0.8))
+        start = i * slot + rng.uniform(0, slot - length)
+        segments.append((round(start, 3), round(start + length, 3)))
+    return segments
+
+
+def generate_transcript(lines: int) -> Path:
+    """A cut list of lines consecutive 3s lines with short random text."""
+    path = MEDIA_DIR / f"transcript_{lines}.txt"
+    if path.is_file():
+        return path
+    MEDIA_DIR.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(SEED)
+    vocabulary = ["the", "video", "cut", "frame", "so", "and", "we", "edit", "this", "transcript"]
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w") as f:
+        for i in range(lines):
+            text = " ".join(rng.choices(vocabulary, k=8))
+            f.write(f"[{format_timestamp(i * 3.0)} -> {format_timestamp(i * 3.0 + 3.0)}] | {text}\n")
+    os.replace(tmp, path)
+    return path
+
+
+def synthetic_segments(words: int, seed: int = SEED) -> list[SimpleNamespace]:
+    """faster-whisper style segments of 20 words with realistic timings."""
+    rng = random.Random(seed)
+    segments, t = [], 0.0
+    for first in range(0, words, 20):
+        seg_words = []
+        for _ in range(min(20, words - first)):
+            length = rng.uniform(0.1, 0.6)
+            seg_words.append(SimpleNamespace(start=t, end=t + length, word=" word"))
+            t += length + rng.uniform(0.0, 0.3)
+        segments.append(SimpleNamespace(words=seg_words))
+    return segments
+
+
+class SyntheticModel:
+    """Stands in for a WhisperModel: each window lazily yields 20-word segments."""
+
+    def __init__(self, seed: int = SEED):
+        self.rng = random.Random(seed)
+
+    def transcribe(self, samples, **kwargs):
+        seconds = len(samples) / SAMPLE_RATE
+        return self._segments(seconds), SimpleNamespace(language="en", duration=seconds)
+
+    def _segments(self, seconds: float):
+        t = 0.0
+        while True:
+            words = []
+            for _ in range(20):
+                length = self.rng.uniform(0.1, 0.6)
+                if t + length > seconds:
+                    break
+                words.append(SimpleNamespace(start=t, end=t + length, word=" word"))
+                t += length + self.rng.uniform(0.0, 0.2)
+            if not words:
+                return
+            yield SimpleNamespace(start=words[0].start, end=words[-1].end, text=" word" * len(words), words=words)
+
+
+def silent_windows(hours: float, samples: np.ndarray):
+    """stream_audio-style windows covering hours, all sharing one sample buffer."""
+    for i in range(int(hours * 3600 / WINDOW_SECONDS)):
+        yield i * WINDOW_SECONDS, samples
+
+
+def time_case(fn, repeat: int, setup=None) -> dict:
+    runs = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        started = time.perf_counter()
+        fn(state)
+        runs.append(time.perf_counter() - started)
+    return {"median": statistics.median(runs), "min": min(runs), "runs": runs}
+
+
+def bench_render(results: dict, repeat: int, quick: bool, large: bool = False) -> None:
+    if large:
+        videos, counts, modes = LARGE_VIDEOS, LARGE_SEGMENT_COUNTS, ["copy", "single-pass"]
+    elif quick:
+        videos, counts, modes = QUICK_VIDEOS, QUICK_SEGMENT_COUNTS, RENDER_MODES
+    else:
+        videos, counts, modes = VIDEOS, SEGMENT_COUNTS, RENDER_MODES
+    for duration, size, gop in videos:
+        video = generate_video(duration, size, gop)
+        index = load_index(video)
+        for count in counts:
+            segments = random_segments(duration, count)
+            for mode in modes:
+                name = f"render/{mode}/{duration}s-{size}-gop{gop}/{count}seg"
+
+                def run(tmp_dir, mode=mode, segments=segments):
+                    try:
+                        if mode == "single-pass":
+                            render_single_pass(video, segments, tmp_dir / "out.mp4", tmp_dir, index)
+                        else:
+                            render(
+                                video, segments, tmp_dir / "out.mp4", tmp_dir,
+                                reencode=mode == "reencode", smart=mode == "smart", index=index,
+                            )
+                    finally:
+                        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+                results[name] = time_case(run, repeat, lambda: Path(tempfile.mkdtemp(prefix="vcut_bench_")))
+                results[name]["params"] = {
+                    "mode": mode, "duration": duration, "size": size, "gop": gop, "segments": count,
+                }
+                report(name, results[name])
+        index.close()
+
+
+def bench_parse(results: dict, repeat: int, quick: bool, large: bool = False) -> None:
+    for lines in QUICK_TRANSCRIPT_LINES if quick else TRANSCRIPT_LINES:
+        path = generate_transcript(lines)
+        name = f"parse_edited_file/{lines}lines"
+        results[name] = time_case(lambda _: parse_edited_file(path), repeat)
+        results[name]["params"] = {"lines": lines}
+        report(name, results[name])
+
+
+def bench_chunk(results: dict, repeat: int, quick: bool, large: bool = False) -> None:
+    for words in QUICK_WORD_COUNTS if quick else WORD_COUNTS:
+        segments = synthetic_segments(words)
+        name = f"merge_words_into_chunks/{words}words"
+        results[name] = time_case(lambda _: merge_words_into_chunks(segments, 3.0), repeat)
+        results[name]["params"] = {"words": words, "chunk_size": 3.0}
+        report(name, results[name])
+
+
+def bench_memory(results: dict, repeat: int, quick: bool, large: bool = False) -> None:
+    """Peak Python heap of transcribe() with word chunking and the word sidecar."""
+    samples = np.zeros(int(WINDOW_SECONDS * SAMPLE_RATE), dtype=np.float32)
+    for hours in QUICK_MEMORY_HOURS if quick else MEMORY_HOURS:
+        name = f"transcribe_memory/{hours}h"
+        peaks = []
+
+        def run(tmp_dir, hours=hours):
+            tracemalloc.start()
+            try:
+                transcribe(
+                    silent_windows(hours, samples), "synthetic", "en", chunk_size=3.0, model=SyntheticModel(),
+                    show_progress=False, words_path=tmp_dir / "bench.words.npz",
+                )
+                peaks.append(tracemalloc.get_traced_memory()[1])
+            finally:
+                tracemalloc.stop()
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        results[name] = time_case(run, repeat, lambda: Path(tempfile.mkdtemp(prefix="vcut_bench_")))
+        results[name]["peak_bytes"] = max(peaks)
+        results[name]["params"] = {"hours": hours, "chunk_size": 3.0}
+        report(name, results[name])
+
+
+def bench_transcribe(results: dict, repeat: int, quick: bool, large: bool = False) -> None:
+    """transcribe() on a speech clip: sequential, then through the batched pipeline."""
+    duration = QUICK_SPEECH_SECONDS if quick else SPEECH_SECONDS
+    model_name = QUICK_TRANSCRIBE_MODEL if quick else TRANSCRIBE_MODEL
+    clip = generate_speech(duration)
+    if clip is None:
+        print("transcribe: skipped (ffmpeg built without libflite)", flush=True)
+        return
+    try:
+        model = load_model(model_name)
+    except Exception as e:
+        print(f"transcribe: skipped (cannot load {model_name}: {e})", flush=True)
+        return
+    seconds = probe_duration(clip)
+    sequential = None
+    for batch_size in [None, *(QUICK_BATCH_SIZES if quick else BATCH_SIZES)]:
+        mode = f"batch{batch_size}" if batch_size else "sequential"
+        name = f"transcribe/{mode}/{model_name}/{duration}s"
+
+        def run(_, batch_size=batch_size):
+            # The audio cache is bypassed so every run decodes, as a first transcription would
+            transcribe(
+                stream_audio(clip), model_name, "en", 3.0, seconds, model=model,
+                show_progress=False, batch_size=batch_size,
+            )
+
+        results[name] = time_case(run, repeat)
+        results[name]["params"] = {"model": model_name, "seconds": duration, "batch_size": batch_size}
+        report(name, results[name])
+        if sequential is None:
+            sequential = results[name]["median"]
+        else:
+            print(f"{'':<55} {sequential / results[name]['median']:.2f}x sequential", flush=True)
+
+
+SUITES = {
+    "render": bench_render,
+    "parse": bench_parse,
+    "chunk": bench_chunk,
+    "memory": bench_memory,
+    "transcribe": bench_transcribe,
+}
+
+
+def report(name: str, result: dict) -> None:
+    peak = f"   peak {result['peak_bytes'] / 2**20:7.1f} MiB" if "peak_bytes" in result else ""
+    print(f"{name:<55} median {result['median'] * 1000:9.1f} ms   min {result['min'] * 1000:9.1f} ms{peak}", flush=True)
+
+
+def git_commit() -> str | None:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True, text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def environment() -> dict:
+    ffmpeg = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True).stdout.splitlines()
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "ffmpeg": ffmpeg[0] if ffmpeg else None,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Cases whose median time or peak memory grew past baseline by more than threshold (a fraction)."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        change = result["median"] / before["median"] - 1
+        line = f"{name:<55} {before['median'] * 1000:9.1f} -> {result['median'] * 1000:9.1f} ms  {change:+7.1%}"
+        print(line)
+        if change > threshold:
+            regressions.append(line)
+        if "peak_bytes" in result and "peak_bytes" in before:
+            change = result["peak_bytes"] / before["peak_bytes"] - 1
+            line = (
+                f"{name + ' (peak)':<55} {before['peak_bytes'] / 2**20:9.1f} -> "
+                f"{result['peak_bytes'] / 2**20:9.1f} MiB {change:+7.1%}"
+            )
+            print(line)
+            if change > threshold:
+                regressions.append(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suite", action="append", choices=list(SUITES), help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--quick", action="store_true", help="Smallest inputs only")
+    parser.add_argument("--large", action="store_true", help="Render suite: stream copy vs single pass on a 30-minute 1080p input")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (default: 3)")
+    parser.add_argument("-o", "--output", help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="FILE", help="Baseline results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown as a fraction (default: 0.10)")
+    args = parser.parse_args()
+
+    if not shutil.which("ffmpeg") and (not args.suite or {"render", "transcribe"} & set(args.suite)):
+        sys.exit("ffmpeg not found on $PATH (needed for the render and transcribe suites)")
+
+    results = {}
+    for suite in args.suite or list(SUITES):
+        SUITES[suite](results, args.repeat, args.quick, args.large)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{git_commit() or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(
+        {"version": RESULTS_VERSION, "environment": environment(), "results": results}, indent=2,
+    ) + "\n")
+    print(f"Results saved: {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if baseline.get("version") != RESULTS_VERSION:
+            sys.exit(f"{args.compare}: unsupported results version")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} cases slower than {args.compare} by more than {args.threshold:.0%}:")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+from vcut import trace
+from vcut.cache import FileCache, cache_key
+from vcut.fingerprint import content_hash
+
+SAMPLE_RATE = 16000
+# Target length of each window handed to Whisper. Memory use is bounded by a
+# few windows regardless of recording length.
+WINDOW_SECONDS = 600.0
+# Windows end at the quietest point within this distance of the target
+# length, so a cut rarely lands inside a word.
+SPLIT_SEARCH_SECONDS = 10.0
+# Loudness is measured over frames of this length when looking for silence.
+FRAME_SECONDS = 0.02
+# Decoded windows buffered ahead of the consumer.
+PREFETCH_WINDOWS = 2
+# Shortest window used when splitting a recording across workers.
+MIN_PARALLEL_WINDOW_SECONDS = 60.0
+
+
+def window_for_workers(duration: float | None, workers: int) -> float:
+    """Window length giving each worker about two windows of a recording."""
+    if not duration or workers <= 1:
+        return WINDOW_SECONDS
+    return max(MIN_PARALLEL_WINDOW_SECONDS, min(WINDOW_SECONDS, duration / (2 * workers)))
+
+
+def probe_duration(video_path: Path) -> float | None:
+    """Container duration in seconds, or None if ffprobe cannot tell."""
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "csv=p=0",
+            str(video_path),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
+
+
+def pcm_to_float(data: bytes) -> np.ndarray:
+    """Convert s16le PCM bytes to float32 samples in [-1, 1)."""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def quiet_split(samples: np.ndarray, lo: int, hi: int) -> int:
+    """Index in samples[lo:hi] at the centre of the quietest frame."""
+    frame = int(SAMPLE_RATE * FRAME_SECONDS)
+    n_frames = (hi - lo) // frame
+    if n_frames == 0:
+        return hi
+    frames = samples[lo:lo + n_frames * frame].reshape(n_frames, frame)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    return lo + int(np.argmin(energy)) * frame + frame // 2
+
+
+def audio_cache_key(video_path: Path) -> str:
+    return cache_key("audio", content_hash(video_path), SAMPLE_RATE, "s16le")
+
+
+class _Tee:
+    """Read from stream, copying everything read to sink."""
+
+    def __init__(self, stream, sink):
+        self.stream = stream
+        self.sink = sink
+
+    def read(self, n: int) -> bytes:
+        data = self.stream.read(n)
+        self.sink.write(data)
+        return data
+
+
+def _read_exact(stream, n: int) -> bytes:
+    chunks = []
+    while n > 0:
+        chunk = stream.read(n)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        n -= len(chunk)
+    return b"".join(chunks)
+
+
+def _read_windows(stream, out: queue.Queue, window: int, search: int, stop: threading.Event) -> None:
+    try:
+        pending = np.empty(0, dtype=np.float32)
+        consumed = 0
+        while not stop.is_set():
+            with trace.span("decode audio", "transcribe") as info:
+                data = _read_exact(stream, (window + search - len(pending)) * 2)
+                pending = np.concatenate([pending, pcm_to_float(data)])
+                info["bytes"] = len(data)
+            if len(pending) < window + search:
+                if len(pending):
+                    out.put((consumed, pending))
+                break
+            cut = quiet_split(pending, window - search, window + search)
+            out.put((consumed, pending[:cut].copy()))
+            consumed += cut
+            pending = pending[cut:]
+        out.put(None)
+    except BaseException as e:
+        out.put(e)
+
+
+def _cached_windows(
+    path: Path, start: float, window_seconds: float,
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Windows of cached PCM, split exactly as ``_read_windows`` splits a decode."""
+    pcm = np.memmap(path, dtype="<i2", mode="r") if path.stat().st_size else np.empty(0, dtype="<i2")
+    window = int(window_seconds * SAMPLE_RATE)
+    search = int(min(SPLIT_SEARCH_SECONDS, window_seconds / 4) * SAMPLE_RATE)
+    first = min(round(start * SAMPLE_RATE), len(pcm))
+    pos = first
+    while pos < len(pcm):
+        pending = pcm[pos:pos + window + search].astype(np.float32) / 32768.0
+        if len(pending) < window + search:
+            yield start + (pos - first) / SAMPLE_RATE, pending
+            break
+        cut = quiet_split(pending, window - search, window + search)
+        yield start + (pos - first) / SAMPLE_RATE, pending[:cut].copy()
+        pos += cut
+
+
+def stream_audio(
+    video_path: Path,
+    start: float = 0.0,
+    window_seconds: float = WINDOW_SECONDS,
+    cache: FileCache | None = None,
+) -> Iterator[tuple[float, np.ndarray]]:
+    """Decode a video's audio as 16 kHz mono float32 windows.
+
+    ffmpeg writes raw s16le to a pipe, so no intermediate file is created.
+    Decoding starts as soon as this is called and runs in a background
+    thread, a few windows ahead of the consumer. Yields ``(offset, samples)``
+    where offset is the window's start time in the source, in seconds.
+    Decoding starts at ``start`` seconds.
+
+    With a ``cache`` (see ``vcut.cache.audio_cache``), audio decoded before
+    is memory-mapped from the cache instead of being decoded again, and a
+    complete decode from the start is saved there for next time.
+    """
+    key = None
+    if cache is not None:
+        key = audio_cache_key(video_path)
+        cached = cache.get(key)
+        if cached is not None:
+            return _cached_windows(cached, start, window_seconds)
+
+    cmd = ["ffmpeg", "-v", "error", "-nostdin"]
+    if start > 0:
+        cmd += ["-ss", str(start)]
+    cmd += [
+        "-i", str(video_path),
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "s16le", "pipe:1",
+    ]
+    return _Decode(cmd, start, window_seconds, cache, key)
+
+
+class _Decode:
+    """Windows of a running ffmpeg decode, read a few ahead on a thread.
+
+    Exhausting, closing or dropping it stops ffmpeg and the reader and
+    settles the cache temp file, whether or not iteration ever began.
+    """
+
+    def __init__(self, cmd, start, window_seconds, cache=None, key=None):
+        self.cmd = cmd
+        self.start = start
+        self.cache = cache
+        self.key = key
+        self.sink = self.proc = self.reader = None
+        self._done = False
+        self.windows = queue.Queue(maxsize=PREFETCH_WINDOWS)
+        self.stop = threading.Event()
+        try:
+            if cache is not None and start == 0:
+                cache.root.mkdir(parents=True, exist_ok=True)
+                self.sink = tempfile.NamedTemporaryFile(dir=cache.root, suffix=".pcm.part", delete=False)
+            self.proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.reader = threading.Thread(
+                target=_read_windows,
+                args=(
+                    _Tee(self.proc.stdout, self.sink) if self.sink else self.proc.stdout, self.windows,
+                    int(window_seconds * SAMPLE_RATE),
+                    int(min(SPLIT_SEARCH_SECONDS, window_seconds / 4) * SAMPLE_RATE),
+                    self.stop,
+                ),
+                daemon=True,
+            )
+            self.reader.start()
+        except BaseException:
+            self._finish(complete=False)
+            raise
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> tuple[float, np.ndarray]:
+        if self._done:
+            raise StopIteration
+        try:
+            item = self.windows.get()
+            if item is None:
+                stderr = self.proc.stderr.read()
+                if self.proc.wait() != 0:
+                    raise subprocess.CalledProcessError(self.proc.returncode, self.cmd, stderr=stderr)
+            elif isinstance(item, BaseException):
+                raise item
+        except BaseException:
+            self._finish(complete=False)
+            raise
+        if item is None:
+            self._finish(complete=True)
+            raise StopIteration
+        consumed, samples = item
+        return self.start + consumed / SAMPLE_RATE, samples
+
+    def close(self) -> None:
+        """Stop decoding; a decode cut short is not cached."""
+        self._finish(complete=False)
+
+    def __del__(self):
+        self.close()
+
+    def _finish(self, complete: bool) -> None:
+        if self._done:
+            return
+        self._done = True
+        self.stop.set()
+        if self.proc is not None:
+            if self.proc.poll() is None:
+                self.proc.kill()
+            # Unblock the reader if it is waiting on a full queue.
+            while self.reader is not None and self.reader.is_alive():
+                try:
+                    self.windows.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self.proc.wait()
+            for stream in (self.proc.stdout, self.proc.stderr):
+                stream.close()
+        if self.sink is not None:
+            _store(self.cache, self.key, self.sink, complete)
+
+
+def _store(cache: FileCache, key: str, sink, complete: bool) -> None:
+    """Move a finished decode into the cache; discard an interrupted one."""
+    sink.close()
+    if complete:
+        cache.put(key, Path(sink.name))
+        cache.prune()
+    else:
+        os.unlink(sink.name)
@@ -0,0 +1,141 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+# Default size cap for each on-disk cache.
+DEFAULT_MAX_BYTES = 10 * 1024**3
+
+# Temp files of writes still in progress (``*.part*`` in a cache's root)
+# untouched for this long were left by a crashed or killed process.
+STALE_PART_SECONDS = 24 * 3600
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def cache_root() -> Path:
+    """Directory holding vcut's caches: $VCUT_CACHE_DIR, else the XDG cache dir."""
+    if os.environ.get("VCUT_CACHE_DIR"):
+        return Path(os.environ["VCUT_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "vcut"
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count such as ``500M`` or ``10G``."""
+    value = text.strip().upper().removesuffix("B").removesuffix("I")
+    unit = value[-1:] if value[-1:] in SIZE_UNITS else ""
+    try:
+        number = float(value[: len(value) - len(unit)])
+    except ValueError:
+        raise ValueError(f"Invalid size '{text}' (expected e.g. 500M or 10G)") from None
+    return int(number * SIZE_UNITS[unit])
+
+
+def format_size(n: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TiB"
+
+
+def cache_key(*parts) -> str:
+    """Stable hex key for any JSON-serialisable description of an artifact."""
+    return hashlib.sha256(json.dumps(parts, separators=(",", ":")).encode()).hexdigest()
+
+
+class FileCache:
+    """Content-addressed files on disk with a size cap and LRU eviction.
+
+    Entries are stored as ``<root>/<key[:2]>/<key><suffix>``. Reading an
+    entry refreshes its mtime, which is what eviction orders by.
+    """
+
+    def __init__(self, root: Path, suffix: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Path | None:
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, src: Path) -> Path:
+        """Move src into the cache under key and return its cached path."""
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+        shutil.move(src, tmp)
+        os.replace(tmp, path)
+        return path
+
+    def entries(self) -> list[tuple[Path, os.stat_result]]:
+        entries = []
+        for path in self.root.glob(f"*/*{self.suffix}"):
+            try:
+                entries.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def stats(self) -> tuple[int, int]:
+        """Return (entry count, total bytes)."""
+        entries = self.entries()
+        return len(entries), sum(st.st_size for _, st in entries)
+
+    def prune(self, max_bytes: int | None = None) -> tuple[int, int]:
+        """Evict least recently used entries until the cache fits max_bytes.
+
+        Stale temp files of unfinished writes are removed too. Returns
+        (files removed, bytes freed).
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        removed, freed = self._sweep_parts()
+        entries = sorted(self.entries(), key=lambda e: e[1].st_mtime)
+        total = sum(st.st_size for _, st in entries)
+        for path, st in entries:
+            if total <= limit:
+                break
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+            removed += 1
+            freed += st.st_size
+        return removed, freed
+
+    def _sweep_parts(self) -> tuple[int, int]:
+        removed = freed = 0
+        cutoff = time.time() - STALE_PART_SECONDS
+        for path in self.root.glob("*.part*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if st.st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+                removed += 1
+                freed += st.st_size
+        return removed, freed
+
+
+def segment_cache() -> FileCache:
+    return FileCache(cache_root() / "segments", ".mp4")
+
+
+def audio_cache() -> FileCache:
+    """Decoded audio as raw 16 kHz mono s16le, memory-mapped when read."""
+    return FileCache(cache_root() / "audio", ".pcm")
+
+
+def proxy_cache() -> FileCache:
+    return FileCache(cache_root() / "proxies", ".mp4")
@@ -1,14 +1,36 @@
 import argparse
+import os
 import shutil
+import sqlite3
+import subprocess
 import sys
 import tempfile
+import time
+from contextlib import closing
 from pathlib import Path
 
 from rich.console import Console
+from rich.markup import escape
+from rich.table import Table
 
-from vcut.transcribe import extract_audio, transcribe, segments_to_text
+from vcut.transcribe import (
+    Journal, format_timestamp, journal_path_for, load_model, transcribe, transcribe_parallel, worker_pool,
+    segments_to_text,
+)
+from vcut.audio import WINDOW_SECONDS, probe_duration, stream_audio, window_for_workers
+from vcut.cache import FileCache, audio_cache, cache_root, format_size, parse_size, proxy_cache, segment_cache
 from vcut.editor import open_editor, parse_edited_file
-from vcut.render import render
+from vcut.jobs import DEFAULT_SLOTS, JOB_KINDS, Worker, add_job, kind_stats, list_jobs, open_queue, queue_path
+from vcut.keyframes import KEYFRAME_EPSILON, index_path_for, load_index, read_index
+from vcut.planner import plan_render
+from vcut.preview import DEFAULT_PORT, Timeline, serve_preview
+from vcut.proxy import PROXY_HEIGHT, find_proxy, make_proxy
+from vcut.render import RenderCancelled, render, render_single_pass
+from vcut.search import find_transcripts, hits_to_segments, index_path, index_transcript, open_index, prune_missing, search
+from vcut.server import DEFAULT_MAX_MODELS, is_running, remote_transcribe, serve, serve_in_background, socket_path
+from vcut import trace
+from vcut.watch import Watcher, diff_segments
+from vcut.words import WordTable, words_path_for
 
 console = Console()
 
@@ -26,6 +48,149 @@ def transcript_path_for(video_path: Path) -> Path:
     return video_path.with_suffix(".txt")
 
 
+def render_mode_name(args) -> str:
+    if args.smart:
+        return "smart cut"
+    if args.single_pass:
+        return "single-pass stream copy"
+    return "re-encode" if args.reencode else "stream copy"
+
+
+def load_keyframe_index(input_path: Path):
+    with trace.span("read keyframe index", "render"):
+        index = read_index(index_path_for(input_path), input_path)
+    if index is None:
+        console.print("[bold]Indexing keyframes...[/] [dim](once per video)[/]")
+        index = load_index(input_path)
+    return index
+
+
+def print_copy_drift(index, segments):
+    drift = index.copy_drift([seg[:2] for seg in segments if len(seg) == 2])
+    moved = [d for d in drift if d > KEYFRAME_EPSILON]
+    if moved:
+        console.print(
+            f"[dim]Stream copy moved {len(moved)} of {len(drift)} cuts back to keyframes "
+            f"(max {max(moved):.2f}s, mean {sum(moved) / len(moved):.2f}s). "
+            f"Use --smart for exact cuts.[/]"
+        )
+
+
+def print_plan(plan):
+    for seg in plan.segments:
+        source = f" {escape(str(seg.source))}" if seg.source is not None else ""
+        notes = f"  [dim]{'; '.join(seg.notes)}[/]" if seg.notes else ""
+        console.print(f"[{format_timestamp(seg.start)} -> {format_timestamp(seg.end)}]{source}{notes}", highlight=False)
+    for seg in plan.dropped:
+        console.print(
+            f"[yellow]dropped[/] [{format_timestamp(seg.start)} -> {format_timestamp(seg.end)}] "
+            f"[dim]({seg.end - seg.start:.2f}s)[/]",
+            highlight=False,
+        )
+    dropped = sum(seg.end - seg.start for seg in plan.dropped)
+    console.print(
+        f"[bold]{len(plan.segments)} segments, {plan.runs} ffmpeg runs[/] (cut list: {plan.original_runs}); "
+        f"estimated ffmpeg time {plan.cost:.1f}s (cut list: {plan.original_cost:.1f}s)"
+    )
+    console.print(f"[dim]Footage added: {plan.added:.2f}s, dropped: {dropped:.2f}s[/]")
+
+
+def plan_mode(args) -> str:
+    if args.smart:
+        return "smart"
+    return "reencode" if args.reencode else "copy"
+
+
+def default_output_path(input_path: Path, args) -> Path:
+    tag = "preview" if args.preview else "edited"
+    return input_path.with_name(f"{input_path.stem}_{tag}{input_path.suffix}")
+
+
+def ask_overwrite(what: str, path: Path) -> None:
+    """Exit unless the user agrees to replace path.
+
+    With no one to ask (stdin closed, as for queued jobs) it fails with a
+    pointer to --force instead of dying on EOFError.
+    """
+    try:
+        answer = console.input(f"[bold yellow]{what} already exists:[/] {path}\nOverwrite? [y/N] ")
+    except EOFError:
+        console.print(f"\n[bold red]Error:[/] {what} already exists: {path} (use --force to overwrite)")
+        sys.exit(1)
+    if not answer.strip().lower().startswith("y"):
+        console.print("Aborted.")
+        sys.exit(1)
+
+
+def confirm_overwrite(output_path: Path, args):
+    if output_path.is_file() and not args.force and not args.dry_run:
+        ask_overwrite("Output", output_path)
+
+
+def proxy_for(video_path: Path) -> Path:
+    if find_proxy(video_path) is None:
+        console.print(f"[bold]Making proxy[/] for {video_path}... [dim](once per video)[/]")
+    return make_proxy(video_path)
+
+
+def preview_inputs(input_path: Path, segments) -> tuple[Path, list]:
+    """Swap the main input and every other source for its proxy."""
+    proxies = {}
+    for seg in segments:
+        if len(seg) > 2 and seg[2] not in proxies:
+            proxies[seg[2]] = proxy_for(seg[2])
+    segments = [seg if len(seg) == 2 else (seg[0], seg[1], proxies[seg[2]]) for seg in segments]
+    return proxy_for(input_path), segments
+
+
+def plan_segments(args, input_path: Path, segments):
+    """The input to render from (the proxy with --preview), its keyframe index and the plan."""
+    # Lines naming the main input explicitly are the same as lines naming none
+    segments = [seg[:2] if seg[2:] == (input_path.resolve(),) else seg for seg in segments]
+    if args.preview:
+        input_path, segments = preview_inputs(input_path, segments)
+    index = load_keyframe_index(input_path)
+    indexes = {None: index}
+
+    def index_for(source: Path | None):
+        if source not in indexes:
+            indexes[source] = load_keyframe_index(source)
+        return indexes[source]
+
+    with trace.span("plan", "render", segments=len(segments)):
+        plan = plan_render(segments, plan_mode(args), index_for, args.min_gap, args.min_segment)
+    return input_path, index, plan
+
+
+def run_render(args, input_path: Path, segments, output_path: Path, tmp_dir: Path, cache: FileCache | None = None):
+    input_path, index, plan = plan_segments(args, input_path, segments)
+    if args.dry_run:
+        print_plan(plan)
+        return
+    if len(plan.segments) != len(segments) or plan.added:
+        console.print(
+            f"[dim]Planned {len(plan.segments)} segments from {len(segments)} "
+            f"({plan.added:.2f}s added, {len(plan.dropped)} dropped)[/]"
+        )
+    segments = plan.render_segments()
+    if not segments:
+        raise ValueError("Every segment is shorter than --min-segment")
+    sources = {seg[2] if len(seg) > 2 else input_path.resolve() for seg in segments}
+    from_sources = f" from {len(sources)} sources" if len(sources) > 1 else ""
+    mode = render_mode_name(args) + (", from proxy" if args.preview else "")
+    console.print(f"[bold]Rendering {len(segments)} segments{from_sources} ({mode})...[/]")
+    if cache is None and not args.no_cache:
+        cache = segment_cache()
+    with trace.span("render", "render", segments=len(segments)):
+        if args.single_pass:
+            render_single_pass(input_path, segments, output_path, tmp_dir, index)
+        else:
+            render(input_path, segments, output_path, tmp_dir, args.reencode, args.jobs, args.smart, index, cache)
+    console.print(f"[bold green]Done![/] Output: {output_path}")
+    if not args.reencode and not args.smart:
+        print_copy_drift(index, segments)
+
+
 MODEL_PRESETS = {
     "fast": "tiny.en",
     "balanced": "base.en",
@@ -33,6 +198,22 @@ MODEL_PRESETS = {
 }
 
 
+def read_input_list(list_path: Path) -> list[Path]:
+    """Paths listed one per line; blank lines and # comments are skipped."""
+    if not list_path.is_file():
+        console.print(f"[bold red]Error:[/] File not found: {list_path}")
+        sys.exit(1)
+    lines = (line.strip() for line in list_path.read_text().splitlines())
+    return [Path(line) for line in lines if line and not line.startswith("#")]
+
+
+def describe_error(e: Exception) -> str:
+    if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+        stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else e.stderr
+        return stderr.strip().splitlines()[-1]
+    return str(e)
+
+
 def cmd_transcribe(args):
     if args.model == "__list__":
         console.print("[bold]Available model presets:[/]")
@@ -44,7 +225,74 @@ def cmd_transcribe(args):
     args.model = MODEL_PRESETS.get(args.model, args.model)
     if args.chunk_size is None:
         args.chunk_size = 3.0
-    input_path = Path(args.input)
+    if args.batch_size is not None and args.batch_size < 1:
+        console.print("[bold red]Error:[/] --batch-size must be at least 1.")
+        sys.exit(1)
+
+    inputs = [Path(p) for p in args.input]
+    if args.from_list:
+        inputs += read_input_list(Path(args.from_list))
+    if not inputs:
+        console.print("[bold red]Error:[/] No input files given.")
+        sys.exit(1)
+    if args.output and len(inputs) > 1:
+        console.print("[bold red]Error:[/] --output only works with a single input.")
+        sys.exit(1)
+
+    if len(inputs) == 1:
+        transcribe_single(inputs[0], args)
+    else:
+        check_ffmpeg()
+        transcribe_batch(inputs, args)
+
+
+def audio_source(input_path: Path) -> Path:
+    """input_path's proxy if one was made: the same audio, far fewer bytes to read."""
+    return find_proxy(input_path) or input_path
+
+
+def open_audio(input_path: Path, args, start: float = 0.0, window_seconds: float = WINDOW_SECONDS):
+    """Stream input_path's audio, through the decoded-audio cache unless --no-cache."""
+    cache = None if args.no_cache else audio_cache()
+    return stream_audio(audio_source(input_path), start=start, window_seconds=window_seconds, cache=cache)
+
+
+def open_journal(input_path: Path, out_path: Path, args) -> Journal:
+    """Start a checkpoint journal for out_path, or continue one with --resume.
+
+    Raises ValueError if an interrupted run's journal is in the way.
+    """
+    path = journal_path_for(out_path)
+    settings = {
+        "input": str(input_path.resolve()),
+        "model": args.model,
+        "language": args.language,
+        "chunk_size": args.chunk_size,
+        "batch_size": args.batch_size,
+    }
+    if path.is_file() and Journal.read_settings(path) is None:
+        # Killed before its header reached the disk: nothing to resume
+        path.unlink()
+    if path.is_file():
+        if args.resume:
+            journal = Journal.resume(path)
+            if journal.settings != settings:
+                journal.close()
+                raise ValueError(
+                    f"{path} was started with different options "
+                    f"(model {journal.settings['model']}, language {journal.settings['language']}, "
+                    f"chunk size {journal.settings['chunk_size']}). Rerun with the same options."
+                )
+            return journal
+        if not args.force:
+            raise ValueError(
+                f"Interrupted transcription found: {path}\n"
+                "Use --resume to continue it or --force to start over."
+            )
+    return Journal.create(path, settings)
+
+
+def transcribe_single(input_path: Path, args):
     if not input_path.is_file():
         console.print(f"[bold red]Error:[/] File not found: {input_path}")
         sys.exit(1)
@@ -58,21 +306,175 @@ def cmd_transcribe(args):
         console.print("Use --force to overwrite.")
         sys.exit(1)
 
-    tmp_dir = Path(tempfile.mkdtemp(prefix="vcut_"))
     try:
-        console.print("[bold]Extracting audio...[/]")
-        audio_path = extract_audio(input_path, tmp_dir)
+        journal = open_journal(input_path, out_path, args)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+    if journal.checkpoint:
+        console.print(f"[bold]Resuming from[/] {format_timestamp(journal.checkpoint)}")
 
-        segments = transcribe(audio_path, args.model, args.language, args.chunk_size)
-        if not segments:
-            console.print("[bold red]Error:[/] No speech detected in the video.")
-            sys.exit(1)
+    segments = None
+    try:
+        if args.workers > 1:
+            duration = probe_duration(input_path)
+            audio = open_audio(input_path, args, journal.checkpoint, window_for_workers(duration, args.workers))
+            with worker_pool(args.model, args.workers) as pool:
+                segments = transcribe_parallel(
+                    audio, pool, args.workers, args.language, args.chunk_size, duration,
+                    journal=journal, batch_size=args.batch_size,
+                    words_path=words_path_for(out_path),
+                )
+        elif not args.no_daemon and not journal.checkpoint:
+            with console.status("[bold blue]Transcribing (vcut serve)..."):
+                try:
+                    segments = remote_transcribe(
+                        audio_source(input_path), args.model, args.language, args.chunk_size, batch_size=args.batch_size,
+                        words_path=words_path_for(out_path), no_cache=args.no_cache,
+                    )
+                except RuntimeError as e:
+                    console.print(f"[bold red]Error:[/] {e}")
+                    journal.finish()
+                    sys.exit(1)
+        if segments is None:
+            # Audio decoding starts here and overlaps with the model load
+            audio = open_audio(input_path, args, journal.checkpoint)
+            segments = transcribe(
+                audio, args.model, args.language, args.chunk_size, probe_duration(input_path),
+                journal=journal, batch_size=args.batch_size,
+                words_path=words_path_for(out_path),
+            )
+    except KeyboardInterrupt:
+        journal.close()
+        console.print(f"\n[bold yellow]Interrupted.[/] Progress saved to {journal.path}")
+        console.print("[dim]Run the same command with --resume to continue.[/]")
+        sys.exit(130)
+    finally:
+        journal.close()
 
-        out_path.write_text(segments_to_text(segments))
-        console.print(f"[bold green]Transcript saved:[/] {out_path}")
-        console.print(f"[dim]Next: vcut edit {args.input}  (or: vcut render {args.input})[/]")
+    if not segments:
+        journal.finish()
+        console.print("[bold red]Error:[/] No speech detected in the video.")
+        sys.exit(1)
+
+    out_path.write_text(segments_to_text(segments))
+    journal.finish()
+    console.print(f"[bold green]Transcript saved:[/] {out_path}")
+    console.print(f"[dim]Next: vcut edit {input_path}  (or: vcut render {input_path})[/]")
+
+
+def transcribe_batch(inputs: list[Path], args):
+    """Transcribe many files with one model load, reporting failures at the end.
+
+    While one file is being transcribed, audio decoding for the next one is
+    already running.
+    """
+    failures = []
+    jobs = []
+    for input_path in inputs:
+        out_path = transcript_path_for(input_path)
+        if not input_path.is_file():
+            failures.append((input_path, "file not found"))
+        elif out_path.is_file() and not args.force:
+            failures.append((input_path, f"transcript already exists: {out_path} (use --force)"))
+        else:
+            jobs.append((input_path, out_path))
+
+    use_daemon = args.workers == 1 and not args.no_daemon and is_running()
+    model = pool = None
+    audio = journal = next_audio = next_journal = None
+    audio_seconds = 0.0
+    started = time.monotonic()
+    try:
+        for i, (input_path, out_path) in enumerate(jobs):
+            console.print(f"[bold]\\[{i + 1}/{len(jobs)}][/] {input_path}")
+            audio, next_audio = next_audio, None
+            journal, next_journal = next_journal, None
+            try:
+                duration = probe_duration(input_path)
+                journal = journal or open_journal(input_path, out_path, args)
+                if use_daemon and not journal.checkpoint:
+                    segments = remote_transcribe(
+                        audio_source(input_path), args.model, args.language, args.chunk_size, batch_size=args.batch_size,
+                        words_path=words_path_for(out_path), no_cache=args.no_cache,
+                    )
+                elif args.workers > 1:
+                    audio = open_audio(input_path, args, journal.checkpoint, window_for_workers(duration, args.workers))
+                    if pool is None:
+                        pool = worker_pool(args.model, args.workers)
+                    segments = transcribe_parallel(
+                        audio, pool, args.workers, args.language, args.chunk_size, duration,
+                        journal=journal, batch_size=args.batch_size,
+                        words_path=words_path_for(out_path),
+                    )
+                else:
+                    audio = audio or open_audio(input_path, args, journal.checkpoint)
+                    if i + 1 < len(jobs):
+                        next_audio, next_journal = prefetch_audio(*jobs[i + 1], args)
+                    if model is None:
+                        model = load_model(args.model)
+                    segments = transcribe(
+                        audio, args.model, args.language, args.chunk_size, duration,
+                        model=model, journal=journal, batch_size=args.batch_size,
+                        words_path=words_path_for(out_path),
+                    )
+                if not segments:
+                    raise RuntimeError("no speech detected")
+                out_path.write_text(segments_to_text(segments))
+                journal.finish()
+                journal = None
+                audio_seconds += duration or segments[-1]["end"]
+                console.print(f"  [green]saved[/] {out_path}")
+            except Exception as e:
+                if audio is not None:
+                    audio.close()
+                if journal is not None:
+                    # A failed file starts over next time rather than blocking the batch
+                    journal.finish()
+                    journal = None
+                failures.append((input_path, describe_error(e)))
+                console.print(f"  [bold red]failed:[/] {describe_error(e)}")
+    except KeyboardInterrupt:
+        for stream in (audio, next_audio):
+            if stream is not None:
+                stream.close()
+        if next_journal is not None:
+            # Opened ahead of its turn: only keep it if it holds resumed progress
+            if next_journal.checkpoint:
+                next_journal.close()
+            else:
+                next_journal.finish()
+        if journal is not None:
+            journal.close()
+            console.print(f"\n[bold yellow]Interrupted.[/] Progress saved to {journal.path}")
+            console.print("[dim]Run the same command with --resume to continue.[/]")
+        sys.exit(130)
     finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.monotonic() - started
+    done = len(inputs) - len(failures)
+    console.print(f"\n[bold]Transcribed {done}/{len(inputs)} files[/]")
+    if done and elapsed > 0:
+        console.print(
+            f"  {audio_seconds / 3600:.2f} audio-hours in {elapsed / 3600:.2f} wall-hours "
+            f"({audio_seconds / elapsed:.1f} audio-hours per wall-hour)"
+        )
+    if failures:
+        console.print(f"[bold red]{len(failures)} failed:[/]")
+        for input_path, reason in failures:
+            console.print(f"  {input_path}: {reason}")
+        sys.exit(1)
+
+
+def prefetch_audio(input_path: Path, out_path: Path, args):
+    """Start decoding the next batch file; (None, None) leaves it to its own turn."""
+    try:
+        journal = open_journal(input_path, out_path, args)
+    except ValueError:
+        return None, None
+    return open_audio(input_path, args, journal.checkpoint), journal
 
 
 def cmd_render(args):
@@ -90,12 +492,9 @@ def cmd_render(args):
             console.print(f"[dim]Run first: vcut transcribe {args.input}[/]")
         sys.exit(1)
 
-    output_path = Path(args.output) if args.output else input_path.with_name(f"{input_path.stem}_edited{input_path.suffix}")
+    output_path = Path(args.output) if args.output else default_output_path(input_path, args)
 
-    if output_path.is_file() and not args.force:
-        if not console.input(f"[bold yellow]Output already exists:[/] {output_path}\nOverwrite? [y/N] ").strip().lower().startswith("y"):
-            console.print("Aborted.")
-            sys.exit(1)
+    confirm_overwrite(output_path, args)
 
     try:
         segments = parse_edited_file(transcript_src)
@@ -110,10 +509,7 @@ def cmd_render(args):
 
     tmp_dir = Path(tempfile.mkdtemp(prefix="vcut_"))
     try:
-        mode = "re-encode" if args.reencode else "stream copy"
-        console.print(f"[bold]Rendering {len(segments)} segments ({mode})...[/]")
-        render(input_path, segments, output_path, tmp_dir, args.reencode)
-        console.print(f"[bold green]Done![/] Output: {output_path}")
+        run_render(args, input_path, segments, output_path, tmp_dir)
     except Exception as e:
         console.print(f"[bold red]Error:[/] {e}")
         console.print(f"Temp files preserved at: {tmp_dir}")
@@ -122,6 +518,87 @@ def cmd_render(args):
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
+def live_render(args, input_path: Path, segments, output_path: Path, tmp_dir: Path, cache: FileCache, cancel):
+    """Render without progress output to a partial file, then swap it in for output_path."""
+    input_path, index, plan = plan_segments(args, input_path, segments)
+    segments = plan.render_segments()
+    if not segments:
+        raise ValueError("Every segment is shorter than --min-segment")
+    partial = output_path.with_name(f".{output_path.stem}.partial{output_path.suffix}")
+    try:
+        render(
+            input_path, segments, partial, tmp_dir, args.reencode, args.jobs, args.smart, index, cache,
+            cancel=cancel, show_progress=False,
+        )
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+    os.replace(partial, output_path)
+
+
+def watch_edit(args, input_path: Path, working_copy: Path, transcript_src: Path, output_path: Path, tmp_dir: Path, cache):
+    """Run the editor on working_copy, re-rendering output_path after every save.
+
+    Returns the editor's exit code and the segments the output was last
+    rendered from (None if no save got rendered). Unchanged segments come
+    from the segment cache, so each save only extracts what it changed.
+    Progress goes to a log file: the terminal belongs to the editor.
+    """
+    # Make the proxy and keyframe index now, while the terminal is still ours
+    plan_segments(args, input_path, [])
+    log_path = tmp_dir / "watch.log"
+    try:
+        parsed = parse_edited_file(working_copy, base_dir=transcript_src.parent)
+    except ValueError:
+        parsed = []
+    state = {"parsed": parsed, "rendered": None}
+
+    def log(message: str):
+        with log_path.open("a") as f:
+            f.write(f"{time.strftime('%H:%M:%S')} {message}\n")
+
+    def on_save(cancel):
+        try:
+            segments = parse_edited_file(working_copy, base_dir=transcript_src.parent)
+        except ValueError as e:
+            log(f"Not rendered: {e}")
+            return
+        added, removed = diff_segments(state["parsed"], segments)
+        state["parsed"] = segments
+        if not segments:
+            log("Not rendered: no segments")
+            return
+        if segments == state["rendered"]:
+            log("No cut changes")
+            return
+        run_dir = Path(tempfile.mkdtemp(prefix="render_", dir=tmp_dir))
+        started = time.perf_counter()
+        try:
+            with trace.span("live render", "watch", segments=len(segments)):
+                live_render(args, input_path, segments, output_path, run_dir, cache, cancel)
+        except RenderCancelled:
+            log("Superseded by a newer save")
+            return
+        except Exception as e:
+            log(f"Render failed: {describe_error(e)}")
+            return
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        state["rendered"] = segments
+        log(
+            f"Rendered {len(segments)} segments in {time.perf_counter() - started:.1f}s "
+            f"({added} new, {removed} removed since the last save): {output_path}"
+        )
+
+    console.print(f"[bold]Opening editor...[/] ({transcript_src})")
+    console.print(f"[dim]Re-rendering {output_path} on every save; progress in {log_path}[/]")
+    with Watcher(working_copy, on_save) as watcher:
+        rc = open_editor(working_copy)
+    if watcher.calls:
+        console.print(f"[dim]{watcher.calls} live renders, {watcher.cancelled} cancelled before finishing[/]")
+    return rc, state["rendered"]
+
+
 def cmd_edit(args):
     """Convenience: open the transcript in $EDITOR, then render."""
     input_path = Path(args.input)
@@ -129,6 +606,10 @@ def cmd_edit(args):
         console.print(f"[bold red]Error:[/] File not found: {input_path}")
         sys.exit(1)
 
+    if args.watch and (args.dry_run or args.single_pass):
+        console.print("[bold red]Error:[/] --watch cannot be combined with --dry-run or --single-pass")
+        sys.exit(1)
+
     check_ffmpeg()
 
     transcript_src = Path(args.transcript) if args.transcript else transcript_path_for(input_path)
@@ -138,20 +619,32 @@ def cmd_edit(args):
         console.print(f"[dim]Run first: vcut transcribe {args.input}[/]")
         sys.exit(1)
 
+    output_path = Path(args.output) if args.output else default_output_path(input_path, args)
+    if args.watch:
+        # Live renders write the output while the editor is open
+        confirm_overwrite(output_path, args)
+
     # Copy to a working file so the original is preserved
     tmp_dir = Path(tempfile.mkdtemp(prefix="vcut_"))
     working_copy = tmp_dir / "transcript.txt"
     shutil.copy(transcript_src, working_copy)
+    # With --no-cache, watch mode still reuses segments within the session
+    cache = FileCache(tmp_dir / "segments", ".mp4") if args.watch and args.no_cache else None
 
     try:
-        console.print(f"[bold]Opening editor...[/] ({transcript_src})")
-        rc = open_editor(working_copy)
+        if args.watch:
+            rc, rendered = watch_edit(
+                args, input_path, working_copy, transcript_src, output_path, tmp_dir, cache or segment_cache(),
+            )
+        else:
+            console.print(f"[bold]Opening editor...[/] ({transcript_src})")
+            rc, rendered = open_editor(working_copy), None
         if rc != 0:
             console.print(f"[bold red]Editor exited with code {rc}. Aborting.[/]")
             sys.exit(1)
 
         try:
-            segments = parse_edited_file(working_copy)
+            segments = parse_edited_file(working_copy, base_dir=transcript_src.parent)
         except ValueError as e:
             console.print(f"[bold red]Error:[/] {e}")
             console.print(f"\n[dim]The edited file is preserved at: {working_copy}[/]")
@@ -162,17 +655,13 @@ def cmd_edit(args):
             console.print("[yellow]No segments remaining after edit. Nothing to render.[/]")
             sys.exit(0)
 
-        output_path = Path(args.output) if args.output else input_path.with_name(f"{input_path.stem}_edited{input_path.suffix}")
+        if not args.watch:
+            confirm_overwrite(output_path, args)
 
-        if output_path.is_file() and not args.force:
-            if not console.input(f"[bold yellow]Output already exists:[/] {output_path}\nOverwrite? [y/N] ").strip().lower().startswith("y"):
-                console.print("Aborted.")
-                sys.exit(1)
-
-        mode = "re-encode" if args.reencode else "stream copy"
-        console.print(f"[bold]Rendering {len(segments)} segments ({mode})...[/]")
-        render(input_path, segments, output_path, tmp_dir, args.reencode)
-        console.print(f"[bold green]Done![/] Output: {output_path}")
+        if segments == rendered:
+            console.print(f"[bold green]Done![/] Output is up to date: {output_path}")
+        else:
+            run_render(args, input_path, segments, output_path, tmp_dir, cache)
     except Exception as e:
         console.print(f"[bold red]Error:[/] {e}")
         console.print(f"Temp files preserved at: {tmp_dir}")
@@ -181,17 +670,360 @@ def cmd_edit(args):
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
-def main():
+def cmd_rechunk(args):
+    """Rebuild a transcript at a new chunk size from its word sidecar."""
+    input_path = Path(args.input)
+    transcript = Path(args.transcript) if args.transcript else transcript_path_for(input_path)
+    out_path = Path(args.output) if args.output else transcript
+    words_src = words_path_for(transcript)
+    if not words_src.is_file():
+        console.print(f"[bold red]Error:[/] Word timings not found: {words_src}")
+        hint = f" -o {args.transcript}" if args.transcript else ""
+        console.print(f"[dim]Run first: vcut transcribe {args.input}{hint}[/]")
+        sys.exit(1)
+    if args.chunk_size <= 0:
+        console.print("[bold red]Error:[/] --chunk-size must be positive.")
+        sys.exit(1)
+
+    if out_path.is_file() and not args.force:
+        ask_overwrite("Transcript", out_path)
+
+    try:
+        with trace.span("load words", "rechunk"):
+            words = WordTable.load(words_src)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+    with trace.span("chunk words", "rechunk", words=len(words)):
+        segments = words.chunks(args.chunk_size)
+    out_path.write_text(segments_to_text(segments))
+    console.print(f"[bold green]Transcript saved:[/] {out_path} [dim]({len(segments)} lines from {len(words)} words)[/]")
+
+
+def cmd_index(args):
+    db = Path(args.db) if args.db else index_path()
+    transcripts = find_transcripts([Path(p) for p in args.paths or ["."]])
+    conn = open_index(db)
+    indexed = unchanged = 0
+    started = time.monotonic()
+    with conn:
+        for transcript in transcripts:
+            if not transcript.is_file():
+                console.print(f"[yellow]Skipping[/] {transcript} [dim](no transcript)[/]")
+                continue
+            with trace.span("index transcript", "index", transcript=str(transcript)):
+                changed = index_transcript(conn, transcript)
+            if changed:
+                indexed += 1
+            else:
+                unchanged += 1
+        removed = prune_missing(conn)
+    console.print(
+        f"[bold green]Indexed[/] {indexed} transcripts [dim]({unchanged} unchanged, {removed} removed, "
+        f"{time.monotonic() - started:.1f}s)[/] in {db}"
+    )
+    conn.close()
+
+
+def cmd_search(args):
+    db = Path(args.db) if args.db else index_path()
+    if not db.is_file():
+        console.print(f"[bold red]Error:[/] No search index at {db}")
+        console.print("[dim]Run first: vcut index <dir>[/]")
+        sys.exit(1)
+
+    conn = open_index(db)
+    started = time.monotonic()
+    try:
+        with trace.span("search", "search", query=args.query):
+            hits = search(conn, args.query, Path(args.video) if args.video else None, args.limit, args.raw)
+    except sqlite3.OperationalError as e:
+        console.print(f"[bold red]Error:[/] Invalid query: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+    elapsed = time.monotonic() - started
+
+    for hit in hits:
+        line = f"[{format_timestamp(hit['start'])} -> {format_timestamp(hit['end'])}] | {hit['text']}"
+        console.print(f"[cyan]{escape(hit['video'] or hit['transcript'])}[/]  {escape(line)}", soft_wrap=True, highlight=False)
+    sources = {hit["transcript"] for hit in hits}
+    console.print(f"[dim]{len(hits)} hits in {len(sources)} videos ({elapsed * 1000:.0f} ms)[/]")
+
+    if args.cutlist:
+        if not hits:
+            sys.exit(1)
+        if any(hit["video"] is None for hit in hits) and len(sources) > 1:
+            console.print("[bold red]Error:[/] Some hits have no video next to their transcript.")
+            sys.exit(1)
+        cutlist = Path(args.cutlist)
+        base_dir = cutlist.resolve().parent if len(sources) > 1 else None
+        cutlist.write_text(segments_to_text(hits_to_segments(hits, args.pad, base_dir)))
+        video = hits[0]["video"] or "VIDEO"
+        console.print(f"[bold green]Cut list saved:[/] {args.cutlist}")
+        console.print(f"[dim]Next: vcut render {video} -t {args.cutlist}[/]")
+
+
+def cmd_proxy(args):
+    check_ffmpeg()
+    failed = False
+    for video_path in map(Path, args.input):
+        if not video_path.is_file():
+            console.print(f"[bold red]Error:[/] File not found: {video_path}")
+            failed = True
+            continue
+        proxy = find_proxy(video_path, args.height)
+        if proxy is not None and not args.force:
+            console.print(f"[dim]Up to date:[/] {video_path} → {proxy}")
+            continue
+        if proxy is not None:
+            proxy.unlink()
+        try:
+            with console.status(f"[bold blue]Making proxy for {video_path}..."):
+                proxy = make_proxy(video_path, args.height)
+        except subprocess.CalledProcessError as e:
+            console.print(f"[bold red]Error:[/] {video_path}: {describe_error(e)}")
+            failed = True
+            continue
+        ratio = proxy.stat().st_size / max(video_path.stat().st_size, 1)
+        console.print(f"[bold green]Proxy saved:[/] {proxy} [dim]({format_size(proxy.stat().st_size)}, {ratio:.0%} of the original)[/]")
+    if failed:
+        sys.exit(1)
+
+
+def cmd_preview(args):
+    """Serve the edited timeline as HLS, re-read whenever the transcript changes."""
+    input_path = Path(args.input)
+    if not input_path.is_file():
+        console.print(f"[bold red]Error:[/] File not found: {input_path}")
+        sys.exit(1)
+
+    check_ffmpeg()
+
+    transcript_src = Path(args.transcript) if args.transcript else transcript_path_for(input_path)
+    if not transcript_src.is_file():
+        console.print(f"[bold red]Error:[/] Transcript not found: {transcript_src}")
+        if not args.transcript:
+            console.print(f"[dim]Run first: vcut transcribe {args.input}[/]")
+        sys.exit(1)
+
+    indexes = {}
+
+    def index_for(source: Path):
+        if source not in indexes:
+            indexes[source] = load_keyframe_index(source)
+        return indexes[source]
+
+    try:
+        serve_preview(Timeline(input_path, transcript_src, index_for), args.host, args.port)
+    except (ValueError, OSError) as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+
+
+def cmd_serve(args):
+    check_ffmpeg()
+    path = Path(args.socket) if args.socket else socket_path()
+    preload = [MODEL_PRESETS.get(m, m) for m in args.model]
+    try:
+        serve(path, args.max_models, preload)
+    except RuntimeError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+
+
+CACHES = {
+    "segments": segment_cache,
+    "audio": audio_cache,
+    "proxies": proxy_cache,
+}
+
+
+def cmd_cache(args):
+    try:
+        max_bytes = parse_size(args.max_size) if getattr(args, "max_size", None) else None
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+
+    console.print(f"[bold]Cache directory:[/] {cache_root()}")
+    for name, factory in CACHES.items():
+        cache = factory()
+        if args.cache_command == "prune":
+            removed, freed = cache.prune(max_bytes)
+            console.print(f"  {name:10s} removed {removed} entries ({format_size(freed)})")
+        else:
+            count, size = cache.stats()
+            console.print(f"  {name:10s} {count} entries, {format_size(size)} of {format_size(cache.max_bytes)}")
+
+
+# Jobs listed by vcut queue status without --all
+STATUS_JOBS = 20
+JOB_STATE_STYLES = {"queued": "dim", "running": "yellow", "done": "green", "failed": "bold red"}
+
+
+def parse_slots(values: list[str]) -> dict[str, int]:
+    """DEFAULT_SLOTS updated from KIND=N strings."""
+    slots = dict(DEFAULT_SLOTS)
+    for value in values:
+        kind, _, count = value.partition("=")
+        if kind not in JOB_KINDS or not count.isdigit():
+            raise ValueError(f"Invalid --slots '{value}' (expected KIND=N with KIND one of: {', '.join(JOB_KINDS)})")
+        slots[kind] = int(count)
+    return slots
+
+
+def queue_add(args, path: Path):
+    if not args.args:
+        console.print(f"[bold red]Error:[/] Give the job's arguments, e.g. vcut queue add {args.kind} video.mp4")
+        sys.exit(1)
+    # Reject bad arguments now rather than when a worker runs the job
+    build_parser().parse_args([args.kind, *args.args])
+    with closing(open_queue(path)) as conn:
+        job_id = add_job(conn, args.kind, args.args, Path.cwd(), args.priority, args.retries)
+    console.print(f"Queued job {job_id}")
+
+
+def queue_status(args, path: Path):
+    with closing(open_queue(path)) as conn:
+        jobs = list_jobs(conn, None if args.all else STATUS_JOBS)
+        stats = kind_stats(conn)
+    if not jobs:
+        console.print(f"[dim]No jobs in {path}[/]")
+        return
+
+    table = Table()
+    table.add_column("ID", justify="right")
+    table.add_column("State")
+    table.add_column("Pri", justify="right")
+    table.add_column("Tries", justify="right")
+    table.add_column("Wait", justify="right")
+    table.add_column("Ran", justify="right")
+    table.add_column("CPU", justify="right")
+    table.add_column("Memory", justify="right")
+    table.add_column("Job")
+    for job in jobs:
+        description = escape(" ".join([job["kind"], *job["args"]]))
+        if job["error"]:
+            description += f"\n[red]{escape(job['error'])}[/]"
+        table.add_row(
+            str(job["id"]), f"[{JOB_STATE_STYLES[job['state']]}]{job['state']}[/]", str(job["priority"]),
+            f"{job['attempts']}/{job['max_attempts']}",
+            f"{job['waited']:.1f}s",
+            f"{job['ran']:.1f}s" if job["ran"] is not None else "",
+            f"{job['cpu_seconds']:.1f}s" if job["cpu_seconds"] is not None else "",
+            format_size(job["max_rss"]) if job["max_rss"] is not None else "",
+            description,
+        )
+    console.print(table)
+
+    for kind, counts in stats.items():
+        timings = ""
+        if "mean_run" in counts:
+            timings = (
+                f"; mean wait {counts['mean_wait']:.1f}s, "
+                f"mean run {counts['mean_run']:.1f}s (max {counts['max_run']:.1f}s)"
+            )
+        console.print(
+            f"[bold]{kind}[/]: {counts['queued']} queued, {counts['running']} running, "
+            f"{counts['done']} done, {counts['failed']} failed{timings}"
+        )
+
+
+def queue_worker(args, path: Path):
+    try:
+        slots = parse_slots(args.slots)
+    except ValueError as e:
+        console.print(f"[bold red]Error:[/] {e}")
+        sys.exit(1)
+
+    check_ffmpeg()
+
+    # Transcribe jobs find this through the socket and share its loaded models
+    server = None
+    if slots.get("transcribe") and not args.no_daemon and not is_running():
+        server_path = socket_path()
+        server = serve_in_background(server_path)
+        console.print(f"[dim]Serving Whisper models to transcribe jobs on {server_path}[/]")
+    try:
+        Worker(path, slots).run(drain=args.drain)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+            server_path.unlink(missing_ok=True)
+
+
+def cmd_queue(args):
+    path = Path(args.db) if args.db else queue_path()
+    if args.queue_command == "add":
+        queue_add(args, path)
+    elif args.queue_command == "status":
+        queue_status(args, path)
+    else:
+        queue_worker(args, path)
+
+
+def dispatch(parser, args):
+    if args.command in ("transcribe", "t"):
+        cmd_transcribe(args)
+    elif args.command in ("render", "r"):
+        cmd_render(args)
+    elif args.command in ("edit", "e"):
+        cmd_edit(args)
+    elif args.command == "rechunk":
+        cmd_rechunk(args)
+    elif args.command == "index":
+        cmd_index(args)
+    elif args.command in ("search", "s"):
+        cmd_search(args)
+    elif args.command == "proxy":
+        cmd_proxy(args)
+    elif args.command == "preview":
+        cmd_preview(args)
+    elif args.command == "serve":
+        cmd_serve(args)
+    elif args.command == "cache":
+        cmd_cache(args)
+    elif args.command == "queue":
+        cmd_queue(args)
+    else:
+        parser.print_help()
+        sys.exit(1)
+
+
+def print_trace_summary(tracer, path: Path):
+    table = Table(title=f"Trace: {path}", title_justify="left", title_style="bold")
+    table.add_column("Stage")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Mean", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Written", justify="right")
+    for stage in tracer.summary():
+        table.add_row(
+            stage["name"], str(stage["calls"]),
+            f"{stage['total']:.3f}s", f"{stage['mean']:.3f}s", f"{stage['max']:.3f}s",
+            format_size(stage["bytes"]) if stage["bytes"] is not None else "",
+        )
+    console.print(table)
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         prog="vcut",
         description="Edit video by editing its transcript.",
     )
     sub = parser.add_subparsers(dest="command")
+    # Shared by every subcommand
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--trace", metavar="FILE", help="Write a Chrome trace of each stage to FILE and print a timing summary")
 
     # -- transcribe --
-    p_transcribe = sub.add_parser("transcribe", aliases=["t"], help="Generate transcript from video")
-    p_transcribe.add_argument("input", help="Input video file")
-    p_transcribe.add_argument("-o", "--output", help="Output transcript path (default: {input}.txt)")
+    p_transcribe = sub.add_parser("transcribe", parents=[common], aliases=["t"], help="Generate transcript from video")
+    p_transcribe.add_argument("input", nargs="*", help="Input video file(s)")
+    p_transcribe.add_argument("--from-list", metavar="FILE", help="Also transcribe the files listed in FILE, one per line")
+    p_transcribe.add_argument("-o", "--output", help="Output transcript path (default: {input}.txt; single input only)")
     p_transcribe.add_argument(
         "-m", "--model", default="distil-large-v3",
         nargs="?", const="__list__",
@@ -204,31 +1036,133 @@ def main():
     p_transcribe.add_argument("-l", "--language", default=None, help="Force transcription language")
     p_transcribe.add_argument("-c", "--chunk-size", type=float, default=None, help="Target segment duration in seconds (default: 3)")
     p_transcribe.add_argument("--force", action="store_true", help="Overwrite existing transcript")
+    p_transcribe.add_argument("-w", "--workers", type=int, default=1, help="Transcribe in N processes, splitting the audio at silences (default: 1)")
+    p_transcribe.add_argument(
+        "-b", "--batch-size", type=int, default=None,
+        help="Batch speech segments through the encoder N at a time (faster on CPU; uses VAD)",
+    )
+    p_transcribe.add_argument("--resume", action="store_true", help="Continue an interrupted transcription from its last checkpoint")
+    p_transcribe.add_argument("--no-cache", action="store_true", help="Do not reuse or store decoded audio")
+    p_transcribe.add_argument("--no-daemon", action="store_true", help="Transcribe in this process even if vcut serve is running")
 
     # -- render --
-    p_render = sub.add_parser("render", aliases=["r"], help="Render video from edited transcript")
+    p_render = sub.add_parser("render", parents=[common], aliases=["r"], help="Render video from edited transcript")
     p_render.add_argument("input", help="Input video file")
     p_render.add_argument("-t", "--transcript", help="Transcript file (default: {input}.txt)")
     p_render.add_argument("-o", "--output", help="Output video path (default: {input}_edited.mp4)")
-    p_render.add_argument("-r", "--reencode", action="store_true", help="Re-encode for precise cuts")
+    p_render_mode = p_render.add_mutually_exclusive_group()
+    p_render_mode.add_argument("-r", "--reencode", action="store_true", help="Re-encode for precise cuts")
+    p_render_mode.add_argument("--smart", action="store_true", help="Precise cuts, re-encoding only around each cut point")
+    p_render_mode.add_argument("--single-pass", action="store_true", help="Stream copy in one ffmpeg run, with no temporary segment files")
+    p_render.add_argument("-j", "--jobs", type=int, default=None, help="Segments to extract in parallel (default: CPU count)")
+    p_render.add_argument("--no-cache", action="store_true", help="Do not reuse or store extracted segments")
     p_render.add_argument("--force", action="store_true", help="Overwrite output without prompting")
+    p_render.add_argument("--min-gap", type=float, default=0.0, metavar="SECONDS", help="Bridge gaps shorter than this between cuts when it saves ffmpeg time")
+    p_render.add_argument("--min-segment", type=float, default=0.0, metavar="SECONDS", help="Drop segments shorter than this")
+    p_render.add_argument("--preview", action="store_true", help="Cut from the proxy (see vcut proxy) for a fast, near-accurate preview")
+    p_render.add_argument("--dry-run", action="store_true", help="Print the render plan and its estimated cost without rendering")
 
     # -- edit --
-    p_edit = sub.add_parser("edit", aliases=["e"], help="Open transcript in $EDITOR, then render (convenience)")
+    p_edit = sub.add_parser("edit", parents=[common], aliases=["e"], help="Open transcript in $EDITOR, then render (convenience)")
     p_edit.add_argument("input", help="Input video file")
     p_edit.add_argument("-t", "--transcript", help="Transcript file (default: {input}.txt)")
     p_edit.add_argument("-o", "--output", help="Output video path (default: {input}_edited.mp4)")
-    p_edit.add_argument("-r", "--reencode", action="store_true", help="Re-encode for precise cuts")
+    p_edit_mode = p_edit.add_mutually_exclusive_group()
+    p_edit_mode.add_argument("-r", "--reencode", action="store_true", help="Re-encode for precise cuts")
+    p_edit_mode.add_argument("--smart", action="store_true", help="Precise cuts, re-encoding only around each cut point")
+    p_edit_mode.add_argument("--single-pass", action="store_true", help="Stream copy in one ffmpeg run, with no temporary segment files")
+    p_edit.add_argument("-j", "--jobs", type=int, default=None, help="Segments to extract in parallel (default: CPU count)")
+    p_edit.add_argument("--no-cache", action="store_true", help="Do not reuse or store extracted segments")
     p_edit.add_argument("--force", action="store_true", help="Overwrite output without prompting")
+    p_edit.add_argument("--min-gap", type=float, default=0.0, metavar="SECONDS", help="Bridge gaps shorter than this between cuts when it saves ffmpeg time")
+    p_edit.add_argument("--min-segment", type=float, default=0.0, metavar="SECONDS", help="Drop segments shorter than this")
+    p_edit.add_argument("--preview", action="store_true", help="Cut from the proxy (see vcut proxy) for a fast, near-accurate preview")
+    p_edit.add_argument("--dry-run", action="store_true", help="Print the render plan and its estimated cost without rendering")
+    p_edit.add_argument("--watch", action="store_true", help="Re-render the output every time the transcript is saved, reusing unchanged segments")
+
+    # -- rechunk --
+    p_rechunk = sub.add_parser("rechunk", parents=[common], help="Rebuild the transcript at a new chunk size without re-running Whisper")
+    p_rechunk.add_argument("input", help="Input video file")
+    p_rechunk.add_argument("-c", "--chunk-size", type=float, required=True, help="Target segment duration in seconds")
+    p_rechunk.add_argument("-t", "--transcript", help="Transcript whose word timings to use (default: {input}.txt)")
+    p_rechunk.add_argument("-o", "--output", help="Output transcript path (default: the transcript)")
+    p_rechunk.add_argument("--force", action="store_true", help="Overwrite the transcript without prompting")
+
+    # -- index --
+    p_index = sub.add_parser("index", parents=[common], help="Add transcripts to the full-text search index")
+    p_index.add_argument("paths", nargs="*", help="Transcripts, videos or directories to scan (default: .)")
+    p_index.add_argument("--db", help="Index database (default: $VCUT_INDEX or the cache dir)")
+
+    # -- search --
+    p_search = sub.add_parser("search", parents=[common], aliases=["s"], help="Search indexed transcripts")
+    p_search.add_argument("query", help="Phrase to look for")
+    p_search.add_argument("--video", help="Only search this video (or transcript)")
+    p_search.add_argument("-n", "--limit", type=int, default=None, help="Show at most N hits")
+    p_search.add_argument("--raw", action="store_true", help="Pass the query to SQLite FTS5 as is (AND, OR, NEAR, prefix*)")
+    p_search.add_argument("--cutlist", metavar="FILE", help="Write the hits as a cut list for vcut render -t")
+    p_search.add_argument("--pad", type=float, default=0.0, help="Seconds added around each hit in the cut list")
+    p_search.add_argument("--db", help="Index database (default: $VCUT_INDEX or the cache dir)")
+
+    # -- proxy --
+    p_proxy = sub.add_parser("proxy", parents=[common], help="Make small, keyframe-dense proxies for fast previews")
+    p_proxy.add_argument("input", nargs="+", help="Input video file(s)")
+    p_proxy.add_argument("--height", type=int, default=PROXY_HEIGHT, help=f"Proxy height in pixels (default: {PROXY_HEIGHT})")
+    p_proxy.add_argument("--force", action="store_true", help="Re-encode proxies that already exist")
+
+    # -- preview --
+    p_preview = sub.add_parser("preview", parents=[common], help="Play the edited timeline over HTTP (HLS) without rendering")
+    p_preview.add_argument("input", help="Input video file")
+    p_preview.add_argument("-t", "--transcript", help="Transcript file (default: {input}.txt)")
+    p_preview.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    p_preview.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT}, 0 for any free port)")
+
+    # -- serve --
+    p_serve = sub.add_parser("serve", parents=[common], help="Keep Whisper models loaded and transcribe jobs from a local socket")
+    p_serve.add_argument("--socket", help="Unix socket path (default: $XDG_RUNTIME_DIR/vcut.sock)")
+    p_serve.add_argument("--max-models", type=int, default=DEFAULT_MAX_MODELS, help=f"Models kept loaded at once (default: {DEFAULT_MAX_MODELS})")
+    p_serve.add_argument("-m", "--model", action="append", default=[], help="Model preset or name to load at startup (repeatable)")
 
+    # -- cache --
+    p_cache = sub.add_parser("cache", help="Inspect or prune the on-disk caches")
+    cache_sub = p_cache.add_subparsers(dest="cache_command", required=True)
+    cache_sub.add_parser("stats", parents=[common], help="Show cache location, entry count and size")
+    p_prune = cache_sub.add_parser("prune", parents=[common], help="Evict least recently used entries")
+    p_prune.add_argument("--max-size", help="Shrink each cache to this size, e.g. 2G (default: 10G; 0 clears)")
+
+    # -- queue --
+    p_queue = sub.add_parser("queue", help="Queue transcribe and render jobs for a local worker pool")
+    queue_sub = p_queue.add_subparsers(dest="queue_command", required=True)
+    queue_common = argparse.ArgumentParser(add_help=False, parents=[common])
+    queue_common.add_argument("--db", help="Queue database (default: $VCUT_QUEUE or the cache dir)")
+    p_queue_add = queue_sub.add_parser("add", parents=[queue_common], help="Queue a job, e.g. vcut queue add render video.mp4 --force")
+    p_queue_add.add_argument("--priority", type=int, default=0, help="Higher priorities run first (default: 0)")
+    p_queue_add.add_argument("--retries", type=int, default=0, help="Times a failed job is tried again (default: 0)")
+    p_queue_add.add_argument("kind", choices=JOB_KINDS, help="Command to run")
+    p_queue_add.add_argument("args", nargs=argparse.REMAINDER, help="Its arguments, as for vcut KIND")
+    p_queue_status = queue_sub.add_parser("status", parents=[queue_common], help="List jobs and per-kind timings")
+    p_queue_status.add_argument("--all", action="store_true", help=f"List every job, not just the latest {STATUS_JOBS}")
+    p_queue_worker = queue_sub.add_parser("worker", parents=[queue_common], help="Run queued jobs until interrupted")
+    p_queue_worker.add_argument(
+        "--slots", action="append", default=[], metavar="KIND=N",
+        help="Jobs of KIND run at once (repeatable; default: "
+             + ", ".join(f"{kind}={n}" for kind, n in DEFAULT_SLOTS.items()) + ")",
+    )
+    p_queue_worker.add_argument("--drain", action="store_true", help="Exit once no job is left to run")
+    p_queue_worker.add_argument("--no-daemon", action="store_true", help="Do not serve Whisper models to transcribe jobs from this worker")
+
+    return parser
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
 
-    if args.command in ("transcribe", "t"):
-        cmd_transcribe(args)
-    elif args.command in ("render", "r"):
-        cmd_render(args)
-    elif args.command in ("edit", "e"):
-        cmd_edit(args)
+    if getattr(args, "trace", None):
+        tracer = trace.enable()
+        try:
+            dispatch(parser, args)
+        finally:
+            tracer.write(Path(args.trace))
+            print_trace_summary(tracer, Path(args.trace))
     else:
-        parser.print_help()
-        sys.exit(1)
+        dispatch(parser, args)
@@ -3,6 +3,12 @@ import re
 import subprocess
 from pathlib import Path
 
+import numpy as np
+
+# Media file suffixes: a source named with one of these must exist, and
+# transcripts are matched to their video by them.
+VIDEO_SUFFIXES = (".mp4", ".mkv", ".mov", ".webm", ".avi", ".m4v", ".mp3", ".m4a", ".wav")
+
 TIMESTAMP_RE = re.compile(
     r"^\[(\d{2}:\d{2}:\d{2}\.\d{3})\s*->\s*(\d{2}:\d{2}:\d{2}\.\d{3})\]"
 )
@@ -42,38 +48,275 @@ def parse_timestamp(ts: str, line_context: str = "") -> float:
     return hours * 3600 + minutes * 60 + seconds + milliseconds / 1000
 
 
-def parse_edited_file(filepath: Path) -> list[tuple[float, float]]:
-    segments = []
-    for line_num, line in enumerate(filepath.read_text().splitlines(), start=1):
-        line = line.strip()
-        if not line or line.startswith("#"):
-            continue
-        match = TIMESTAMP_RE.match(line)
-        if match:
-            line_context = f" (line {line_num})"
-            try:
-                start = parse_timestamp(match.group(1), line_context)
-                end = parse_timestamp(match.group(2), line_context)
-            except ValueError as e:
-                raise ValueError(f"Invalid timestamp in {filepath.name}{line_context}: {e}") from e
-
-            # Validate that start comes before end
-            if start >= end:
-                raise ValueError(
-                    f"Invalid segment in {filepath.name}{line_context}: "
-                    f"start time ({match.group(1)}) must be before end time ({match.group(2)})"
-                )
-
-            if segments and start < segments[-1][1]:
-                prev_end = segments[-1][1]
-                if start < segments[-1][0]:
-                    raise ValueError(
-                        f"Out-of-order segment in {filepath.name}{line_context}: "
-                        f"segment starts at {match.group(1)} which is before the previous segment. "
-                        f"Reordering segments is not supported."
-                    )
-                # Merge overlapping/adjacent segments to prevent jitter
-                segments[-1] = (segments[-1][0], max(prev_end, end))
-            else:
-                segments.append((start, end))
-    return segments
+# Bytes of transcript read at a time by parse_edited_file.
+READ_BLOCK_BYTES = 1 << 20
+
+# The fixed-width line prefix vcut writes. Lines starting with it are decoded
+# in bulk; anything else goes through TIMESTAMP_RE one line at a time.
+_PREFIX = np.frombuffer(b"[00:00:00.000 -> 00:00:00.000]", dtype=np.uint8)
+_DIGITS = np.flatnonzero(_PREFIX == ord("0"))
+_LITERALS = np.flatnonzero(_PREFIX != ord("0"))
+# Milliseconds per digit of HH:MM:SS.mmm
+_PLACES = np.array([36_000_000, 3_600_000, 600_000, 60_000, 10_000, 1_000, 100, 10, 1], dtype=np.int64)
+_RADIX = np.array([2**62, 10, 6, 10, 6, 10, 10, 10, 10], dtype=np.int64)
+
+
+class IntervalSet:
+    """Segments of a cut list held as arrays rather than a list of tuples.
+
+    ``starts`` and ``ends`` are float64 seconds. ``source_ids`` indexes
+    ``sources``, where 0 means the main input. Indexing and iteration give
+    the same tuples ``parse_edited_file`` used to return, so an IntervalSet
+    can be used wherever a list of segments is expected.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, source_ids: np.ndarray | None = None, sources=(None,)):
+        self.starts = starts
+        self.ends = ends
+        self.source_ids = np.zeros(len(starts), dtype=np.int64) if source_ids is None else source_ids
+        self.sources = list(sources)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _segment(self, start: float, end: float, source_id: int) -> tuple:
+        return (start, end) if source_id == 0 else (start, end, self.sources[source_id])
+
+    def __getitem__(self, i: int) -> tuple:
+        return self._segment(float(self.starts[i]), float(self.ends[i]), int(self.source_ids[i]))
+
+    def __iter__(self):
+        for start, end, source_id in zip(self.starts.tolist(), self.ends.tolist(), self.source_ids.tolist()):
+            yield self._segment(start, end, source_id)
+
+    def __eq__(self, other) -> bool:
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"IntervalSet({list(self)!r})"
+
+
+def format_prefixes(starts: np.ndarray, ends: np.ndarray) -> list[str]:
+    """``[HH:MM:SS.mmm -> HH:MM:SS.mmm]`` for each start/end pair.
+
+    The writing counterpart of the bulk parser: digits for every line are
+    computed at once and laid into the fixed-width template.
+    """
+    if len(starts) == 0:
+        return []
+    ms = np.round(np.stack([np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64)], axis=1) * 1000)
+    ms = ms.astype(np.int64)
+    digits = ms[..., None] // _PLACES % _RADIX
+    fixed_width = (ms >= 0).all(axis=1) & (digits[..., 0] < 10).all(axis=1)
+    out = np.tile(_PREFIX, (len(ms), 1))
+    out[:, _DIGITS] = digits.reshape(len(ms), -1) + ord("0")
+    text = out.tobytes().decode("ascii")
+    width = len(_PREFIX)
+    prefixes = [text[i:i + width] for i in range(0, len(text), width)]
+    # 100+ hours or negative times do not fit the template
+    for i in np.flatnonzero(~fixed_width).tolist():
+        prefixes[i] = f"[{_format_ms(int(ms[i, 0]))} -> {_format_ms(int(ms[i, 1]))}]"
+    return prefixes
+
+
+def _format_ms(ms: int) -> str:
+    return f"{ms // 3_600_000:02d}:{ms // 60_000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def _seconds(ms: np.ndarray) -> np.ndarray:
+    # Same arithmetic as parse_timestamp, so results are bit-identical
+    return (ms // 1000).astype(np.float64) + (ms % 1000) / 1000
+
+
+def line_source(rest: str) -> str | None:
+    """Text between a line's timestamps and its ``|``, if any: a candidate source path."""
+    source, sep, _ = rest.partition("|")
+    return (source.strip() or None) if sep else None
+
+
+def _parse_line(line: str, line_num: int, filepath: Path, base_dir: Path) -> tuple[int, int, Path | None] | None:
+    """(start_ms, end_ms, source) of one line, or None for comments and text."""
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    match = TIMESTAMP_RE.match(line)
+    if not match:
+        return None
+    line_context = f" (line {line_num})"
+    try:
+        start = parse_timestamp(match.group(1), line_context)
+        end = parse_timestamp(match.group(2), line_context)
+    except ValueError as e:
+        raise ValueError(f"Invalid timestamp in {filepath.name}{line_context}: {e}") from e
+    if start >= end:
+        raise ValueError(
+            f"Invalid segment in {filepath.name}{line_context}: "
+            f"start time ({match.group(1)}) must be before end time ({match.group(2)})"
+        )
+
+    source = line_source(line[match.end():])
+    if source is not None:
+        path = (base_dir / source).resolve()
+        if path.is_file():
+            source = path
+        elif Path(source).suffix.lower() in VIDEO_SUFFIXES:
+            raise ValueError(f"Source not found in {filepath.name}{line_context}: {path}")
+        else:
+            source = None  # a "|" in the spoken text
+    return round(start * 1000), round(end * 1000), source
+
+
+def _read_blocks(f):
+    """Yield chunks of f that end on a line break."""
+    rest = b""
+    while block := f.read(READ_BLOCK_BYTES):
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        if cut:
+            yield block[:cut]
+        rest = block[cut:]
+    if rest:
+        yield rest + b"\n"
+
+
+def _parse_block(buf: bytes, first_line: int, filepath: Path, base_dir: Path, sources: dict):
+    """Parse complete lines; returns (line numbers, start ms, end ms, source ids, error)."""
+    arr = np.frombuffer(buf, dtype=np.uint8)
+    line_ends = np.flatnonzero(arr == ord("\n"))
+    line_starts = np.concatenate([[0], line_ends[:-1] + 1])
+    lengths = line_ends - line_starts
+
+    # Canonical lines: fixed prefix, valid digits, then end of line or "|"
+    cand = np.flatnonzero(lengths >= len(_PREFIX))
+    prefix = arr[line_starts[cand, None] + np.arange(len(_PREFIX))]
+    digits = prefix[:, _DIGITS].astype(np.int64) - ord("0")
+    after = arr[np.minimum(line_starts[cand, None] + [len(_PREFIX), len(_PREFIX) + 1], len(arr) - 1)]
+    ok = (
+        (prefix[:, _LITERALS] == _PREFIX[_LITERALS]).all(axis=1)
+        & ((digits >= 0) & (digits <= 9)).all(axis=1)
+        # Tens of minutes and seconds; larger values take the slow path to be reported
+        & (digits[:, [2, 4, 11, 13]] < 6).all(axis=1)
+        & (
+            (lengths[cand] == len(_PREFIX))
+            | (after[:, 0] == ord("|"))
+            | ((after[:, 0] == ord(" ")) & (after[:, 1] == ord("|")))
+        )
+    )
+    fast = cand[ok]
+    fast_start = digits[ok, :9] @ _PLACES
+    fast_end = digits[ok, 9:] @ _PLACES
+
+    handled = np.zeros(len(line_ends), dtype=bool)
+    handled[fast] = True
+    handled |= lengths == 0
+    handled[lengths > 0] |= arr[line_starts[lengths > 0]] == ord("#")
+
+    slow, error = [], None
+    for i in np.flatnonzero(~handled).tolist():
+        line = buf[line_starts[i]:line_ends[i]].decode(errors="replace")
+        try:
+            parsed = _parse_line(line, first_line + i, filepath, base_dir)
+        except ValueError as e:
+            error = (first_line + i, e)
+            break
+        if parsed is not None:
+            start, end, source = parsed
+            source_id = 0 if source is None else sources.setdefault(source, len(sources) + 1)
+            slow.append((i, start, end, source_id))
+
+    line_idx = np.concatenate([fast, np.array([s[0] for s in slow], dtype=np.int64)])
+    order = np.argsort(line_idx, kind="stable")
+    columns = (
+        line_idx + first_line,
+        np.concatenate([fast_start, np.array([s[1] for s in slow], dtype=np.int64)]),
+        np.concatenate([fast_end, np.array([s[2] for s in slow], dtype=np.int64)]),
+        np.concatenate([np.zeros(len(fast), dtype=np.int64), np.array([s[3] for s in slow], dtype=np.int64)]),
+    )
+    columns = tuple(c[order] for c in columns)
+    if error is not None:
+        keep = columns[0] < error[0]
+        columns = tuple(c[keep] for c in columns)
+    return (*columns, error, len(line_ends))
+
+
+def parse_edited_file(filepath: Path, base_dir: Path | None = None) -> IntervalSet:
+    """Segments kept in an edited transcript or cut list.
+
+    A line may name its source between the timestamps and the text, as in
+    ``[00:00:01.000 -> 00:00:04.000] episode2.mp4 | text``. Relative
+    sources are resolved against base_dir (default: the file's directory).
+    Overlapping segments are merged, and reordering is rejected, within each
+    run of lines from the same source.
+
+    The file is read in blocks. Lines in vcut's own fixed-width format are
+    decoded with NumPy a block at a time, and merging is done on the
+    resulting arrays, so word-level transcripts with millions of lines stay
+    fast and compact.
+    """
+    base_dir = base_dir or filepath.parent
+    sources: dict[Path, int] = {}
+    parts = []
+    error = None
+    first_line = 1
+    with filepath.open("rb") as f:
+        for block in _read_blocks(f):
+            *columns, error, n_lines = _parse_block(block, first_line, filepath, base_dir, sources)
+            parts.append(columns)
+            first_line += n_lines
+            if error is not None:
+                break
+
+    if parts:
+        line_nums, start_ms, end_ms, source_ids = (np.concatenate(c) for c in zip(*parts))
+        del parts
+    else:
+        line_nums = start_ms = end_ms = source_ids = np.zeros(0, dtype=np.int64)
+
+    # Report whichever problem comes first in the file
+    backwards = np.flatnonzero(start_ms >= end_ms)
+    if len(backwards) and (error is None or line_nums[backwards[0]] < error[0]):
+        i = backwards[0]
+        error = (line_nums[i], ValueError(
+            f"Invalid segment in {filepath.name} (line {line_nums[i]}): "
+            f"start time ({_format_ms(int(start_ms[i]))}) must be before end time ({_format_ms(int(end_ms[i]))})"
+        ))
+    if error is not None:
+        keep = line_nums < error[0]
+        line_nums, start_ms, end_ms, source_ids = line_nums[keep], start_ms[keep], end_ms[keep], source_ids[keep]
+
+    n = len(start_ms)
+    if n == 0:
+        if error is not None:
+            raise error[1]
+        return IntervalSet(np.zeros(0), np.zeros(0), sources=[None, *sources])
+
+    # A line joins the previous segment if it is from the same source and
+    # starts before that segment's end, i.e. the running maximum of ends
+    # within the source's run. Offsetting each run keeps the running maximum
+    # from leaking across runs.
+    run_break = source_ids[1:] != source_ids[:-1]
+    run = np.concatenate([[0], np.cumsum(run_break)])
+    offset = run * (int(end_ms.max()) + 1)
+    reach = np.maximum.accumulate(end_ms + offset) - offset
+    new_segment = np.concatenate([[True], run_break | (start_ms[1:] >= reach[:-1])])
+    first = np.flatnonzero(new_segment)
+    segment_start = start_ms[first][np.cumsum(new_segment) - 1]
+
+    reordered = np.flatnonzero(start_ms < segment_start)
+    if len(reordered):
+        i = reordered[0]
+        raise ValueError(
+            f"Out-of-order segment in {filepath.name} (line {line_nums[i]}): "
+            f"segment starts at {_format_ms(int(start_ms[i]))} which is before the previous segment. "
+            f"Reordering segments is not supported."
+        )
+    if error is not None:
+        raise error[1]
+
+    last = np.concatenate([first[1:] - 1, [n - 1]])
+    return IntervalSet(
+        _seconds(start_ms[first]), _seconds(reach[last]), source_ids[first], [None, *sources],
+    )
@@ -0,0 +1,27 @@
+import hashlib
+from pathlib import Path
+
+# Bytes hashed from each sampled region of a file.
+SAMPLE_SIZE = 1 << 20
+# Regions sampled between the head and tail of large files.
+SAMPLE_COUNT = 8
+
+
+def content_hash(path: Path) -> str:
+    """Return a hex digest identifying the contents of a media file.
+
+    Hashing a multi-GB video end to end takes longer than most of what vcut
+    does with it, so this hashes the size plus evenly spaced 1 MiB samples
+    (always including the head and tail). Small files are hashed in full.
+    """
+    size = path.stat().st_size
+    digest = hashlib.sha256(str(size).encode())
+    with path.open("rb") as f:
+        if size <= SAMPLE_SIZE * (SAMPLE_COUNT + 2):
+            digest.update(f.read())
+        else:
+            step = (size - SAMPLE_SIZE) // (SAMPLE_COUNT + 1)
+            for i in range(SAMPLE_COUNT + 2):
+                f.seek(i * step)
+                digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
@@ -0,0 +1,365 @@
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from rich.console import Console
+from rich.markup import escape
+
+from vcut.cache import cache_root
+
+console = Console()
+
+JOB_KINDS = ("transcribe", "render")
+# Jobs of each kind one worker runs at once: one model in memory, several ffmpegs
+DEFAULT_SLOTS = {"transcribe": 1, "render": 4}
+# A failed job's n-th retry waits n times this long
+RETRY_DELAY_SECONDS = 10.0
+POLL_SECONDS = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    args TEXT NOT NULL,
+    cwd TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 1,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs(state, kind, priority DESC, id);
+CREATE TABLE IF NOT EXISTS runs (
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    attempt INTEGER NOT NULL,
+    worker TEXT NOT NULL,
+    started REAL NOT NULL,
+    finished REAL,
+    exit_code INTEGER,
+    cpu_seconds REAL,
+    max_rss INTEGER,
+    PRIMARY KEY (job_id, attempt)
+);
+"""
+
+
+def queue_path() -> Path:
+    """$VCUT_QUEUE, else queue.sqlite3 in the cache dir."""
+    if os.environ.get("VCUT_QUEUE"):
+        return Path(os.environ["VCUT_QUEUE"])
+    return cache_root() / "queue.sqlite3"
+
+
+def logs_dir(path: Path) -> Path:
+    return path.parent / f"{path.stem}-logs"
+
+
+def open_queue(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Job:
+    def __init__(self, id: int, kind: str, args: list[str], cwd: str, attempts: int, max_attempts: int):
+        self.id = id
+        self.kind = kind
+        self.args = args
+        self.cwd = cwd
+        self.attempts = attempts
+        self.max_attempts = max_attempts
+
+    def command(self) -> list[str]:
+        """The vcut invocation that runs this job."""
+        return [sys.executable, "-m", "vcut", self.kind, *self.args]
+
+    def describe(self) -> str:
+        return " ".join([self.kind, *self.args])
+
+
+def add_job(
+    conn: sqlite3.Connection, kind: str, args: list[str], cwd: Path, priority: int = 0, retries: int = 0,
+) -> int:
+    """Queue ``vcut <kind> <args>`` to run in cwd; returns the job id."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown job kind '{kind}' (expected one of: {', '.join(JOB_KINDS)})")
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO jobs (kind, args, cwd, priority, max_attempts, created) VALUES (?, ?, ?, ?, ?, ?)",
+            (kind, json.dumps(args), str(cwd), priority, retries + 1, time.time()),
+        )
+    return cursor.lastrowid
+
+
+def claim_job(conn: sqlite3.Connection, kind: str, worker: str) -> Job | None:
+    """Mark the most urgent ready job of kind as running and return it.
+
+    Highest priority first, then oldest. The claim is a single UPDATE, so
+    two workers sharing the queue never take the same job.
+    """
+    now = time.time()
+    with conn:
+        row = conn.execute(
+            "UPDATE jobs SET state = 'running', attempts = attempts + 1, error = NULL "
+            "WHERE id = (SELECT id FROM jobs WHERE state = 'queued' AND kind = ? AND not_before <= ? "
+            "            ORDER BY priority DESC, id LIMIT 1) "
+            "RETURNING id, kind, args, cwd, attempts, max_attempts",
+            (kind, now),
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute(
+            "INSERT INTO runs (job_id, attempt, worker, started) VALUES (?, ?, ?, ?)",
+            (row[0], row[4], worker, now),
+        )
+    return Job(row[0], row[1], json.loads(row[2]), row[3], row[4], row[5])
+
+
+def finish_job(
+    conn: sqlite3.Connection,
+    job: Job,
+    exit_code: int,
+    error: str | None = None,
+    cpu_seconds: float | None = None,
+    max_rss: int | None = None,
+) -> str:
+    """Record a finished attempt; returns the job's new state.
+
+    A failed job with attempts left goes back to the queue after
+    ``RETRY_DELAY_SECONDS`` times the attempts made so far.
+    """
+    if exit_code == 0:
+        state, not_before = "done", 0.0
+    elif job.attempts < job.max_attempts:
+        state, not_before = "queued", time.time() + RETRY_DELAY_SECONDS * job.attempts
+    else:
+        state, not_before = "failed", 0.0
+    with conn:
+        conn.execute(
+            "UPDATE runs SET finished = ?, exit_code = ?, cpu_seconds = ?, max_rss = ? WHERE job_id = ? AND attempt = ?",
+            (time.time(), exit_code, cpu_seconds, max_rss, job.id, job.attempts),
+        )
+        conn.execute(
+            "UPDATE jobs SET state = ?, not_before = ?, error = ? WHERE id = ?",
+            (state, not_before, error, job.id),
+        )
+    return state
+
+
+def release_job(conn: sqlite3.Connection, job: Job) -> None:
+    """Put a job that was interrupted, not failed, back without using up an attempt."""
+    with conn:
+        conn.execute("DELETE FROM runs WHERE job_id = ? AND attempt = ?", (job.id, job.attempts))
+        conn.execute(
+            "UPDATE jobs SET state = 'queued', attempts = attempts - 1 WHERE id = ? AND state = 'running'",
+            (job.id,),
+        )
+
+
+def recover_stale(conn: sqlite3.Connection) -> int:
+    """Fail the running attempts of workers on this host that no longer exist.
+
+    Those jobs are then retried or failed like any other failure. Returns
+    how many attempts were recovered.
+    """
+    host = socket.gethostname()
+    stale = []
+    for job_id, attempt, worker in conn.execute(
+        "SELECT job_id, attempt, worker FROM runs WHERE finished IS NULL",
+    ).fetchall():
+        worker_host, _, pid = worker.rpartition(":")
+        if worker_host == host and not _pid_alive(int(pid)):
+            stale.append((job_id, attempt))
+    for job_id, attempt in stale:
+        row = conn.execute("SELECT kind, args, cwd, max_attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finish_job(conn, Job(job_id, row[0], json.loads(row[1]), row[2], attempt, row[3]), -1, "Worker exited")
+    return len(stale)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def list_jobs(conn: sqlite3.Connection, limit: int | None = None) -> list[dict]:
+    """Newest first, with the latest attempt's timings."""
+    rows = conn.execute(
+        "SELECT j.id, j.kind, j.args, j.priority, j.state, j.attempts, j.max_attempts, j.created, j.error, "
+        "       r.started, r.finished, r.cpu_seconds, r.max_rss, "
+        "       (SELECT MIN(started) FROM runs WHERE job_id = j.id) "
+        "FROM jobs j LEFT JOIN runs r ON r.job_id = j.id AND r.attempt = j.attempts "
+        "ORDER BY j.id DESC LIMIT ?",
+        (-1 if limit is None else limit,),
+    ).fetchall()
+    jobs = []
+    for (job_id, kind, args, priority, state, attempts, max_attempts, created, error,
+         started, finished, cpu_seconds, max_rss, first_started) in rows:
+        jobs.append({
+            "id": job_id,
+            "kind": kind,
+            "args": json.loads(args),
+            "priority": priority,
+            "state": state,
+            "attempts": attempts,
+            "max_attempts": max_attempts,
+            "error": error,
+            "waited": (first_started or time.time()) - created,
+            "ran": (finished or time.time()) - started if started and state != "queued" else None,
+            "cpu_seconds": cpu_seconds,
+            "max_rss": max_rss,
+        })
+    return jobs
+
+
+def kind_stats(conn: sqlite3.Connection) -> dict[str, dict]:
+    """Per kind: job counts by state and the mean/max wait and run time of finished jobs."""
+    stats = {}
+    for kind, state, count in conn.execute("SELECT kind, state, COUNT(*) FROM jobs GROUP BY kind, state"):
+        stats.setdefault(kind, {"queued": 0, "running": 0, "done": 0, "failed": 0})[state] = count
+    for kind, mean_wait, mean_run, max_run in conn.execute(
+        "SELECT j.kind, AVG(first.started - j.created), AVG(r.finished - r.started), MAX(r.finished - r.started) "
+        "FROM jobs j "
+        "JOIN runs r ON r.job_id = j.id AND r.attempt = j.attempts "
+        "JOIN (SELECT job_id, MIN(started) AS started FROM runs GROUP BY job_id) first ON first.job_id = j.id "
+        "WHERE j.state = 'done' GROUP BY j.kind"
+    ):
+        stats[kind].update(mean_wait=mean_wait, mean_run=mean_run, max_run=max_run)
+    return stats
+
+
+def _last_line(path: Path, offset: int) -> str | None:
+    """The last non-blank line written to path since offset."""
+    try:
+        with path.open("rb") as f:
+            f.seek(offset)
+            lines = [line.strip() for line in f.read().decode(errors="replace").splitlines() if line.strip()]
+    except FileNotFoundError:
+        return None
+    return lines[-1] if lines else None
+
+
+def _maxrss_bytes(rusage) -> int:
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    return rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+
+
+class Worker:
+    """Runs queued jobs, up to ``slots[kind]`` of each kind at a time.
+
+    Each job runs as its own ``python -m vcut <kind> <args>`` process in the
+    directory it was queued from, with stdin closed and its output appended
+    to ``<id>.log`` in the queue's log directory. Exit code, wall and CPU
+    time and peak memory are recorded per attempt.
+    """
+
+    def __init__(self, path: Path, slots: dict[str, int] | None = None, poll: float = POLL_SECONDS):
+        self.path = path
+        self.slots = dict(DEFAULT_SLOTS if slots is None else slots)
+        self.poll = poll
+        self.name = worker_name()
+        self.conn = open_queue(path)
+        self.logs = logs_dir(path)
+        # pid -> (process, job, log path, log offset at start)
+        self.running: dict[int, tuple[subprocess.Popen, Job, Path, int]] = {}
+
+    def start(self, job: Job) -> None:
+        self.logs.mkdir(parents=True, exist_ok=True)
+        log_path = self.logs / f"{job.id}.log"
+        with log_path.open("ab") as log:
+            log.write(f"--- attempt {job.attempts}/{job.max_attempts} on {self.name}: vcut {job.describe()}\n".encode())
+            log.flush()
+            offset = log.tell()
+            try:
+                proc = subprocess.Popen(
+                    job.command(), cwd=job.cwd, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+                )
+            except OSError as e:
+                finish_job(self.conn, job, -1, str(e))
+                console.print(f"[bold red]Job {job.id} failed:[/] {e}")
+                return
+        self.running[proc.pid] = (proc, job, log_path, offset)
+        console.print(f"[bold]Started job {job.id}[/] [dim]{escape(job.describe())}[/]")
+
+    def reap(self) -> None:
+        """Record every job process that has exited."""
+        for pid in list(self.running):
+            waited, status, rusage = os.wait4(pid, os.WNOHANG)
+            if waited == 0:
+                continue
+            proc, job, log_path, offset = self.running.pop(pid)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            error = None if proc.returncode == 0 else _last_line(log_path, offset) or f"Exit code {proc.returncode}"
+            state = finish_job(
+                self.conn, job, proc.returncode, error,
+                rusage.ru_utime + rusage.ru_stime, _maxrss_bytes(rusage),
+            )
+            if state == "done":
+                console.print(f"[bold green]Finished job {job.id}[/]")
+            elif state == "queued":
+                console.print(f"[yellow]Job {job.id} failed, will retry:[/] {escape(error)}")
+            else:
+                console.print(f"[bold red]Job {job.id} failed:[/] {escape(error)} [dim]({log_path})[/]")
+
+    def fill(self) -> None:
+        """Start ready jobs while their kind has free slots."""
+        for kind, slots in self.slots.items():
+            while sum(job.kind == kind for _, job, _, _ in self.running.values()) < slots:
+                job = claim_job(self.conn, kind, self.name)
+                if job is None:
+                    break
+                self.start(job)
+
+    def pending(self) -> bool:
+        """Whether any job this worker could run is queued, ready or waiting to retry."""
+        kinds = [kind for kind, slots in self.slots.items() if slots > 0]
+        placeholders = ", ".join("?" * len(kinds))
+        row = self.conn.execute(
+            f"SELECT 1 FROM jobs WHERE state = 'queued' AND kind IN ({placeholders}) LIMIT 1", kinds,
+        ).fetchone()
+        return row is not None
+
+    def run(self, drain: bool = False) -> None:
+        """Work until interrupted or, with ``drain``, until nothing is left to do.
+
+        On Ctrl-C the running jobs are stopped and put back in the queue
+        without counting the attempt.
+        """
+        recovered = recover_stale(self.conn)
+        if recovered:
+            console.print(f"[yellow]Recovered {recovered} jobs from workers that exited[/]")
+        slots = ", ".join(f"{slots} {kind}" for kind, slots in self.slots.items())
+        console.print(f"[bold green]Worker {self.name}[/] on {self.path} [dim]({slots} slots; Ctrl-C to stop)[/]")
+        try:
+            while True:
+                self.reap()
+                self.fill()
+                if drain and not self.running and not self.pending():
+                    break
+                time.sleep(self.poll)
+        except KeyboardInterrupt:
+            for proc, job, _, _ in self.running.values():
+                proc.terminate()
+            for proc, job, _, _ in self.running.values():
+                proc.wait()
+                release_job(self.conn, job)
+            console.print(f"Stopped; {len(self.running)} running jobs put back in the queue.")
+            self.running.clear()
+        finally:
+            self.conn.close()
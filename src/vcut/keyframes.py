@@ -0,0 +1,172 @@
+import mmap
+import os
+import struct
+import subprocess
+import sys
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+from vcut import trace
+from vcut.fingerprint import content_hash
+
+INDEX_SUFFIX = ".vcutidx"
+INDEX_MAGIC = b"VCUTIDX1"
+# magic, source size, source mtime_ns, content hash, packet count, keyframe count
+HEADER = struct.Struct("<8sQq32sQQ")
+
+# Keyframe times from ffprobe are rounded to microseconds; treat anything
+# closer than this as landing on the keyframe.
+KEYFRAME_EPSILON = 0.001
+
+
+def probe_packets(input_video: Path) -> tuple[list[float], list[float]]:
+    """Return sorted (packet times, keyframe times) for the first video stream.
+
+    Reads packet headers only, so no frames are decoded.
+    """
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "packet=pts_time,flags",
+            "-of", "csv=p=0",
+            str(input_video),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    packets, keyframes = [], []
+    for line in result.stdout.splitlines():
+        pts, _, flags = line.partition(",")
+        if pts in ("", "N/A"):
+            continue
+        packets.append(float(pts))
+        if "K" in flags:
+            keyframes.append(float(pts))
+    return sorted(packets), sorted(keyframes)
+
+
+class KeyframeIndex:
+    """Packet and keyframe times of a video's first video stream.
+
+    ``packets`` and ``keyframes`` are sorted sequences of seconds. When the
+    index was loaded from a sidecar they are views into a read-only memory
+    map, so reopening the index of a long recording costs no parsing.
+    """
+
+    def __init__(self, packets, keyframes, _mmap: mmap.mmap | None = None):
+        self.packets = packets
+        self.keyframes = keyframes
+        self._mmap = _mmap
+
+    def prev_keyframe(self, t: float) -> float:
+        """Latest keyframe at or before t.
+
+        Falls back to the first keyframe before the stream starts, and to t
+        itself when there are no keyframes at all (e.g. audio-only files).
+        """
+        if not self.keyframes:
+            return t
+        i = bisect_right(self.keyframes, t + KEYFRAME_EPSILON) - 1
+        return self.keyframes[max(i, 0)]
+
+    def next_keyframe(self, t: float) -> float | None:
+        """Earliest keyframe at or after t, or None past the last one."""
+        i = bisect_left(self.keyframes, t - KEYFRAME_EPSILON)
+        return self.keyframes[i] if i < len(self.keyframes) else None
+
+    def frames_between(self, start: float, end: float) -> int:
+        """Number of video packets presented in [start, end)."""
+        return (
+            bisect_left(self.packets, end - KEYFRAME_EPSILON)
+            - bisect_left(self.packets, start - KEYFRAME_EPSILON)
+        )
+
+    def copy_drift(self, segments: list[tuple[float, float]]) -> list[float]:
+        """Seconds each segment start moves back when cut by stream copy."""
+        return [start - self.prev_keyframe(start) for start, _ in segments]
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self.packets.release()
+            self.keyframes.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def index_path_for(video_path: Path) -> Path:
+    return video_path.with_name(video_path.name + INDEX_SUFFIX)
+
+
+def write_index(path: Path, video_path: Path, packets: list[float], keyframes: list[float]) -> None:
+    stat = video_path.stat()
+    header = HEADER.pack(
+        INDEX_MAGIC, stat.st_size, stat.st_mtime_ns,
+        bytes.fromhex(content_hash(video_path)), len(packets), len(keyframes),
+    )
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(header)
+        f.write(struct.pack(f"<{len(packets)}d", *packets))
+        f.write(struct.pack(f"<{len(keyframes)}d", *keyframes))
+    os.replace(tmp, path)
+
+
+def read_index(path: Path, video_path: Path) -> KeyframeIndex | None:
+    """Memory-map a sidecar index, or return None if it is missing or stale.
+
+    An index is fresh when the video's size and mtime match. If only the
+    mtime differs (e.g. the file was copied), the content hash decides.
+    """
+    try:
+        f = path.open("rb")
+    except OSError:
+        return None
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return None
+    if len(mm) < HEADER.size:
+        mm.close()
+        return None
+    magic, size, mtime_ns, digest, n_packets, n_keyframes = HEADER.unpack_from(mm)
+    stat = video_path.stat()
+    fresh = (
+        magic == INDEX_MAGIC
+        and size == stat.st_size
+        and len(mm) == HEADER.size + 8 * (n_packets + n_keyframes)
+        and (mtime_ns == stat.st_mtime_ns or digest.hex() == content_hash(video_path))
+    )
+    if not fresh:
+        mm.close()
+        return None
+    if sys.byteorder != "little":
+        times = struct.unpack_from(f"<{n_packets + n_keyframes}d", mm, HEADER.size)
+        mm.close()
+        return KeyframeIndex(list(times[:n_packets]), list(times[n_packets:]))
+    data = memoryview(mm)[HEADER.size:]
+    packets = data[:8 * n_packets].cast("d")
+    keyframes = data[8 * n_packets:].cast("d")
+    data.release()
+    return KeyframeIndex(packets, keyframes, mm)
+
+
+def load_index(video_path: Path) -> KeyframeIndex:
+    """Return the keyframe index for video_path, building it on first use.
+
+    The index is stored next to the video as ``<name>.vcutidx``. If that
+    location is not writable the index is still returned, just not saved.
+    """
+    sidecar = index_path_for(video_path)
+    index = read_index(sidecar, video_path)
+    if index is not None:
+        return index
+    with trace.span("probe keyframes", "render", video=str(video_path)):
+        packets, keyframes = probe_packets(video_path)
+    try:
+        write_index(sidecar, video_path, packets, keyframes)
+    except OSError:
+        pass
+    return KeyframeIndex(packets, keyframes)
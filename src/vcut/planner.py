@@ -0,0 +1,168 @@
+from collections.abc import Callable
+from pathlib import Path
+
+from vcut.keyframes import KEYFRAME_EPSILON, KeyframeIndex
+from vcut.render import PRESEEK_SECONDS, smart_pieces
+
+# Rough costs in seconds of ffmpeg time. They are only used to compare plans
+# against each other, not to predict wall time precisely.
+FFMPEG_STARTUP_SECONDS = 0.15  # process start, probe and muxer setup
+CONCAT_ENTRY_SECONDS = 0.01
+COPY_SECONDS_PER_SECOND = 0.002
+DECODE_SECONDS_PER_SECOND = 0.05
+ENCODE_SECONDS_PER_SECOND = 0.5
+
+MODES = ("copy", "smart", "reencode")
+
+
+def segment_cost(start: float, end: float, mode: str, index: KeyframeIndex | None) -> tuple[float, int]:
+    """Estimated (ffmpeg seconds, ffmpeg runs) to extract one segment.
+
+    Mirrors how ``render`` cuts: stream copy starts at the previous keyframe,
+    re-encodes decode from their seek point, and smart cut re-encodes only
+    the partial GOPs at either end.
+    """
+    if mode == "smart" and index is not None:
+        pieces = smart_pieces(start, end, index)
+    else:
+        pieces = [(start, end, mode != "copy")]
+    cost = 0.0
+    for piece_start, piece_end, reencode in pieces:
+        cost += FFMPEG_STARTUP_SECONDS + CONCAT_ENTRY_SECONDS
+        if reencode:
+            if index is not None and index.keyframes:
+                seek = index.prev_keyframe(piece_start)
+            else:
+                seek = max(0.0, piece_start - PRESEEK_SECONDS)
+            cost += (piece_start - seek) * DECODE_SECONDS_PER_SECOND
+            cost += (piece_end - piece_start) * ENCODE_SECONDS_PER_SECOND
+        else:
+            if mode == "copy" and index is not None:
+                piece_start = index.prev_keyframe(piece_start)
+            cost += (piece_end - piece_start) * COPY_SECONDS_PER_SECOND
+    return cost, len(pieces)
+
+
+class PlannedSegment:
+    def __init__(self, start: float, end: float, source: Path | None):
+        self.start = start
+        self.end = end
+        self.source = source
+        self.notes: list[str] = []
+
+    def as_tuple(self) -> tuple:
+        return (self.start, self.end) if self.source is None else (self.start, self.end, self.source)
+
+
+class Plan:
+    """Segments to hand to ``render`` plus what the planner changed and why.
+
+    ``added`` is the total seconds of unwanted footage kept by bridging and
+    padding, ``dropped`` the segments removed for being too short.
+    ``cost``/``runs`` are estimates for the plan, ``original_cost`` and
+    ``original_runs`` for the segments as parsed.
+    """
+
+    def __init__(self, segments, dropped, added, estimate, original_estimate):
+        self.segments: list[PlannedSegment] = segments
+        self.dropped: list[PlannedSegment] = dropped
+        self.added: float = added
+        self.cost, self.runs = estimate
+        self.original_cost, self.original_runs = original_estimate
+
+    def render_segments(self) -> list[tuple]:
+        return [seg.as_tuple() for seg in self.segments]
+
+
+def _cost(seg: PlannedSegment, mode: str, index_for) -> float:
+    return segment_cost(seg.start, seg.end, mode, index_for(seg.source))[0]
+
+
+def _estimate(segments: list[PlannedSegment], mode: str, index_for) -> tuple[float, int]:
+    cost, runs = 0.0, 0
+    for seg in segments:
+        seg_cost, seg_runs = segment_cost(seg.start, seg.end, mode, index_for(seg.source))
+        cost += seg_cost
+        runs += seg_runs
+    return cost, runs
+
+
+def plan_render(
+    segments,
+    mode: str,
+    index_for: Callable[[Path | None], KeyframeIndex | None],
+    min_gap: float = 0.0,
+    min_segment: float = 0.0,
+) -> Plan:
+    """Coalesce a cut list into fewer, cheaper ffmpeg runs.
+
+    ``segments`` are as returned by ``parse_edited_file``; ``index_for``
+    maps a source (None for the main input) to its keyframe index. The
+    policy bounds how far the output may differ from the cut list:
+
+    - Gaps shorter than ``min_gap`` between segments from the same source are
+      bridged, and in smart mode a cut within ``min_gap`` of a keyframe is
+      moved onto it so that GOP is copied instead of re-encoded. Either is
+      only done when the cost model says it saves time.
+    - Segments still shorter than ``min_segment`` afterwards are dropped.
+
+    With both at zero the plan is the cut list unchanged.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown render mode '{mode}'")
+
+    planned = [PlannedSegment(seg[0], seg[1], seg[2] if len(seg) > 2 else None) for seg in segments]
+    original_estimate = _estimate(planned, mode, index_for)
+    added = 0.0
+
+    # Bridge short gaps. Stream copy already starts each segment at its
+    # keyframe, so only the footage between that and the previous end is new.
+    bridged: list[PlannedSegment] = []
+    for seg in planned:
+        prev = bridged[-1] if bridged else None
+        gap = None
+        if prev is not None and prev.source == seg.source:
+            index = index_for(seg.source)
+            start = index.prev_keyframe(seg.start) if mode == "copy" and index is not None else seg.start
+            gap = start - prev.end
+        if gap is not None and min_gap > 0 and gap < min_gap:
+            merged = PlannedSegment(prev.start, seg.end, seg.source)
+            if _cost(merged, mode, index_for) <= _cost(prev, mode, index_for) + _cost(seg, mode, index_for):
+                prev.end = seg.end
+                prev.notes.append(f"bridged {gap:.2f}s gap" if gap > 0 else "joined at keyframe")
+                added += max(gap, 0.0)
+                continue
+        bridged.append(seg)
+
+    # Smart cut: move cuts out to nearby keyframes so edge GOPs are copied
+    if mode == "smart" and min_gap > 0:
+        for i, seg in enumerate(bridged):
+            index = index_for(seg.source)
+            if index is None or not index.keyframes:
+                continue
+            prev = bridged[i - 1] if i > 0 and bridged[i - 1].source == seg.source else None
+            nxt = bridged[i + 1] if i + 1 < len(bridged) and bridged[i + 1].source == seg.source else None
+
+            keyframe = index.prev_keyframe(seg.start)
+            lead = seg.start - keyframe
+            if KEYFRAME_EPSILON < lead < min_gap and (prev is None or keyframe >= prev.end):
+                padded = PlannedSegment(keyframe, seg.end, seg.source)
+                if _cost(padded, mode, index_for) < _cost(seg, mode, index_for):
+                    seg.start = keyframe
+                    seg.notes.append(f"start padded {lead:.2f}s to keyframe")
+                    added += lead
+
+            keyframe = index.next_keyframe(seg.end)
+            trail = keyframe - seg.end if keyframe is not None else None
+            if trail is not None and KEYFRAME_EPSILON < trail < min_gap and (nxt is None or keyframe <= nxt.start):
+                padded = PlannedSegment(seg.start, keyframe, seg.source)
+                if _cost(padded, mode, index_for) < _cost(seg, mode, index_for):
+                    seg.end = keyframe
+                    seg.notes.append(f"end padded {trail:.2f}s to keyframe")
+                    added += trail
+
+    # Drop what is still too short to be worth a run
+    kept = [seg for seg in bridged if seg.end - seg.start >= min_segment]
+    dropped = [seg for seg in bridged if seg.end - seg.start < min_segment]
+
+    return Plan(kept, dropped, added, _estimate(kept, mode, index_for), original_estimate)
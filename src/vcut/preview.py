@@ -0,0 +1,203 @@
+import math
+import re
+import subprocess
+import threading
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from rich.console import Console
+from rich.markup import escape
+
+from vcut import trace
+from vcut.editor import parse_edited_file
+from vcut.keyframes import KEYFRAME_EPSILON, KeyframeIndex
+from vcut.watch import file_signature
+
+console = Console()
+
+DEFAULT_PORT = 8765
+# Cuts are split into fragments at the first keyframe at least this far in
+FRAGMENT_SECONDS = 4.0
+FRAGMENT_RE = re.compile(r"^/fragment/(\d+)/(\d+\.\d+)-(\d+\.\d+)\.ts$")
+
+
+def fragments(start: float, end: float, index: KeyframeIndex | None) -> list[tuple[float, float]]:
+    """Stream-copyable pieces covering one cut, as (start, end) pairs.
+
+    Like a stream-copy render, the first piece starts at the keyframe at or
+    before ``start``. Longer cuts are split at keyframes about every
+    ``FRAGMENT_SECONDS`` so playback can start before the whole cut is read.
+    """
+    if index is None or not index.keyframes:
+        return [(start, end)]
+    pieces = []
+    piece_start = index.prev_keyframe(start)
+    while True:
+        keyframe = index.next_keyframe(piece_start + FRAGMENT_SECONDS)
+        if keyframe is None or keyframe >= end - KEYFRAME_EPSILON:
+            break
+        pieces.append((piece_start, keyframe))
+        piece_start = keyframe
+    pieces.append((piece_start, end))
+    return pieces
+
+
+def fragment_command(source: Path, start: float, end: float, frames: int | None = None) -> list[str]:
+    """ffmpeg remuxing [start, end) of source to MPEG-TS on stdout.
+
+    ``-copyts`` keeps the source's timestamps, so consecutive fragments of
+    one cut play back seamlessly; ``frames`` stops exactly before the next
+    fragment's keyframe.
+    """
+    return [
+        "ffmpeg", "-v", "error", "-nostdin",
+        "-ss", f"{start:.6f}",
+        # An input -t: with -copyts an output -t would count from zero, not from start
+        "-t", f"{end - start:.6f}",
+        "-i", str(source),
+        *(["-frames:v", str(frames)] if frames is not None else []),
+        "-map", "0:v:0?", "-map", "0:a:0?",
+        "-c", "copy", "-copyts",
+        "-f", "mpegts", "pipe:1",
+    ]
+
+
+class Timeline:
+    """The edited transcript as an HLS playlist, rebuilt whenever the file changes.
+
+    Each cut becomes one or more MPEG-TS fragments remuxed from its source
+    on request, with a discontinuity between cuts. Only sources named in
+    the transcript can be fetched, by their number in ``sources``.
+    """
+
+    def __init__(
+        self,
+        input_path: Path,
+        transcript: Path,
+        index_for: Callable[[Path], KeyframeIndex | None],
+    ):
+        self.input_path = input_path
+        self.transcript = transcript
+        self.index_for = index_for
+        self.sources: list[Path] = [input_path]
+        self._ids = {input_path.resolve(): 0}
+        self._signature = None
+        self._playlist: str | None = None
+        self._lock = threading.Lock()
+
+    def playlist(self) -> str:
+        """The current playlist; a transcript that fails to parse keeps the last good one."""
+        with self._lock:
+            signature = file_signature(self.transcript)
+            if self._playlist is None or signature != self._signature:
+                self._signature = signature
+                try:
+                    segments = parse_edited_file(self.transcript, base_dir=self.transcript.parent)
+                except ValueError as e:
+                    if self._playlist is None:
+                        raise
+                    console.print(f"[bold red]Error:[/] {e} [dim](still serving the previous edit)[/]")
+                else:
+                    with trace.span("build playlist", "preview", segments=len(segments)):
+                        self._playlist = self._build(segments)
+                    console.print(f"[bold]Playlist updated:[/] {len(segments)} segments")
+            return self._playlist
+
+    def _source_id(self, source: Path) -> int:
+        source = source.resolve()
+        if source not in self._ids:
+            self._ids[source] = len(self.sources)
+            self.sources.append(source)
+        return self._ids[source]
+
+    def _build(self, segments) -> str:
+        entries = []
+        for seg in segments:
+            source = Path(seg[2]) if len(seg) > 2 else self.input_path
+            source_id = self._source_id(source)
+            pieces = fragments(seg[0], seg[1], self.index_for(self.sources[source_id]))
+            entries.append([(end - start, f"fragment/{source_id}/{start:.6f}-{end:.6f}.ts") for start, end in pieces])
+
+        target = max((math.ceil(duration) for cut in entries for duration, _ in cut), default=1)
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{target}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+            "#EXT-X-PLAYLIST-TYPE:VOD",
+        ]
+        for i, cut in enumerate(entries):
+            if i:
+                lines.append("#EXT-X-DISCONTINUITY")
+            for duration, uri in cut:
+                lines += [f"#EXTINF:{duration:.6f},", uri]
+        lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def fragment(self, source_id: int, start: float, end: float) -> bytes:
+        """Remux one fragment; raises KeyError for a source not in the transcript."""
+        with self._lock:
+            source = self.sources[source_id] if source_id < len(self.sources) else None
+        if source is None:
+            raise KeyError(source_id)
+        index = self.index_for(source)
+        frames = index.frames_between(start, end) if index is not None and index.packets else None
+        with trace.span("remux fragment", "preview", source=str(source), start=start, end=end) as info:
+            result = subprocess.run(fragment_command(source, start, end, frames), capture_output=True, check=True)
+            info["bytes"] = len(result.stdout)
+        return result.stdout
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        timeline = self.server.timeline
+        path = self.path.split("?", 1)[0]
+        try:
+            if path == "/playlist.m3u8":
+                body, content_type = timeline.playlist().encode(), "application/vnd.apple.mpegurl"
+            elif match := FRAGMENT_RE.match(path):
+                body = timeline.fragment(int(match[1]), float(match[2]), float(match[3]))
+                content_type = "video/mp2t"
+            else:
+                self.send_error(404)
+                return
+        except KeyError:
+            self.send_error(404)
+            return
+        except Exception as e:
+            console.print(f"[bold red]Error:[/] {escape(self.path)}: {e}")
+            self.send_error(500, explain=str(e))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PreviewServer(ThreadingHTTPServer):
+    """Serves ``/playlist.m3u8`` and the fragments it lists for one timeline."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], timeline: Timeline):
+        self.timeline = timeline
+        super().__init__(address, _Handler)
+
+
+def serve_preview(timeline: Timeline, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> None:
+    """Serve the timeline over HTTP until interrupted."""
+    timeline.playlist()
+    with PreviewServer((host, port), timeline) as server:
+        url = f"http://{host}:{server.server_address[1]}/playlist.m3u8"
+        console.print(f"[bold green]Serving[/] {url} [dim](Ctrl-C to stop)[/]")
+        console.print(f"[dim]Play it with: mpv {url}[/]")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,62 @@
+import os
+import subprocess
+from pathlib import Path
+
+from vcut import trace
+from vcut.cache import FileCache, cache_key, proxy_cache
+from vcut.fingerprint import content_hash
+
+# Proxies are scaled down to this height (never up) ...
+PROXY_HEIGHT = 540
+# ... with a keyframe this often, so stream-copy cuts land within this of the mark.
+PROXY_KEYFRAME_SECONDS = 0.5
+PROXY_CRF = 28
+
+
+def proxy_command(video_path: Path, out_path: Path, height: int = PROXY_HEIGHT) -> list[str]:
+    return [
+        "ffmpeg", "-y", "-v", "error", "-nostdin",
+        "-i", str(video_path),
+        "-map", "0:v:0", "-map", "0:a:0?",
+        "-vf", f"scale=-2:'min({height},ih)'",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", str(PROXY_CRF), "-pix_fmt", "yuv420p",
+        "-force_key_frames", f"expr:gte(t,n_forced*{PROXY_KEYFRAME_SECONDS})",
+        "-c:a", "aac", "-b:a", "128k",
+        "-movflags", "+faststart",
+        str(out_path),
+    ]
+
+
+def proxy_key(video_path: Path, height: int = PROXY_HEIGHT) -> str:
+    """Cache key from the video's content and the exact proxy settings."""
+    settings = proxy_command(Path("input"), Path("output"), height)
+    return cache_key("proxy", content_hash(video_path), settings)
+
+
+def find_proxy(video_path: Path, height: int = PROXY_HEIGHT, cache: FileCache | None = None) -> Path | None:
+    """The cached proxy of video_path, or None if none was made."""
+    return (cache or proxy_cache()).get(proxy_key(video_path, height))
+
+
+def make_proxy(video_path: Path, height: int = PROXY_HEIGHT, cache: FileCache | None = None) -> Path:
+    """Return video_path's proxy, encoding it first if it is not cached.
+
+    A proxy is an H.264/AAC MP4 at most ``height`` pixels tall with a
+    keyframe every ``PROXY_KEYFRAME_SECONDS``. It keeps the original's
+    timeline, so a transcript of either cuts both.
+    """
+    cache = cache or proxy_cache()
+    key = proxy_key(video_path, height)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    cache.root.mkdir(parents=True, exist_ok=True)
+    tmp = cache.root / f"{key}.{os.getpid()}.part.mp4"
+    try:
+        with trace.span("make proxy", "proxy", video=str(video_path)):
+            subprocess.run(proxy_command(video_path, tmp, height), capture_output=True, check=True)
+        path = cache.put(key, tmp)
+    finally:
+        tmp.unlink(missing_ok=True)
+    cache.prune()
+    return path
@@ -1,61 +1,415 @@
+import json
+import os
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, MofNCompleteColumn
 
+from vcut import trace
+from vcut.cache import FileCache, cache_key
+from vcut.fingerprint import content_hash
+from vcut.keyframes import KEYFRAME_EPSILON, KeyframeIndex, load_index
+
 console = Console()
 
+# How far before a re-encoded cut the input seek lands. Decoding this lead-in
+# is cheap and keeps the output seek accurate even with sparse keyframes.
+PRESEEK_SECONDS = 10.0
+
+# How often a running extraction checks whether its render was cancelled
+CANCEL_POLL_SECONDS = 0.1
+
+# ffprobe codec names mapped to the ffmpeg encoders used to re-encode
+# smart-cut boundaries in the source's own codec.
+VIDEO_ENCODERS = {
+    "h264": "libx264",
+    "hevc": "libx265",
+    "vp9": "libvpx-vp9",
+    "av1": "libsvtav1",
+    "mpeg4": "mpeg4",
+}
+AUDIO_ENCODERS = {
+    "aac": "aac",
+    "mp3": "libmp3lame",
+    "opus": "libopus",
+    "vorbis": "libvorbis",
+    "ac3": "ac3",
+    "flac": "flac",
+}
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def probe_streams(input_video: Path) -> dict[str, dict]:
+    """Return the first video and audio stream descriptions, keyed by type."""
+    with trace.span("probe streams", "render", video=str(input_video)):
+        result = subprocess.run(
+            [
+                "ffprobe", "-v", "error",
+                "-show_entries",
+                "stream=codec_type,codec_name,profile,pix_fmt,width,height,"
+                "r_frame_rate,time_base,sample_rate,channels",
+                "-of", "json",
+                str(input_video),
+            ],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    streams = {}
+    for stream in json.loads(result.stdout).get("streams", []):
+        streams.setdefault(stream.get("codec_type"), stream)
+    return streams
+
+
+def encoder_args(streams: dict[str, dict]) -> list[str]:
+    """ffmpeg output options that re-encode to match the probed streams.
+
+    Pieces encoded with these options can be concatenated with stream-copied
+    pieces of the same source.
+    """
+    args = []
+    video = streams.get("video")
+    if video:
+        codec = video["codec_name"]
+        if codec not in VIDEO_ENCODERS:
+            raise ValueError(f"Smart cut does not support video codec '{codec}'")
+        args += ["-c:v", VIDEO_ENCODERS[codec]]
+        if video.get("pix_fmt"):
+            args += ["-pix_fmt", video["pix_fmt"]]
+        if video.get("r_frame_rate") not in (None, "0/0"):
+            args += ["-r", video["r_frame_rate"]]
+        if codec == "h264" and video.get("profile") in ("Baseline", "Main", "High"):
+            args += ["-profile:v", video["profile"].lower()]
+        timescale = video.get("time_base", "").partition("/")[2]
+        if timescale:
+            args += ["-video_track_timescale", timescale]
+    audio = streams.get("audio")
+    if audio:
+        codec = audio["codec_name"]
+        if codec not in AUDIO_ENCODERS:
+            raise ValueError(f"Smart cut does not support audio codec '{codec}'")
+        args += ["-c:a", AUDIO_ENCODERS[codec]]
+        if audio.get("sample_rate"):
+            args += ["-ar", audio["sample_rate"]]
+        if audio.get("channels"):
+            args += ["-ac", str(audio["channels"])]
+    return args
+
+
+def stream_signature(streams: dict[str, dict]) -> tuple:
+    """Stream parameters that must agree for sources to be concatenated by copy."""
+    video = streams.get("video") or {}
+    audio = streams.get("audio") or {}
+    return (
+        tuple(video.get(k) for k in ("codec_name", "profile", "pix_fmt", "width", "height", "r_frame_rate", "time_base")),
+        tuple(audio.get(k) for k in ("codec_name", "sample_rate", "channels")),
+    )
+
+
+def normalize_args(streams: dict[str, dict], target: dict[str, dict]) -> tuple[list[str], list[str]]:
+    """Extra inputs and output options converting a source to ``target``'s streams.
+
+    Video is scaled to fit the target frame and letterboxed; a source with
+    no audio gets silence. The result concatenates with stream-copied
+    pieces of the target.
+    """
+    inputs, args = [], []
+    video, audio = target.get("video"), target.get("audio")
+    if video:
+        if "video" not in streams:
+            raise ValueError("source has no video stream")
+        w, h = video["width"], video["height"]
+        args += [
+            "-vf",
+            f"scale={w}:{h}:force_original_aspect_ratio=decrease,pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1",
+        ]
+    if audio and "audio" not in streams:
+        layout = "mono" if audio.get("channels") == 1 else "stereo"
+        inputs += ["-f", "lavfi", "-i", f"anullsrc=r={audio.get('sample_rate', 48000)}:cl={layout}"]
+        args += ["-map", "0:v:0", "-map", "1:a:0"]
+    elif not audio:
+        args += ["-an"]
+    return inputs, args + encoder_args(target)
+
+
+def smart_pieces(
+    start: float,
+    end: float,
+    index: KeyframeIndex,
+) -> list[tuple[float, float, bool]]:
+    """Split one segment into (start, end, reencode) pieces for smart cut.
+
+    Whole GOPs between the first keyframe at/after ``start`` and the last
+    keyframe at/before ``end`` are stream-copied; the partial GOPs on either
+    side are re-encoded. A segment that holds no complete GOP is re-encoded
+    in one piece.
+    """
+    copy_start = index.next_keyframe(start)
+    copy_end = index.prev_keyframe(end)
+    if copy_start is None or copy_start >= copy_end or copy_end > end + KEYFRAME_EPSILON:
+        return [(start, end, True)]
+
+    pieces = []
+    if copy_start - start > KEYFRAME_EPSILON:
+        pieces.append((start, copy_start, True))
+    pieces.append((copy_start, copy_end, False))
+    if end - copy_end > KEYFRAME_EPSILON:
+        pieces.append((copy_end, end, True))
+    return pieces
+
+
+def segment_command(
+    input_video: Path,
+    start: float,
+    end: float,
+    seg_path: Path,
+    reencode: bool,
+    encode_args: list[str] | None = None,
+    frames: int | None = None,
+    coarse: float | None = None,
+    extra_inputs: list[str] | None = None,
+    make_zero: bool = True,
+) -> list[str]:
+    # Pieces are concatenated end to end, so each must start at 0 and last
+    # exactly its frames. -avoid_negative_ts make_zero would shift a B-frame
+    # stream's first frame off 0; the mp4 edit list keeps it there instead.
+    # Without an index, stream copy still needs the shift: its lead-in
+    # before the seek point has negative timestamps.
+    if reencode:
+        # Coarse -ss before -i jumps near the cut without decoding from zero
+        # (ideally straight to the previous keyframe), then -ss after -i
+        # trims the remaining lead-in frame-accurately.
+        if coarse is None or coarse > start:
+            coarse = max(0.0, start - PRESEEK_SECONDS)
+        return [
+            "ffmpeg", "-y",
+            "-ss", str(coarse),
+            "-i", str(input_video),
+            *(extra_inputs or []),
+            "-ss", str(round(start - coarse, 6)),
+            "-t", str(end - start),
+            *(["-frames:v", str(frames)] if frames is not None else []),
+            *(encode_args or []),
+            str(seg_path),
+        ]
+    # -ss before -i for fast keyframe seek, -c copy
+    return [
+        "ffmpeg", "-y",
+        "-ss", str(start),
+        "-i", str(input_video),
+        "-t", str(end - start),
+        # Stream copy with -t alone can spill into the next GOP; an exact
+        # frame count stops at the last frame before the next keyframe.
+        *(["-frames:v", str(frames)] if frames is not None else []),
+        "-c", "copy",
+        *(["-avoid_negative_ts", "make_zero"] if make_zero else []),
+        str(seg_path),
+    ]
+
+
+class RenderCancelled(Exception):
+    """A render stopped early because its ``cancel`` event was set."""
+
+
+def _run_unless_cancelled(
+    cmd: list[str], cancelled: threading.Event, trace_args: dict | None = None, cancel: threading.Event | None = None,
+) -> bool:
+    """Run one extraction unless the render was cancelled; True if it finished.
+
+    Either event also stops an extraction already running: its ffmpeg is
+    killed and the partial piece deleted, so it is never cached.
+    """
+    def stopped() -> bool:
+        return cancelled.is_set() or (cancel is not None and cancel.is_set())
+
+    if stopped():
+        return False
+    try:
+        with trace.span("ffmpeg segment", "render", **(trace_args or {})) as info:
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                while True:
+                    try:
+                        stdout, stderr = proc.communicate(timeout=CANCEL_POLL_SECONDS)
+                        break
+                    except subprocess.TimeoutExpired:
+                        if stopped():
+                            info["cancelled"] = True
+                            return False
+            finally:
+                if proc.poll() is None:
+                    proc.kill()
+                    proc.communicate()
+                    Path(cmd[-1]).unlink(missing_ok=True)
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+            if trace.active():
+                info.update(trace.ffmpeg_stats(stderr, Path(cmd[-1])))
+    except BaseException:
+        cancelled.set()
+        raise
+    return True
+
 
 def render(
     input_video: Path,
-    segments: list[tuple[float, float]],
+    segments: list[tuple],
     output_path: Path,
     tmp_dir: Path,
     reencode: bool,
+    jobs: int | None = None,
+    smart: bool = False,
+    index: KeyframeIndex | None = None,
+    cache: FileCache | None = None,
+    cancel: threading.Event | None = None,
+    show_progress: bool = True,
 ) -> None:
-    seg_files = []
+    """Extract each segment with ffmpeg, then concatenate them into output_path.
+
+    Segments are ``(start, end)`` in ``input_video`` or ``(start, end,
+    source)`` to take the clip from another file. Up to ``jobs`` pieces are
+    extracted concurrently (default: CPU count), whatever their source.
+    The concat list always follows segment order, and the first ffmpeg
+    failure cancels the rest, killing extractions already running.
+
+    With ``smart``, each segment is split at its keyframes: whole GOPs are
+    stream-copied and only the partial GOPs at the cut points are re-encoded
+    with the source's codec parameters, each to exactly the frames in its
+    range so the joins add no gaps. Smart mode needs the keyframe index,
+    which is loaded (or built) when ``index`` is not given.
+
+    With an ``index``, stream-copied pieces start exactly on their keyframe
+    and stop exactly before ``end``, and re-encoded pieces seek straight to
+    the previous keyframe. Other sources' indexes are loaded as needed.
+
+    Sources whose streams differ from ``input_video``'s (codec, frame size,
+    rate, audio format) are re-encoded to match it; sources that already
+    match are cut like ``input_video`` itself.
+
+    With a ``cache``, each extracted piece is stored under a key derived from
+    its source's content hash and its full ffmpeg arguments, so re-rendering
+    an edited transcript only runs ffmpeg for new or changed pieces.
+
+    Setting ``cancel`` stops the render early: extractions that have not
+    started are skipped, running ones are killed and their partial pieces
+    discarded, finished ones are still cached, and ``RenderCancelled`` is
+    raised before the concat touches output_path.
+    """
+    clips = [(Path(seg[2]) if len(seg) > 2 else input_video, seg[0], seg[1]) for seg in segments]
+    sources = list(dict.fromkeys(source for source, _, _ in clips))
+
+    indexes = {input_video: index} if index is not None else {}
+    use_index = smart or index is not None
+
+    def index_for(source: Path) -> KeyframeIndex:
+        if source not in indexes:
+            indexes[source] = load_index(source)
+        return indexes[source]
+
+    streams = {}
+    mismatched = set()
+    if sources != [input_video]:
+        streams = {source: probe_streams(source) for source in {input_video, *sources}}
+        target = stream_signature(streams[input_video])
+        mismatched = {source for source in sources if stream_signature(streams[source]) != target}
+    elif smart:
+        streams = {input_video: probe_streams(input_video)}
+    encode_args = encoder_args(streams[input_video]) if smart or mismatched else None
+
+    pieces = []
+    for source, start, end in clips:
+        if source in mismatched:
+            pieces.append((source, start, end, True))
+        elif smart:
+            pieces += [(source, *p) for p in smart_pieces(start, end, index_for(source))]
+        elif use_index and not reencode:
+            pieces.append((source, index_for(source).prev_keyframe(start), end, False))
+        else:
+            pieces.append((source, start, end, reencode))
+
+    seg_files = [tmp_dir / f"seg_{i:04d}.mp4" for i in range(len(pieces))]
+    commands = []
+    for (source, start, end, piece_reencode), seg_path in zip(pieces, seg_files):
+        piece_index = index_for(source) if use_index else None
+        if source in mismatched:
+            extra_inputs, args = normalize_args(streams[source], streams[input_video])
+            coarse = piece_index.prev_keyframe(start) if piece_index and piece_index.packets else None
+            commands.append(segment_command(
+                source, start, end, seg_path, True, args, coarse=coarse, extra_inputs=extra_inputs,
+            ))
+        elif piece_index is None or not piece_index.packets:
+            commands.append(segment_command(source, start, end, seg_path, piece_reencode, encode_args))
+        elif piece_reencode:
+            commands.append(segment_command(
+                source, start, end, seg_path, True, encode_args,
+                frames=piece_index.frames_between(start, end) if smart else None,
+                coarse=piece_index.prev_keyframe(start),
+            ))
+        else:
+            commands.append(segment_command(
+                source, start, end, seg_path, False,
+                frames=piece_index.frames_between(start, end), make_zero=False,
+            ))
+
+    keys = [None] * len(commands)
+    pending = list(range(len(commands)))
+    if cache is not None:
+        with trace.span("hash sources", "render", sources=len(sources)):
+            source_hashes = {source: content_hash(source) for source in sources}
+        pending = []
+        for i, cmd in enumerate(commands):
+            source = pieces[i][0]
+            keys[i] = cache_key("segment", source_hashes[source], [arg for arg in cmd[:-1] if arg != str(source)])
+            cached = cache.get(keys[i])
+            if cached is not None:
+                seg_files[i] = cached
+            else:
+                pending.append(i)
+        if len(pending) < len(commands) and show_progress:
+            console.print(f"[dim]Reusing {len(commands) - len(pending)} cached segments[/]")
+    workers = max(1, min(jobs or default_jobs(), len(pending) or 1))
 
     with Progress(
         SpinnerColumn(),
         TextColumn("[bold blue]Extracting segments..."),
         BarColumn(),
         MofNCompleteColumn(),
+        disable=not show_progress,
     ) as progress:
-        task = progress.add_task("segments", total=len(segments))
-        for i, (start, end) in enumerate(segments):
-            seg_path = tmp_dir / f"seg_{i:04d}.mp4"
-            if reencode:
-                # -ss after -i for precise decode, then re-encode
-                subprocess.run(
-                    [
-                        "ffmpeg", "-y",
-                        "-i", str(input_video),
-                        "-ss", str(start),
-                        "-to", str(end),
-                        "-avoid_negative_ts", "make_zero",
-                        str(seg_path),
-                    ],
-                    capture_output=True,
-                    check=True,
-                )
-            else:
-                # -ss before -i for fast keyframe seek, -c copy
-                subprocess.run(
-                    [
-                        "ffmpeg", "-y",
-                        "-ss", str(start),
-                        "-i", str(input_video),
-                        "-t", str(end - start),
-                        "-c", "copy",
-                        "-avoid_negative_ts", "make_zero",
-                        str(seg_path),
-                    ],
-                    capture_output=True,
-                    check=True,
-                )
-            seg_files.append(seg_path)
-            progress.update(task, advance=1)
+        task = progress.add_task("segments", total=len(pieces), completed=len(pieces) - len(pending))
+        cancelled = threading.Event()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_run_unless_cancelled, commands[i], cancelled, {
+                    "piece": i,
+                    "source": str(pieces[i][0]),
+                    "start": pieces[i][1],
+                    "end": pieces[i][2],
+                    "reencode": pieces[i][3],
+                }, cancel): i
+                for i in pending
+            }
+            try:
+                for future in as_completed(futures):
+                    ran = future.result()
+                    i = futures[future]
+                    if ran and cache is not None:
+                        seg_files[i] = cache.put(keys[i], seg_files[i])
+                    progress.update(task, advance=1)
+            except BaseException:
+                cancelled.set()
+                for f in futures:
+                    f.cancel()
+                raise
+
+    if cancel is not None and cancel.is_set():
+        raise RenderCancelled("Render cancelled")
 
     # Concat via demuxer
     concat_list = tmp_dir / "concat.txt"
@@ -63,14 +417,87 @@ def render(
         "\n".join(f"file '{f}'" for f in seg_files) + "\n"
     )
 
-    subprocess.run(
-        [
-            "ffmpeg", "-y",
-            "-f", "concat", "-safe", "0",
-            "-i", str(concat_list),
-            "-c", "copy",
-            str(output_path),
-        ],
-        capture_output=True,
-        check=True,
-    )
+    with trace.span("concat", "render", pieces=len(seg_files)) as info:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-y",
+                "-f", "concat", "-safe", "0",
+                "-i", str(concat_list),
+                "-c", "copy",
+                str(output_path),
+            ],
+            capture_output=True,
+            check=True,
+        )
+        if trace.active():
+            info.update(trace.ffmpeg_stats(result.stderr, output_path))
+
+    if cache is not None:
+        cache.prune()
+
+
+def concat_quote(path: Path) -> str:
+    """Quote a path for an ffconcat script."""
+    return "'" + str(path).replace("'", "'\\''") + "'"
+
+
+def render_single_pass(
+    input_video: Path,
+    segments: list[tuple],
+    output_path: Path,
+    tmp_dir: Path,
+    index: KeyframeIndex | None = None,
+) -> None:
+    """Stream-copy segments into output_path with a single ffmpeg run.
+
+    Rather than extracting each segment to its own file and concatenating
+    those, the concat demuxer reads the sources directly: its script names
+    the source once per segment, with ``inpoint`` at the keyframe stream
+    copy would start from and ``outpoint`` at the segment end. Only the
+    script is written to tmp_dir.
+
+    The demuxer stops each segment by decoding timestamp, so with B-frames
+    a segment can keep the frame or two that follow its end. Sources must
+    have the same stream parameters as ``input_video`` (no re-encoding
+    happens here); raises ValueError otherwise.
+    """
+    clips = [(Path(seg[2]) if len(seg) > 2 else input_video, seg[0], seg[1]) for seg in segments]
+    sources = list(dict.fromkeys(source for source, _, _ in clips))
+    if sources != [input_video]:
+        target = stream_signature(probe_streams(input_video))
+        mismatched = [s for s in sources if stream_signature(probe_streams(s)) != target]
+        if mismatched:
+            raise ValueError(
+                f"Single-pass render needs sources with the same streams as {input_video}; "
+                f"{mismatched[0]} differs (render without --single-pass to re-encode it)"
+            )
+
+    indexes = {input_video: index} if index is not None else {}
+    lines = ["ffconcat version 1.0"]
+    for source, start, end in clips:
+        if source not in indexes:
+            indexes[source] = load_index(source)
+        lines += [
+            f"file {concat_quote(source.resolve())}",
+            f"inpoint {indexes[source].prev_keyframe(start)}",
+            f"outpoint {end}",
+        ]
+    script = tmp_dir / "concat.ffconcat"
+    script.write_text("\n".join(lines) + "\n")
+
+    with console.status(f"[bold blue]Copying {len(clips)} segments in one pass..."), \
+            trace.span("single-pass concat", "render", segments=len(clips)) as info:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-y",
+                "-f", "concat", "-safe", "0",
+                "-i", str(script),
+                "-c", "copy",
+                "-avoid_negative_ts", "make_zero",
+                str(output_path),
+            ],
+            capture_output=True,
+            check=True,
+        )
+        if trace.active():
+            info.update(trace.ffmpeg_stats(result.stderr, output_path))
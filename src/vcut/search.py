@@ -0,0 +1,237 @@
+import json
+import os
+import re
+import sqlite3
+from bisect import bisect_left
+from pathlib import Path
+
+from vcut.cache import cache_root
+from vcut.editor import TIMESTAMP_RE, VIDEO_SUFFIXES, parse_timestamp
+from vcut.words import WordTable, words_path_for
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transcripts (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    video TEXT,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lines (
+    id INTEGER PRIMARY KEY,
+    transcript_id INTEGER NOT NULL REFERENCES transcripts(id),
+    start REAL NOT NULL,
+    end REAL NOT NULL,
+    text TEXT NOT NULL,
+    words TEXT
+);
+CREATE INDEX IF NOT EXISTS lines_transcript ON lines(transcript_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts USING fts5(
+    text, content='lines', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def index_path() -> Path:
+    """$VCUT_INDEX, else index.sqlite3 in the cache dir."""
+    if os.environ.get("VCUT_INDEX"):
+        return Path(os.environ["VCUT_INDEX"])
+    return cache_root() / "index.sqlite3"
+
+
+def open_index(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def video_for_transcript(transcript: Path) -> Path | None:
+    """The media file a transcript was made from, found by its stem."""
+    for suffix in VIDEO_SUFFIXES:
+        for candidate in (transcript.with_suffix(suffix), transcript.with_suffix(suffix.upper())):
+            if candidate.is_file():
+                return candidate
+    return None
+
+
+def find_transcripts(paths: list[Path]) -> list[Path]:
+    """Transcripts among paths: .txt files as given, directories searched recursively.
+
+    A video path stands for its transcript. In directories, only .txt files
+    with a video next to them are taken, so READMEs and notes are skipped.
+    """
+    found = []
+    for path in paths:
+        if path.is_dir():
+            found += sorted(p for p in path.rglob("*.txt") if video_for_transcript(p))
+        elif path.suffix.lower() == ".txt":
+            found.append(path)
+        else:
+            found.append(path.with_suffix(".txt"))
+    return found
+
+
+def parse_transcript(path: Path) -> list[tuple[float, float, str]]:
+    """(start, end, text) for each timestamped line; other lines are ignored."""
+    lines = []
+    for line in path.read_text().splitlines():
+        match = TIMESTAMP_RE.match(line.strip())
+        if not match:
+            continue
+        try:
+            start, end = parse_timestamp(match.group(1)), parse_timestamp(match.group(2))
+        except ValueError:
+            continue
+        text = line.strip()[match.end():].strip().removeprefix("|").strip()
+        lines.append((start, end, text))
+    return lines
+
+
+def _line_words(words: tuple[list, list, list] | None, start: float, end: float) -> str | None:
+    if words is None:
+        return None
+    starts, ends, text = words
+    # Timestamps in the transcript are rounded to milliseconds
+    lo = bisect_left(starts, start - 0.0005)
+    hi = bisect_left(starts, end)
+    return json.dumps([[starts[i], ends[i], text[i]] for i in range(lo, hi)])
+
+
+def _remove(conn: sqlite3.Connection, transcript_id: int) -> None:
+    conn.execute(
+        "INSERT INTO lines_fts(lines_fts, rowid, text) "
+        "SELECT 'delete', id, text FROM lines WHERE transcript_id = ?",
+        (transcript_id,),
+    )
+    conn.execute("DELETE FROM lines WHERE transcript_id = ?", (transcript_id,))
+    conn.execute("DELETE FROM transcripts WHERE id = ?", (transcript_id,))
+
+
+def index_transcript(conn: sqlite3.Connection, transcript: Path) -> bool:
+    """Add or refresh one transcript. Returns False if it was already up to date.
+
+    Word timings from the transcript's ``.words.npz`` sidecar are stored
+    with each line when present, so phrase hits can be narrowed to words.
+    """
+    transcript = transcript.resolve()
+    sidecar = words_path_for(transcript)
+    st = transcript.stat()
+    mtime_ns = max(st.st_mtime_ns, sidecar.stat().st_mtime_ns if sidecar.is_file() else 0)
+    row = conn.execute(
+        "SELECT id, size, mtime_ns FROM transcripts WHERE path = ?", (str(transcript),)
+    ).fetchone()
+    if row and (row[1], row[2]) == (st.st_size, mtime_ns):
+        return False
+
+    words = None
+    if sidecar.is_file():
+        try:
+            table = WordTable.load(sidecar)
+            words = (table.starts.tolist(), table.ends.tolist(), table.words)
+        except ValueError:
+            pass
+    video = video_for_transcript(transcript)
+
+    with conn:
+        if row:
+            _remove(conn, row[0])
+        transcript_id = conn.execute(
+            "INSERT INTO transcripts (path, video, size, mtime_ns) VALUES (?, ?, ?, ?)",
+            (str(transcript), str(video) if video else None, st.st_size, mtime_ns),
+        ).lastrowid
+        for start, end, text in parse_transcript(transcript):
+            line_id = conn.execute(
+                "INSERT INTO lines (transcript_id, start, end, text, words) VALUES (?, ?, ?, ?, ?)",
+                (transcript_id, start, end, text, _line_words(words, start, end)),
+            ).lastrowid
+            conn.execute("INSERT INTO lines_fts (rowid, text) VALUES (?, ?)", (line_id, text))
+    return True
+
+
+def prune_missing(conn: sqlite3.Connection) -> int:
+    """Drop transcripts that no longer exist on disk; returns how many."""
+    missing = [
+        transcript_id
+        for transcript_id, path in conn.execute("SELECT id, path FROM transcripts").fetchall()
+        if not Path(path).is_file()
+    ]
+    with conn:
+        for transcript_id in missing:
+            _remove(conn, transcript_id)
+    return len(missing)
+
+
+def phrase_query(text: str) -> str:
+    """FTS5 query matching text as a phrase."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _narrow(words_json: str | None, tokens: list[str]) -> tuple[float, float] | None:
+    """Start and end of the first run of words spelling out tokens."""
+    if not words_json or not tokens:
+        return None
+    flat = []  # (token, word index)
+    words = json.loads(words_json)
+    for i, (_, _, word) in enumerate(words):
+        flat += [(t, i) for t in TOKEN_RE.findall(word.lower())]
+    for k in range(len(flat) - len(tokens) + 1):
+        if all(flat[k + n][0] == token for n, token in enumerate(tokens)):
+            return words[flat[k][1]][0], words[flat[k + len(tokens) - 1][1]][1]
+    return None
+
+
+def search(
+    conn: sqlite3.Connection,
+    query: str,
+    video: Path | None = None,
+    limit: int | None = None,
+    raw: bool = False,
+) -> list[dict]:
+    """Lines matching query, ordered by video and time.
+
+    query is a phrase unless raw is set, in which case it is passed to FTS5
+    as is (AND, OR, NEAR, prefix*). Phrase hits on lines with word timings
+    are narrowed to the words of the phrase. Each hit is a dict with
+    ``transcript``, ``video``, ``start``, ``end`` and ``text``.
+    """
+    sql = (
+        "SELECT t.path, t.video, l.start, l.end, l.text, l.words "
+        "FROM lines_fts JOIN lines l ON l.id = lines_fts.rowid "
+        "JOIN transcripts t ON t.id = l.transcript_id "
+        "WHERE lines_fts MATCH ?"
+    )
+    params: list = [query if raw else phrase_query(query)]
+    if video is not None:
+        sql += " AND (t.video = ? OR t.path = ?)"
+        params += [str(video.resolve()), str(video.resolve())]
+    sql += " ORDER BY t.path, l.start"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+
+    tokens = [] if raw else TOKEN_RE.findall(query.lower())
+    hits = []
+    for transcript, video_path, start, end, text, words in conn.execute(sql, params):
+        span = _narrow(words, tokens)
+        if span:
+            start, end = span
+        hits.append({"transcript": transcript, "video": video_path, "start": start, "end": end, "text": text})
+    return hits
+
+
+def hits_to_segments(hits: list[dict], pad: float = 0.0, base_dir: Path | None = None) -> list[dict]:
+    """Hits as cut-list segments, padded by pad seconds.
+
+    With base_dir, each segment names its video as a ``source`` relative to
+    base_dir where possible, for cut lists spanning several videos.
+    """
+    segments = []
+    for h in sorted(hits, key=lambda h: (h["transcript"], h["start"])):
+        seg = {"start": max(0.0, h["start"] - pad), "end": h["end"] + pad, "text": h["text"]}
+        if base_dir is not None:
+            seg["source"] = os.path.relpath(h["video"], base_dir)
+        segments.append(seg)
+    return segments
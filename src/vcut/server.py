@@ -0,0 +1,224 @@
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from rich.console import Console
+
+from vcut import trace
+from vcut.audio import probe_duration, stream_audio
+from vcut.cache import audio_cache, cache_root
+from vcut.transcribe import load_model, transcribe
+
+console = Console()
+
+# Models kept loaded by default before the least recently used is dropped.
+DEFAULT_MAX_MODELS = 2
+
+
+def socket_path() -> Path:
+    """$VCUT_SOCKET, else vcut.sock in $XDG_RUNTIME_DIR, else in the cache dir."""
+    if os.environ.get("VCUT_SOCKET"):
+        return Path(os.environ["VCUT_SOCKET"])
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return Path(os.environ["XDG_RUNTIME_DIR"]) / "vcut.sock"
+    return cache_root() / "vcut.sock"
+
+
+class ModelPool:
+    """Loaded Whisper models, least recently used dropped beyond max_models.
+
+    Each model comes with its own lock so one model runs one job at a time
+    while different models can run side by side. Loading happens outside
+    the pool's lock, so a slow load only holds up requests for that model.
+    """
+
+    def __init__(self, max_models: int = DEFAULT_MAX_MODELS, loader=load_model):
+        self.max_models = max_models
+        self._loader = loader
+        self._models: OrderedDict[str, tuple[object, threading.Lock]] = OrderedDict()
+        self._loading: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, model_name: str) -> tuple[object, threading.Lock] | None:
+        with self._lock:
+            if model_name in self._models:
+                self._models.move_to_end(model_name)
+                return self._models[model_name]
+            return None
+
+    def get(self, model_name: str) -> tuple[object, threading.Lock]:
+        entry = self._cached(model_name)
+        if entry is not None:
+            return entry
+        with self._lock:
+            loading = self._loading.setdefault(model_name, threading.Lock())
+        # Concurrent requests for a model being loaded wait for that one load
+        with loading:
+            entry = self._cached(model_name)
+            if entry is not None:
+                return entry
+            entry = (self._loader(model_name), threading.Lock())
+            with self._lock:
+                self._models[model_name] = entry
+                while len(self._models) > self.max_models:
+                    self._models.popitem(last=False)
+            return entry
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._models)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            reply = self.server.dispatch(request)
+        except Exception as e:
+            reply = {"error": str(e)}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class TranscriptionServer(socketserver.ThreadingUnixStreamServer):
+    """Accepts one JSON request per connection and answers with one JSON line.
+
+    Requests are ``{"op": "ping"}`` or ``{"op": "transcribe", "input": path,
+    "model": name, "language": code|null, "chunk_size": seconds|null,
+    "batch_size": n|null, "words": path|null, "no_cache": bool}``. With
+    ``words`` the word sidecar is written there by the server; with
+    ``no_cache`` the audio cache is neither read nor written.
+    Transcription replies carry ``segments`` (the list ``transcribe()``
+    returns) or ``error``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Path, pool: ModelPool):
+        self.pool = pool
+        super().__init__(str(path), _Handler)
+
+    def dispatch(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "models": self.pool.names()}
+        if op != "transcribe":
+            return {"error": f"Unknown request '{op}'"}
+
+        input_path = Path(request["input"])
+        if not input_path.is_file():
+            return {"error": f"File not found: {input_path}"}
+        console.print(f"[bold]Transcribing[/] {input_path} [dim]({request['model']})[/]")
+        model, lock = self.pool.get(request["model"])
+        # Decode only once the model is ready: a request that fails to load
+        # or waits on a busy model holds no ffmpeg or cache temp file.
+        with lock, trace.span("transcribe request", "serve", input=str(input_path)):
+            audio = stream_audio(input_path, cache=None if request.get("no_cache") else audio_cache())
+            try:
+                segments = transcribe(
+                    audio, request["model"], request.get("language"), request.get("chunk_size"),
+                    probe_duration(input_path), model=model, show_progress=False,
+                    batch_size=request.get("batch_size"),
+                    words_path=Path(request["words"]) if request.get("words") else None,
+                )
+            finally:
+                audio.close()
+        console.print(f"[green]Done[/] {input_path} [dim]({len(segments)} segments)[/]")
+        return {"segments": segments}
+
+
+def _send(path: Path, request: dict, timeout: float | None = None) -> dict | None:
+    """Send one request; None if no server is listening at path."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    with sock, sock.makefile("rwb") as f:
+        f.write(json.dumps(request).encode() + b"\n")
+        f.flush()
+        line = f.readline()
+    return json.loads(line) if line else None
+
+
+def is_running(path: Path | None = None) -> bool:
+    return _send(path or socket_path(), {"op": "ping"}, timeout=5) is not None
+
+
+def remote_transcribe(
+    input_path: Path,
+    model_name: str,
+    language: str | None,
+    chunk_size: float | None,
+    path: Path | None = None,
+    batch_size: int | None = None,
+    words_path: Path | None = None,
+    no_cache: bool = False,
+) -> list[dict] | None:
+    """Transcribe through a running ``vcut serve``; None if none is running.
+
+    Raises RuntimeError if the server ran the job and it failed.
+    """
+    reply = _send(path or socket_path(), {
+        "op": "transcribe",
+        "input": str(input_path.resolve()),
+        "model": model_name,
+        "language": language,
+        "chunk_size": chunk_size,
+        "batch_size": batch_size,
+        "words": str(words_path.resolve()) if words_path else None,
+        "no_cache": no_cache,
+    })
+    if reply is None:
+        return None
+    if "error" in reply:
+        raise RuntimeError(reply["error"])
+    return reply["segments"]
+
+
+def _bind(path: Path, pool: ModelPool) -> TranscriptionServer:
+    """Create the server with its socket already 0600, so no other user can connect first."""
+    old_umask = os.umask(0o177)
+    try:
+        return TranscriptionServer(path, pool)
+    finally:
+        os.umask(old_umask)
+
+
+def serve(path: Path, max_models: int = DEFAULT_MAX_MODELS, preload: list[str] = ()) -> None:
+    """Run the transcription daemon on a Unix socket until interrupted."""
+    if is_running(path):
+        raise RuntimeError(f"vcut serve is already running on {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+
+    pool = ModelPool(max_models)
+    for model_name in preload:
+        console.print(f"[bold]Loading model[/] {model_name}...")
+        pool.get(model_name)
+
+    with _bind(path, pool) as server:
+        console.print(f"[bold green]Listening on[/] {path} [dim](Ctrl-C to stop)[/]")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+
+
+def serve_in_background(path: Path, max_models: int = DEFAULT_MAX_MODELS) -> TranscriptionServer:
+    """Run the transcription daemon on a thread of this process.
+
+    The caller stops it with ``shutdown()`` and removes the socket.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    server = _bind(path, ModelPool(max_models))
+    threading.Thread(target=server.serve_forever, name="serve", daemon=True).start()
+    return server
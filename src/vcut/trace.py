@@ -0,0 +1,149 @@
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+# Last speed ffmpeg reports in its stats line, e.g. "speed=35.2x" or "speed=1.5e+03x".
+SPEED_RE = re.compile(rb"speed=\s*([0-9.]+(?:e[+-]?[0-9]+)?)x")
+# Thread ids given to named tracks, well clear of real thread idents' range.
+TRACK_TID_BASE = 1 << 62
+
+
+class Tracer:
+    """Timed spans, written in Chrome trace-event format.
+
+    Open the file in chrome://tracing or https://ui.perfetto.dev. Every span
+    is a complete ("X") event on the thread that recorded it, with its
+    ``args`` (ffmpeg speed, bytes written, segment times, ...) attached.
+    """
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self._threads: dict[int, str] = {}
+        self._tracks: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def add(
+        self, name: str, cat: str, start: float, end: float, args: dict | None = None, track: str | None = None,
+    ) -> None:
+        """Record a span from two ``time.perf_counter()`` readings.
+
+        Spans go on the current thread's row, or on a row of their own named
+        ``track`` for work timed from outside (e.g. jobs in worker processes).
+        """
+        if track is not None:
+            with self._lock:
+                tid = self._tracks.setdefault(track, TRACK_TID_BASE + len(self._tracks))
+                self._threads[tid] = track
+        else:
+            tid = threading.get_ident()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": round((start - self._origin) * 1e6, 3),
+            "dur": round((end - start) * 1e6, 3),
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": {k: v for k, v in (args or {}).items() if v is not None},
+        }
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault(tid, threading.current_thread().name)
+
+    def write(self, path: Path) -> None:
+        with self._lock:
+            metadata = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": name}}
+                for tid, name in self._threads.items()
+            ]
+            events = metadata + list(self.events)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}) + "\n")
+
+    def summary(self) -> list[dict]:
+        """Per span name, in order of first appearance: calls, total/mean/max seconds, bytes."""
+        stages: dict[str, dict] = {}
+        with self._lock:
+            events = list(self.events)
+        for event in events:
+            stage = stages.setdefault(event["name"], {"name": event["name"], "calls": 0, "total": 0.0, "max": 0.0, "bytes": None})
+            seconds = event["dur"] / 1e6
+            stage["calls"] += 1
+            stage["total"] += seconds
+            stage["max"] = max(stage["max"], seconds)
+            if "bytes" in event["args"]:
+                stage["bytes"] = (stage["bytes"] or 0) + event["args"]["bytes"]
+        for stage in stages.values():
+            stage["mean"] = stage["total"] / stage["calls"]
+        return list(stages.values())
+
+
+_tracer: Tracer | None = None
+
+
+def enable() -> Tracer:
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def active() -> Tracer | None:
+    return _tracer
+
+
+@contextmanager
+def span(name: str, cat: str = "vcut", **args) -> Iterator[dict]:
+    """Time the block as one span when tracing is enabled.
+
+    Yields the span's args, so the block can add results (bytes written,
+    ffmpeg speed) before the span is recorded. Costs next to nothing when
+    tracing is off.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield args
+        return
+    start = time.perf_counter()
+    try:
+        yield args
+    finally:
+        tracer.add(name, cat, start, time.perf_counter(), args)
+
+
+def traced(iterable: Iterable, name: str, cat: str = "vcut") -> Iterator:
+    """Yield from iterable, recording each wait for the next item as a span."""
+    if _tracer is None:
+        yield from iterable
+        return
+    it = iter(iterable)
+    try:
+        while True:
+            with span(name, cat):
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+            yield item
+    finally:
+        close = getattr(it, "close", None)
+        if close is not None:
+            close()
+
+
+def ffmpeg_stats(stderr: bytes | None, output: Path) -> dict:
+    """Speed from ffmpeg's stats line and the size of the file it wrote."""
+    stats = {"bytes": output.stat().st_size if output.is_file() else None}
+    speeds = SPEED_RE.findall(stderr or b"")
+    if speeds:
+        stats["speed"] = float(speeds[-1])
+    return stats
@@ -1,101 +1,379 @@
-import subprocess
+import json
+import multiprocessing
+import os
+import time
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
+from types import SimpleNamespace
 
+import numpy as np
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeElapsedColumn
 
+from vcut import trace
+from vcut.audio import SAMPLE_RATE
+from vcut.editor import format_prefixes
+from vcut.words import WordChunker, WordColumns, chunk_words, iter_words
 
-def extract_audio(video_path: Path, tmp_dir: Path) -> Path:
-    audio_path = tmp_dir / "audio.wav"
-    subprocess.run(
-        [
-            "ffmpeg", "-y", "-i", str(video_path),
-            "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
-            str(audio_path),
-        ],
-        capture_output=True,
-        check=True,
-    )
-    return audio_path
+
+def shift_segment(seg, offset: float) -> SimpleNamespace:
+    """Copy a faster-whisper segment with its (and its words') times moved by offset."""
+    words = None
+    if seg.words:
+        words = [
+            SimpleNamespace(start=w.start + offset, end=w.end + offset, word=w.word)
+            for w in seg.words
+        ]
+    return SimpleNamespace(start=seg.start + offset, end=seg.end + offset, text=seg.text, words=words)
+
+
+def _segment_record(seg) -> dict:
+    words = [[w.start, w.end, w.word] for w in seg.words] if seg.words else None
+    return {"start": seg.start, "end": seg.end, "text": seg.text, "words": words}
+
+
+def _segment_from_record(record: dict) -> SimpleNamespace:
+    words = None
+    if record["words"]:
+        words = [SimpleNamespace(start=s, end=e, word=w) for s, e, w in record["words"]]
+    return SimpleNamespace(start=record["start"], end=record["end"], text=record["text"], words=words)
+
+
+def journal_path_for(out_path: Path) -> Path:
+    return out_path.with_name(out_path.name + ".partial")
+
+
+class Journal:
+    """Append-only record of transcribed windows, so a run can be resumed.
+
+    The file is JSON lines: a settings header, then each finished window's
+    segments followed by a checkpoint holding the window's end time and the
+    pinned language. Every checkpoint is fsynced. On resume, anything after
+    the last checkpoint is discarded and transcription restarts from it.
+    """
+
+    def __init__(self, path: Path, settings: dict, segments=(), checkpoint: float = 0.0, language: str | None = None):
+        self.path = path
+        self.settings = settings
+        # Segments recovered from disk when resuming
+        self.segments = list(segments)
+        self.checkpoint = checkpoint
+        self.language = language
+        self._file = None
+
+    @classmethod
+    def create(cls, path: Path, settings: dict) -> "Journal":
+        journal = cls(path, settings)
+        journal._file = path.open("w")
+        journal._write({"settings": settings})
+        journal._sync()
+        return journal
+
+    @staticmethod
+    def read_settings(path: Path) -> dict | None:
+        """The settings header of the journal at path; None if it is missing or torn."""
+        with path.open() as f:
+            line = f.readline()
+        try:
+            return json.loads(line)["settings"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def resume(cls, path: Path) -> "Journal":
+        """Reopen a journal; raises ValueError if it has no usable settings header."""
+        settings = cls.read_settings(path)
+        if settings is None:
+            raise ValueError(f"{path} has no settings header and cannot be resumed")
+        lines = path.read_text().splitlines()
+        segments, window = [], []
+        checkpoint, language, keep = 0.0, None, 1
+        for n, line in enumerate(lines[1:], start=2):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                break  # torn write from the interrupted run
+            if "checkpoint" in record:
+                segments += window
+                window = []
+                checkpoint, language, keep = record["checkpoint"], record["language"], n
+            else:
+                window.append(_segment_from_record(record))
+
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text("".join(line + "\n" for line in lines[:keep]))
+        os.replace(tmp, path)
+        journal = cls(path, settings, segments, checkpoint, language)
+        journal._file = path.open("a")
+        return journal
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record) + "\n")
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record_window(self, segments: list, end: float, language: str) -> None:
+        for seg in segments:
+            self._write(_segment_record(seg))
+        self._write({"checkpoint": end, "language": language})
+        self._sync()
+        self.checkpoint = end
+        self.language = language
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def finish(self) -> None:
+        """Close and delete the journal once the transcript has been written."""
+        self.close()
+        self.path.unlink(missing_ok=True)
 
 
 def merge_words_into_chunks(segments: list, chunk_size: float) -> list[dict]:
     """Merge word-level timestamps into segments of approximately chunk_size seconds."""
-    # Collect all words from all segments
-    words = []
-    for seg in segments:
-        if seg.words:
-            for w in seg.words:
-                words.append({"start": w.start, "end": w.end, "word": w.word})
-
-    if not words:
-        return []
-
-    results = []
-    chunk_start = words[0]["start"]
-    chunk_words = []
-
-    for w in words:
-        if chunk_start is None:
-            chunk_start = w["start"]
-        chunk_words.append(w["word"])
-
-        if w["end"] - chunk_start >= chunk_size:
-            results.append({
-                "start": chunk_start,
-                "end": w["end"],
-                "text": " ".join(w.strip() for w in chunk_words),
-            })
-            chunk_words = []
-            chunk_start = None
-
-    if chunk_words:
-        results.append({
-            "start": chunk_start,
-            "end": words[-1]["end"],
-            "text": " ".join(w.strip() for w in chunk_words),
-        })
-
-    return results
+    return list(chunk_words(iter_words(segments), chunk_size))
 
 
-def transcribe(
-    audio_path: Path,
-    model_name: str,
-    language: str | None,
-    chunk_size: float | None = None,
-) -> list[dict]:
+def load_model(model_name: str, cpu_threads: int = 0):
     from faster_whisper import WhisperModel
 
-    model = WhisperModel(model_name, compute_type="int8")
+    with trace.span("load model", "transcribe", model=model_name):
+        return WhisperModel(model_name, compute_type="int8", cpu_threads=cpu_threads)
+
+
+def batched_pipeline(model):
+    """Wrap a loaded model in faster-whisper's batched pipeline.
 
+    The pipeline splits each window at VAD speech boundaries and runs the
+    pieces through the encoder ``batch_size`` at a time. It is a thin
+    wrapper, so the same model can serve batched and sequential jobs.
+    """
+    from faster_whisper import BatchedInferencePipeline
+
+    return BatchedInferencePipeline(model=model)
+
+
+def _transcribe_kwargs(language: str | None, chunk_size: float | None, batch_size: int | None = None) -> dict:
     kwargs = {}
     if language:
         kwargs["language"] = language
     if chunk_size is not None:
         kwargs["word_timestamps"] = True
+    if batch_size:
+        kwargs["batch_size"] = batch_size
+    return kwargs
+
+
+class _Lines:
+    """Transcript lines built from segments as windows finish.
+
+    Segments are not kept. With a chunk_size, their words stream through a
+    ``WordChunker`` (and into ``WordColumns`` for the sidecar); otherwise
+    each segment becomes its line at once. Memory grows with the lines of
+    the transcript, not with its words.
+    """
+
+    __slots__ = ("lines", "_chunker", "_columns")
+
+    def __init__(self, chunk_size: float | None, keep_words: bool = False):
+        self.lines: list[dict] = []
+        self._chunker = WordChunker(chunk_size) if chunk_size is not None else None
+        self._columns = WordColumns() if keep_words and chunk_size is not None else None
+
+    def add(self, segments: Iterable) -> None:
+        if self._chunker is None:
+            self.lines += [{"start": seg.start, "end": seg.end, "text": seg.text.strip()} for seg in segments]
+            return
+        for start, end, word in iter_words(segments):
+            if self._columns is not None:
+                self._columns.append(start, end, word)
+            line = self._chunker.add(start, end, word)
+            if line is not None:
+                self.lines.append(line)
 
-    segments_iter, info = model.transcribe(str(audio_path), **kwargs)
+    def finish(self, words_path: Path | None = None) -> list[dict]:
+        if self._chunker is not None:
+            with trace.span("chunk words", "transcribe") as info:
+                line = self._chunker.flush()
+                if line is not None:
+                    self.lines.append(line)
+                if self._columns is not None:
+                    self._columns.save(words_path)
+                    info["words"] = len(self._columns)
+        return self.lines
 
-    raw_segments = []
+
+def transcribe(
+    audio: Iterable[tuple[float, np.ndarray]],
+    model_name: str,
+    language: str | None,
+    chunk_size: float | None = None,
+    duration: float | None = None,
+    model=None,
+    show_progress: bool = True,
+    journal: Journal | None = None,
+    batch_size: int | None = None,
+    words_path: Path | None = None,
+) -> list[dict]:
+    """Transcribe audio windows as produced by ``vcut.audio.stream_audio``.
+
+    Each window is transcribed as soon as it arrives, with segment times
+    shifted by the window's offset. The language detected in the first
+    window is reused for the rest so it cannot drift between windows.
+    Pass an already loaded ``model`` to skip loading ``model_name``.
+
+    With a ``journal``, every finished window is checkpointed to disk, and
+    segments the journal recovered from an earlier run are included in the
+    result. With ``batch_size``, windows go through ``batched_pipeline``.
+    When chunking by words, the word timings are also saved to
+    ``words_path`` (see ``vcut.words``) if one is given.
+    """
+    if model is None:
+        model = load_model(model_name)
+    if batch_size:
+        model = batched_pipeline(model)
+
+    kwargs = _transcribe_kwargs(language or (journal and journal.language), chunk_size, batch_size)
+
+    lines = _Lines(chunk_size, words_path is not None)
+    if journal:
+        lines.add(journal.segments)
     with Progress(
         SpinnerColumn(),
         TextColumn("[bold blue]Transcribing..."),
         BarColumn(),
         TimeElapsedColumn(),
+        disable=not show_progress,
     ) as progress:
-        task = progress.add_task("transcribe", total=info.duration)
-        for seg in segments_iter:
-            raw_segments.append(seg)
-            progress.update(task, completed=seg.end)
-        progress.update(task, completed=info.duration)
+        task = progress.add_task("transcribe", total=duration)
+        for offset, samples in trace.traced(audio, "wait for audio", "transcribe"):
+            with trace.span("inference", "transcribe", offset=offset, seconds=len(samples) / SAMPLE_RATE):
+                segments_iter, info = model.transcribe(samples, **kwargs)
+                kwargs.setdefault("language", info.language)
+                window = []
+                for seg in segments_iter:
+                    window.append(shift_segment(seg, offset))
+                    progress.update(task, completed=offset + seg.end)
+            if journal:
+                journal.record_window(window, offset + info.duration, kwargs["language"])
+            lines.add(window)
+            progress.update(task, completed=offset + info.duration)
+        if duration is not None:
+            progress.update(task, completed=duration)
 
-    if chunk_size is not None:
-        return merge_words_into_chunks(raw_segments, chunk_size)
-    else:
-        return [
-            {"start": seg.start, "end": seg.end, "text": seg.text.strip()}
-            for seg in raw_segments
-        ]
+    return lines.finish(words_path)
+
+
+# Model loaded once per worker process by _init_worker.
+_worker_model = None
+
+
+def _init_worker(model_name: str, cpu_threads: int) -> None:
+    global _worker_model
+    _worker_model = load_model(model_name, cpu_threads)
+
+
+def _transcribe_window(offset: float, samples: np.ndarray, kwargs: dict) -> tuple[list, str]:
+    model = batched_pipeline(_worker_model) if "batch_size" in kwargs else _worker_model
+    segments_iter, info = model.transcribe(samples, **kwargs)
+    return [shift_segment(seg, offset) for seg in segments_iter], info.language
+
+
+def worker_pool(model_name: str, workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers each hold their own int8 copy of the model.
+
+    CPU threads are split evenly so the workers together use every core.
+    """
+    cpu_threads = max(1, (os.cpu_count() or workers) // workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(model_name, cpu_threads),
+    )
+
+
+def transcribe_parallel(
+    audio: Iterable[tuple[float, np.ndarray]],
+    pool: ProcessPoolExecutor,
+    workers: int,
+    language: str | None,
+    chunk_size: float | None = None,
+    duration: float | None = None,
+    show_progress: bool = True,
+    journal: Journal | None = None,
+    batch_size: int | None = None,
+    words_path: Path | None = None,
+) -> list[dict]:
+    """Transcribe audio windows on a ``worker_pool`` and stitch them in order.
+
+    Windows are already split at quiet points by ``stream_audio``, so each
+    is transcribed independently and its segments shifted by its offset.
+    Without a forced language the first window is transcribed alone and its
+    detected language is used for the rest. At most two windows per worker
+    are in flight, which bounds memory. A ``journal`` is checkpointed as
+    soon as every window up to a point has finished. ``words_path`` is as
+    for ``transcribe``.
+    """
+    kwargs = _transcribe_kwargs(language or (journal and journal.language), chunk_size, batch_size)
+    lines = _Lines(chunk_size, words_path is not None)
+    if journal:
+        lines.add(journal.segments)
+    # Finished windows wait here only until every earlier window is done
+    results: dict[int, list] = {}
+    window_ends: dict[int, float] = {}
+    next_window = 0
+    tracer = trace.active()
+    lanes: list[int] = []  # trace rows of windows in flight
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn(f"[bold blue]Transcribing ({workers} workers)..."),
+        BarColumn(),
+        TimeElapsedColumn(),
+        disable=not show_progress,
+    ) as progress:
+        task = progress.add_task("transcribe", total=duration, completed=journal.checkpoint if journal else 0)
+        pending = {}
+
+        def collect(futures):
+            nonlocal next_window
+            for f in futures:
+                index, seconds, submitted, lane = pending.pop(f)
+                results[index], detected = f.result()
+                if tracer:
+                    tracer.add(
+                        "window in worker", "transcribe", submitted, time.perf_counter(),
+                        {"window": index, "seconds": seconds}, track=f"worker slot {lane}",
+                    )
+                    lanes.remove(lane)
+                kwargs.setdefault("language", detected)
+                progress.update(task, advance=seconds)
+            while next_window in results:
+                window = results.pop(next_window)
+                end = window_ends.pop(next_window)
+                if journal:
+                    journal.record_window(window, end, kwargs["language"])
+                lines.add(window)
+                next_window += 1
+
+        for i, (offset, samples) in enumerate(trace.traced(audio, "wait for audio", "transcribe")):
+            future = pool.submit(_transcribe_window, offset, samples, dict(kwargs))
+            lane = min(set(range(len(lanes) + 1)) - set(lanes))
+            lanes.append(lane)
+            pending[future] = (i, len(samples) / SAMPLE_RATE, time.perf_counter(), lane)
+            window_ends[i] = offset + len(samples) / SAMPLE_RATE
+            if "language" not in kwargs:
+                collect(wait([future]).done)
+            while len(pending) >= 2 * workers:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+        collect(wait(pending).done)
+
+    return lines.finish(words_path)
 
 
 def format_timestamp(seconds: float) -> str:
@@ -110,9 +388,9 @@ def format_timestamp(seconds: float) -> str:
 
 
 def segments_to_text(segments: list[dict]) -> str:
-    lines = []
-    for seg in segments:
-        start = format_timestamp(seg["start"])
-        end = format_timestamp(seg["end"])
-        lines.append(f"[{start} -> {end}] | {seg['text']}")
+    prefixes = format_prefixes([seg["start"] for seg in segments], [seg["end"] for seg in segments])
+    lines = [
+        f"{prefix} {seg['source']} | {seg['text']}" if seg.get("source") else f"{prefix} | {seg['text']}"
+        for prefix, seg in zip(prefixes, segments)
+    ]
     return "\n".join(lines) + "\n"
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+# How often the watched file is checked for saves
+POLL_SECONDS = 0.2
+# A save is acted on once the file has stayed unchanged this long
+DEBOUNCE_SECONDS = 0.5
+
+
+def file_signature(path: Path) -> tuple[int, int] | None:
+    """(mtime_ns, size) of path, or None while it does not exist.
+
+    Editors that save by writing a new file and renaming it over the old one
+    change this just like in-place writes do.
+    """
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def diff_segments(old: list[tuple], new: list[tuple]) -> tuple[int, int]:
+    """(added, removed): segments of new not in old, and of old not in new."""
+    before, after = Counter(old), Counter(new)
+    return sum((after - before).values()), sum((before - after).values())
+
+
+class Watcher:
+    """Call ``on_save(cancel)`` on a background thread after each save of path.
+
+    A save is acted on once the file has been left alone for ``debounce``
+    seconds, so an editor's burst of writes counts as one. A newer save sets
+    the running call's ``cancel`` event and waits for it to return before
+    starting the next one: at most one call runs at a time and the latest
+    save always gets a call of its own.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        on_save: Callable[[threading.Event], None],
+        poll: float = POLL_SECONDS,
+        debounce: float = DEBOUNCE_SECONDS,
+    ):
+        self.path = path
+        self.on_save = on_save
+        self.poll = poll
+        self.debounce = debounce
+        self.calls = 0
+        self.cancelled = 0
+        self._seen: tuple[int, int] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._current: tuple[threading.Thread, threading.Event] | None = None
+
+    def start(self) -> "Watcher":
+        # Taken here rather than on the thread, so a save right after start() counts
+        self._seen = file_signature(self.path)
+        self._thread = threading.Thread(target=self._loop, name="watch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop watching, cancelling a call that is still running."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._cancel_current()
+
+    def __enter__(self) -> "Watcher":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _loop(self) -> None:
+        seen = self._seen
+        changed_at = None
+        while not self._stop.wait(self.poll):
+            signature = file_signature(self.path)
+            if signature != seen:
+                seen, changed_at = signature, time.monotonic()
+            elif changed_at is not None and time.monotonic() - changed_at >= self.debounce:
+                changed_at = None
+                self._cancel_current()
+                cancel = threading.Event()
+                thread = threading.Thread(
+                    target=self.on_save, args=(cancel,), name=f"watch-call-{self.calls}", daemon=True,
+                )
+                self.calls += 1
+                self._current = (thread, cancel)
+                thread.start()
+
+    def _cancel_current(self) -> None:
+        if self._current is None:
+            return
+        thread, cancel = self._current
+        if thread.is_alive():
+            cancel.set()
+            self.cancelled += 1
+        thread.join()
+        self._current = None
@@ -0,0 +1,180 @@
+import os
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import numpy as np
+
+WORDS_SUFFIX = ".words.npz"
+WORDS_VERSION = 1
+
+
+def words_path_for(transcript_path: Path) -> Path:
+    """Word sidecar stored next to a transcript: video.txt -> video.words.npz."""
+    return transcript_path.with_name(transcript_path.stem + WORDS_SUFFIX)
+
+
+def iter_words(segments: Iterable) -> Iterator[tuple[float, float, str]]:
+    """(start, end, word) for every word of faster-whisper style segments, lazily."""
+    for seg in segments:
+        if seg.words:
+            for w in seg.words:
+                yield w.start, w.end, w.word
+
+
+class WordColumns:
+    """Word timings appended one at a time into compact columns.
+
+    Takes about 24 bytes plus the UTF-8 text per word, against several
+    hundred for faster-whisper's word objects. ``save`` writes the sidecar
+    without building a Python string per word.
+    """
+
+    __slots__ = ("starts", "ends", "offsets", "text")
+
+    def __init__(self):
+        self.starts = array("d")
+        self.ends = array("d")
+        self.offsets = array("q", [0])
+        self.text = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def append(self, start: float, end: float, word: str) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.text += word.encode()
+        self.offsets.append(len(self.text))
+
+    def save(self, path: Path) -> None:
+        """Write the word sidecar read by ``WordTable.load``."""
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            np.savez(
+                f,
+                version=np.array(WORDS_VERSION),
+                starts=np.asarray(self.starts, dtype=np.float64),
+                ends=np.asarray(self.ends, dtype=np.float64),
+                offsets=np.asarray(self.offsets, dtype=np.int64),
+                text=np.frombuffer(bytes(self.text), dtype=np.uint8),
+            )
+        os.replace(tmp, path)
+
+
+class WordChunker:
+    """Groups a stream of words into lines of about chunk_size seconds.
+
+    ``add`` returns each line as soon as its closing word arrives and
+    ``flush`` the unfinished last one, so only the open line's words are
+    held. Lines close exactly as in ``WordTable.chunks``.
+    """
+
+    __slots__ = ("chunk_size", "_start", "_end", "_words")
+
+    def __init__(self, chunk_size: float):
+        self.chunk_size = chunk_size
+        self._start = 0.0
+        self._end = 0.0
+        self._words: list[str] = []
+
+    def add(self, start: float, end: float, word: str) -> dict | None:
+        if not self._words:
+            self._start = start
+        self._words.append(word.strip())
+        self._end = end
+        if end - self._start >= self.chunk_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> dict | None:
+        if not self._words:
+            return None
+        line = {"start": self._start, "end": self._end, "text": " ".join(self._words)}
+        self._words = []
+        return line
+
+
+def chunk_words(words: Iterable[tuple[float, float, str]], chunk_size: float) -> Iterator[dict]:
+    """Yield lines of about chunk_size seconds from (start, end, word) as they complete."""
+    chunker = WordChunker(chunk_size)
+    for start, end, word in words:
+        line = chunker.add(start, end, word)
+        if line is not None:
+            yield line
+    line = chunker.flush()
+    if line is not None:
+        yield line
+
+
+class WordTable:
+    """Word-level timestamps in columnar form.
+
+    ``starts`` and ``ends`` are float64 seconds; ``words`` holds each word's
+    text as Whisper produced it (usually with a leading space). On disk the
+    words are one UTF-8 string plus an array of byte offsets into it, so a
+    table with hundreds of thousands of words loads without parsing.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, words: list[str]):
+        self.starts = starts
+        self.ends = ends
+        self.words = words
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @classmethod
+    def load(cls, path: Path) -> "WordTable":
+        """Read a sidecar written by ``WordColumns.save``; raises ValueError if it is not one."""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != WORDS_VERSION:
+                    raise ValueError(f"{path}: unsupported word sidecar version {int(data['version'])}")
+                starts, ends, offsets = data["starts"], data["ends"], data["offsets"]
+                blob = data["text"].tobytes()
+        except (OSError, KeyError) as e:
+            raise ValueError(f"{path}: not a word sidecar ({e})") from None
+        bounds = offsets.tolist()
+        text = blob.decode()
+        if len(text) == len(blob):
+            # ASCII: byte offsets are character offsets
+            words = [text[a:b] for a, b in zip(bounds, bounds[1:])]
+        else:
+            words = [blob[a:b].decode() for a, b in zip(bounds, bounds[1:])]
+        return cls(starts, ends, words)
+
+    def chunks(self, chunk_size: float) -> list[dict]:
+        """Group words into lines of about chunk_size seconds.
+
+        A line closes at the first word ending at least chunk_size after the
+        line's first word starts, as in ``merge_words_into_chunks``. Each
+        line's closing word is found by binary search over the running
+        maximum of word ends, so the cost grows with the number of lines
+        rather than the number of words.
+        """
+        n = len(self.words)
+        if n == 0:
+            return []
+        # Plain floats: per-element access to numpy arrays is far slower
+        starts, ends = self.starts.tolist(), self.ends.tolist()
+        reach = np.maximum.accumulate(self.ends).tolist()
+        stripped = [w.strip() for w in self.words]
+
+        results = []
+        i = 0
+        while i < n:
+            chunk_start = starts[i]
+            # No word before j can close the line; step past float rounding.
+            j = max(i, bisect_left(reach, chunk_start + chunk_size - 1e-9))
+            while j < n and not ends[j] - chunk_start >= chunk_size:
+                j += 1
+            last = min(j, n - 1)
+            results.append({
+                "start": chunk_start,
+                "end": ends[last] if j < n else ends[-1],
+                "text": " ".join(stripped[i:last + 1]),
+            })
+            i = last + 1
+        return results
@@ -0,0 +1,65 @@
+import shutil
+import subprocess
+
+import pytest
+
+from vcut.keyframes import load_index
+from vcut.render import render
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not shutil.which("ffmpeg") or not shutil.which("ffprobe"), reason="ffmpeg not installed"),
+]
+
+FPS = 25
+SEGMENTS = [(1.0, 3.0), (3.3, 5.0), (10.1, 15.9), (20.37, 24.53)]
+
+
+@pytest.fixture(scope="module")
+def video(tmp_path_factory):
+    """30 s of H.264 with B-frames and a keyframe every 2 s, plus AAC audio."""
+    path = tmp_path_factory.mktemp("media") / "v.mp4"
+    subprocess.run(
+        [
+            "ffmpeg", "-v", "error", "-y",
+            "-f", "lavfi", "-i", f"testsrc=duration=30:size=160x120:rate={FPS}",
+            "-f", "lavfi", "-i", "sine=frequency=440:duration=30",
+            "-c:v", "libx264", "-preset", "ultrafast", "-bf", "2", "-g", str(2 * FPS), "-sc_threshold", "0",
+            "-c:a", "aac", "-shortest",
+            str(path),
+        ],
+        check=True,
+    )
+    return path
+
+
+def _video_stream(path):
+    result = subprocess.run(
+        [
+            "ffprobe", "-v", "error", "-select_streams", "v:0", "-count_frames",
+            "-show_entries", "stream=duration,nb_read_frames", "-of", "csv=p=0",
+            str(path),
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    duration, frames = result.stdout.strip().split(",")
+    return float(duration), int(frames)
+
+
+def test_smart_cut_matches_reencode_length(video, tmp_path):
+    index = load_index(video)
+    outputs = {}
+    for mode in ("reencode", "smart"):
+        work = tmp_path / mode
+        work.mkdir()
+        outputs[mode] = tmp_path / f"{mode}.mp4"
+        render(video, SEGMENTS, outputs[mode], work, reencode=mode == "reencode",
+               smart=mode == "smart", index=index, show_progress=False)
+
+    smart_duration, smart_frames = _video_stream(outputs["smart"])
+    reencode_duration, reencode_frames = _video_stream(outputs["reencode"])
+    assert smart_frames == sum(index.frames_between(start, end) for start, end in SEGMENTS)
+    assert abs(smart_frames - reencode_frames) <= 1
+    assert abs(smart_duration - reencode_duration) <= 1 / FPS + 1e-6
@@ -0,0 +1,149 @@
+import io
+import subprocess
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from vcut.cache import FileCache
+from vcut.audio import (
+    MIN_PARALLEL_WINDOW_SECONDS, SAMPLE_RATE, WINDOW_SECONDS, pcm_to_float, quiet_split, stream_audio,
+    window_for_workers,
+)
+
+
+def _pcm(seconds_loud_quiet):
+    """s16le bytes alternating loud tone and silence, given (loud, quiet) seconds."""
+    parts = []
+    for loud, quiet in seconds_loud_quiet:
+        t = np.arange(int(loud * SAMPLE_RATE)) / SAMPLE_RATE
+        parts.append((np.sin(2 * np.pi * 440 * t) * 20000).astype("<i2"))
+        parts.append(np.zeros(int(quiet * SAMPLE_RATE), dtype="<i2"))
+    return np.concatenate(parts).tobytes()
+
+
+class FakeProc:
+    def __init__(self, data, returncode=0):
+        self.stdout = io.BytesIO(data)
+        self.stderr = io.BytesIO(b"boom" if returncode else b"")
+        self.returncode = returncode
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        return self.returncode
+
+    def kill(self):
+        pass
+
+
+class TestPcmToFloat:
+    def test_scale(self):
+        data = np.array([0, 16384, -32768], dtype="<i2").tobytes()
+        assert pcm_to_float(data).tolist() == [0.0, 0.5, -1.0]
+
+
+class TestQuietSplit:
+    def test_finds_silence(self):
+        samples = pcm_to_float(_pcm([(3.0, 0.5), (3.0, 0.0)]))
+        cut = quiet_split(samples, 2 * SAMPLE_RATE, 5 * SAMPLE_RATE)
+        assert 3.0 <= cut / SAMPLE_RATE <= 3.5
+
+    def test_empty_range(self):
+        assert quiet_split(np.zeros(10, dtype=np.float32), 5, 5) == 5
+
+
+class TestStreamAudio:
+    def test_windows_split_at_silence_and_cover_everything(self):
+        data = _pcm([(9.0, 1.0)] * 5)
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(data)):
+            windows = list(stream_audio("video.mp4", window_seconds=20.0))
+
+        total = sum(len(samples) for _, samples in windows)
+        assert total == len(data) // 2
+        assert windows[0][0] == 0.0
+        for (offset, samples), (next_offset, _) in zip(windows, windows[1:]):
+            assert next_offset == pytest.approx(offset + len(samples) / SAMPLE_RATE)
+            assert next_offset % 10 >= 9.0  # cut inside a silent gap
+
+    def test_start_offsets_windows_and_seeks(self):
+        data = _pcm([(2.0, 0.0)])
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(data)) as popen:
+            windows = list(stream_audio("video.mp4", start=30.0))
+
+        cmd = popen.call_args[0][0]
+        assert cmd[cmd.index("-ss") + 1] == "30.0"
+        assert cmd.index("-ss") < cmd.index("-i")
+        assert [offset for offset, _ in windows] == [30.0]
+
+    def test_ffmpeg_failure_raises(self):
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(b"", returncode=1)):
+            with pytest.raises(subprocess.CalledProcessError):
+                list(stream_audio("video.mp4"))
+
+
+class TestAudioCache:
+    def _video(self, tmp_path):
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"not really a video")
+        return video
+
+    def test_decode_is_cached_and_replayed_identically(self, tmp_path):
+        data = _pcm([(9.0, 1.0)] * 5)
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "audio", ".pcm")
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(data)):
+            decoded = list(stream_audio(video, window_seconds=20.0, cache=cache))
+        assert cache.stats() == (1, len(data))
+
+        with patch("vcut.audio.subprocess.Popen") as popen:
+            cached = list(stream_audio(video, window_seconds=20.0, cache=cache))
+        popen.assert_not_called()
+        assert [o for o, _ in cached] == [o for o, _ in decoded]
+        assert all(np.array_equal(a, b) for (_, a), (_, b) in zip(cached, decoded))
+
+    def test_cached_start(self, tmp_path):
+        data = _pcm([(5.0, 5.0)])
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "audio", ".pcm")
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(data)):
+            list(stream_audio(video, cache=cache))
+        windows = list(stream_audio(video, start=4.0, cache=cache))
+        assert [offset for offset, _ in windows] == [4.0]
+        assert len(windows[0][1]) == 6 * SAMPLE_RATE
+
+    def test_partial_decodes_are_not_cached(self, tmp_path):
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "audio", ".pcm")
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(b"", returncode=1)):
+            with pytest.raises(subprocess.CalledProcessError):
+                list(stream_audio(video, cache=cache))
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(_pcm([(2.0, 0.0)]))):
+            list(stream_audio(video, start=1.0, cache=cache))
+        assert cache.stats() == (0, 0)
+        assert list((tmp_path / "audio").iterdir()) == []
+
+    def test_unread_decode_leaves_no_temp_file(self, tmp_path):
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "audio", ".pcm")
+        with patch("vcut.audio.subprocess.Popen", return_value=FakeProc(_pcm([(2.0, 0.0)]))):
+            stream_audio(video, cache=cache).close()
+            stream_audio(video, cache=cache)  # dropped without being read
+        assert list((tmp_path / "audio").iterdir()) == []
+
+    def test_failed_start_leaves_no_temp_file(self, tmp_path):
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "audio", ".pcm")
+        with patch("vcut.audio.subprocess.Popen", side_effect=FileNotFoundError("ffmpeg")):
+            with pytest.raises(FileNotFoundError):
+                stream_audio(video, cache=cache)
+        assert list((tmp_path / "audio").iterdir()) == []
+
+
+class TestWindowForWorkers:
+    def test_single_worker_uses_default(self):
+        assert window_for_workers(7200.0, 1) == WINDOW_SECONDS
+
+    def test_two_windows_per_worker(self):
+        assert window_for_workers(2400.0, 4) == 300.0
+
+    def test_bounds(self):
+        assert window_for_workers(100.0, 8) == MIN_PARALLEL_WINDOW_SECONDS
+        assert window_for_workers(36000.0, 2) == WINDOW_SECONDS
+        assert window_for_workers(None, 4) == WINDOW_SECONDS
@@ -0,0 +1,97 @@
+import os
+import time
+
+import pytest
+
+from vcut.cache import STALE_PART_SECONDS, FileCache, cache_key, cache_root, parse_size
+
+
+def _add(cache, tmp_path, key, size, mtime):
+    src = tmp_path / f"{key}.src"
+    src.write_bytes(b"x" * size)
+    path = cache.put(key, src)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+class TestFileCache:
+    def test_put_then_get(self, tmp_path):
+        cache = FileCache(tmp_path / "c", ".mp4")
+        src = tmp_path / "seg.mp4"
+        src.write_bytes(b"data")
+        key = cache_key("segment", "abc", 1.0, 2.0)
+
+        path = cache.put(key, src)
+
+        assert not src.exists()
+        assert cache.get(key) == path
+        assert path.read_bytes() == b"data"
+
+    def test_miss(self, tmp_path):
+        assert FileCache(tmp_path, ".mp4").get("00ff") is None
+
+    def test_stats(self, tmp_path):
+        cache = FileCache(tmp_path / "c", ".mp4")
+        _add(cache, tmp_path, "aa01", 10, 1)
+        _add(cache, tmp_path, "bb02", 20, 2)
+        assert cache.stats() == (2, 30)
+
+    def test_prune_evicts_least_recently_used(self, tmp_path):
+        cache = FileCache(tmp_path / "c", ".mp4", max_bytes=25)
+        _add(cache, tmp_path, "aa01", 10, 1)
+        _add(cache, tmp_path, "bb02", 10, 2)
+        _add(cache, tmp_path, "cc03", 10, 3)
+        cache.get("aa01")  # refreshes aa01, so bb02 is now the oldest
+
+        assert cache.prune() == (1, 10)
+        assert cache.get("bb02") is None
+        assert cache.get("aa01") is not None
+        assert cache.get("cc03") is not None
+
+    def test_prune_to_zero_clears(self, tmp_path):
+        cache = FileCache(tmp_path / "c", ".mp4")
+        _add(cache, tmp_path, "aa01", 10, 1)
+        assert cache.prune(0) == (1, 10)
+        assert cache.stats() == (0, 0)
+
+    def test_prune_sweeps_stale_temp_files(self, tmp_path):
+        cache = FileCache(tmp_path / "c", ".pcm")
+        cache.root.mkdir()
+        stale, fresh = cache.root / "tmp1.pcm.part", cache.root / "tmp2.pcm.part"
+        stale.write_bytes(b"x" * 7)
+        fresh.write_bytes(b"x" * 5)
+        old = time.time() - STALE_PART_SECONDS - 60
+        os.utime(stale, (old, old))
+
+        assert cache.prune() == (1, 7)
+        assert not stale.exists()
+        assert fresh.exists()
+
+
+class TestCacheKey:
+    def test_stable_and_distinct(self):
+        assert cache_key("a", 1.0, ["-c", "copy"]) == cache_key("a", 1.0, ["-c", "copy"])
+        assert cache_key("a", 1.0) != cache_key("a", 1.5)
+
+
+class TestCacheRoot:
+    def test_env_override(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("VCUT_CACHE_DIR", str(tmp_path))
+        assert cache_root() == tmp_path
+
+    def test_xdg(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("VCUT_CACHE_DIR", raising=False)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+        assert cache_root() == tmp_path / "vcut"
+
+
+class TestParseSize:
+    def test_units(self):
+        assert parse_size("512") == 512
+        assert parse_size("500M") == 500 * 1024**2
+        assert parse_size("1.5G") == int(1.5 * 1024**3)
+        assert parse_size("10GiB") == 10 * 1024**3
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="Invalid size"):
+            parse_size("lots")
@@ -1,6 +1,11 @@
+import argparse
 from pathlib import Path
+from unittest.mock import Mock, patch
 
-from vcut.cli import transcript_path_for, MODEL_PRESETS
+import pytest
+
+from vcut.cli import build_parser, cmd_rechunk, confirm_overwrite, cmd_transcribe, open_journal, parse_slots, read_input_list, transcript_path_for, MODEL_PRESETS
+from vcut.words import WordColumns
 
 
 class TestTranscriptPathFor:
@@ -22,3 +27,143 @@ class TestModelPresets:
 
     def test_quality_is_default(self):
         assert MODEL_PRESETS["quality"] == "distil-large-v3"
+
+
+class TestQueueArgs:
+    def test_slots_override_defaults(self):
+        assert parse_slots(["render=8"]) == {"transcribe": 1, "render": 8}
+
+    @pytest.mark.parametrize("value", ["render", "edit=2", "render=-1"])
+    def test_invalid_slots(self, value):
+        with pytest.raises(ValueError):
+            parse_slots([value])
+
+    def test_add_keeps_job_options_for_the_job(self):
+        args = build_parser().parse_args(["queue", "add", "--priority", "3", "render", "v.mp4", "-r", "--force"])
+        assert (args.kind, args.args, args.priority) == ("render", ["v.mp4", "-r", "--force"], 3)
+
+    def test_existing_output_fails_cleanly_without_a_terminal(self, tmp_path, capsys):
+        output = tmp_path / "out.mp4"
+        output.touch()
+        args = argparse.Namespace(force=False, dry_run=False)
+        with patch("vcut.cli.console.input", side_effect=EOFError), pytest.raises(SystemExit) as exc:
+            confirm_overwrite(output, args)
+        assert exc.value.code == 1
+        assert "--force to overwrite" in capsys.readouterr().out
+
+
+class TestReadInputList:
+    def test_skips_blanks_and_comments(self, tmp_path):
+        lst = tmp_path / "inputs.txt"
+        lst.write_text("a.mp4\n\n# skipped.mp4\n  b.mp4  \n")
+        assert read_input_list(lst) == [Path("a.mp4"), Path("b.mp4")]
+
+
+class TestTranscribeBatch:
+    def _args(self, inputs, **overrides):
+        args = dict(
+            input=[str(p) for p in inputs], from_list=None, output=None, model="fast",
+            language=None, chunk_size=None, force=False, no_daemon=True, workers=1, resume=False, batch_size=None,
+            no_cache=True,
+        )
+        args.update(overrides)
+        return argparse.Namespace(**args)
+
+    def test_one_model_load_and_failures_do_not_abort(self, tmp_path):
+        good = [tmp_path / "a.mp4", tmp_path / "c.mp4"]
+        bad = tmp_path / "b.mp4"
+        for p in [*good, bad]:
+            p.touch()
+        missing = tmp_path / "missing.mp4"
+        streamed = []
+
+        def fake_transcribe(audio, *args, model=None, **kwargs):
+            if audio.path == bad:
+                raise RuntimeError("decoder exploded")
+            return [{"start": 0.0, "end": 1.0, "text": "Hi."}]
+
+        def fake_stream(path, start=0.0, **kwargs):
+            streamed.append(path)
+            return Mock(path=path)
+
+        with patch("vcut.cli.check_ffmpeg"), \
+                patch("vcut.cli.load_model") as load_model, \
+                patch("vcut.cli.stream_audio", side_effect=fake_stream), \
+                patch("vcut.cli.probe_duration", return_value=1800.0), \
+                patch("vcut.cli.transcribe", side_effect=fake_transcribe):
+            with pytest.raises(SystemExit) as exc:
+                cmd_transcribe(self._args([good[0], bad, missing, good[1]]))
+
+        assert exc.value.code == 1
+        assert load_model.call_count == 1
+        assert streamed == [good[0], bad, good[1]]
+        assert (tmp_path / "a.txt").read_text().startswith("[00:00:00.000 -> 00:00:01.000]")
+        assert (tmp_path / "c.txt").exists()
+        assert not (tmp_path / "b.txt").exists()
+        assert not (tmp_path / "b.txt.partial").exists()
+
+    def test_interrupt_keeps_current_progress_and_drops_prefetch(self, tmp_path):
+        first, second = tmp_path / "a.mp4", tmp_path / "b.mp4"
+        first.touch()
+        second.touch()
+        streams = []
+
+        def fake_stream(path, start=0.0, **kwargs):
+            streams.append(Mock(path=path))
+            return streams[-1]
+
+        with patch("vcut.cli.check_ffmpeg"), \
+                patch("vcut.cli.load_model"), \
+                patch("vcut.cli.stream_audio", side_effect=fake_stream), \
+                patch("vcut.cli.probe_duration", return_value=1800.0), \
+                patch("vcut.cli.transcribe", side_effect=KeyboardInterrupt):
+            with pytest.raises(SystemExit) as exc:
+                cmd_transcribe(self._args([first, second]))
+
+        assert exc.value.code == 130
+        assert [s.path for s in streams] == [first, second]
+        assert all(s.close.called for s in streams)
+        assert (tmp_path / "a.txt.partial").exists()
+        assert not (tmp_path / "b.txt.partial").exists()
+
+    def test_output_rejected_for_multiple_inputs(self, tmp_path):
+        with pytest.raises(SystemExit):
+            cmd_transcribe(self._args([tmp_path / "a.mp4", tmp_path / "b.mp4"], output="x.txt"))
+
+
+class TestRechunk:
+    def test_uses_the_sidecar_of_the_given_transcript(self, tmp_path):
+        columns = WordColumns()
+        for start, word in [(0.0, " One"), (1.0, " two."), (2.0, " Three")]:
+            columns.append(start, start + 0.5, word)
+        columns.save(tmp_path / "talk.words.npz")
+        transcript = tmp_path / "talk.txt"
+        transcript.write_text("edited\n")
+
+        args = build_parser().parse_args(
+            ["rechunk", str(tmp_path / "v.mp4"), "-c", "1.0", "-t", str(transcript), "--force"],
+        )
+        cmd_rechunk(args)
+
+        assert "One two." in transcript.read_text()
+        assert not (tmp_path / "v.txt").exists()
+
+    def test_empty_sidecar(self, tmp_path):
+        WordColumns().save(tmp_path / "v.words.npz")
+        args = build_parser().parse_args(["rechunk", str(tmp_path / "v.mp4"), "-c", "1.0", "--force"])
+        cmd_rechunk(args)
+        assert (tmp_path / "v.txt").read_text() == "\n"
+
+
+class TestOpenJournal:
+    @pytest.mark.parametrize("resume", [False, True])
+    def test_empty_journal_starts_over(self, tmp_path, resume):
+        out = tmp_path / "v.txt"
+        (tmp_path / "v.txt.partial").write_text("")
+        args = argparse.Namespace(
+            model="tiny.en", language=None, chunk_size=3.0, batch_size=None, resume=resume, force=False,
+        )
+        journal = open_journal(tmp_path / "v.mp4", out, args)
+        journal.close()
+        assert journal.checkpoint == 0.0
+        assert journal.settings["model"] == "tiny.en"
@@ -3,7 +3,7 @@ from unittest.mock import patch
 
 import pytest
 
-from vcut.editor import parse_edited_file, parse_timestamp, get_editor
+from vcut.editor import IntervalSet, parse_edited_file, parse_timestamp, get_editor
 
 
 class TestParseTimestamp:
@@ -90,3 +90,77 @@ class TestGetEditor:
         env.pop("EDITOR", None)
         with patch.dict(os.environ, env, clear=True):
             assert get_editor() == "vim"
+
+
+class TestCutListSources:
+    def test_sources_relative_to_file(self, tmp_path):
+        (tmp_path / "ep2.mp4").touch()
+        f = tmp_path / "cut.txt"
+        f.write_text(
+            "[00:00:01.000 -> 00:00:02.000] | main\n"
+            "[00:00:01.500 -> 00:00:03.000] ep2.mp4 | other, not merged with main\n"
+            "[00:00:02.500 -> 00:00:04.000] ep2.mp4 | overlaps, merged\n"
+            "[00:00:00.000 -> 00:00:01.000] | back to main, earlier is fine\n"
+        )
+        assert parse_edited_file(f) == [
+            (1.0, 2.0),
+            (1.5, 4.0, tmp_path / "ep2.mp4"),
+            (0.0, 1.0),
+        ]
+
+    def test_missing_source(self, tmp_path):
+        f = tmp_path / "cut.txt"
+        f.write_text("[00:00:01.000 -> 00:00:02.000] gone.mp4 | text\n")
+        with pytest.raises(ValueError, match="Source not found .*line 1"):
+            parse_edited_file(f)
+
+    def test_text_without_pipe_is_not_a_source(self, tmp_path):
+        f = tmp_path / "cut.txt"
+        f.write_text("[00:00:01.000 -> 00:00:02.000] just text\n")
+        assert parse_edited_file(f) == [(1.0, 2.0)]
+
+    def test_pipe_in_spoken_text_is_not_a_source(self, tmp_path):
+        f = tmp_path / "cut.txt"
+        f.write_text("[00:00:01.000 -> 00:00:02.000] I said | then\n")
+        assert parse_edited_file(f) == [(1.0, 2.0)]
+
+
+class TestBulkParser:
+    def test_returns_arrays(self, tmp_path):
+        f = tmp_path / "t.txt"
+        f.write_text("[00:00:01.500 -> 00:00:02.000] | a\n[00:00:03.000 -> 00:00:04.250] | b\n")
+        segments = parse_edited_file(f)
+        assert isinstance(segments, IntervalSet)
+        assert segments.starts.tolist() == [1.5, 3.0]
+        assert segments.ends.tolist() == [2.0, 4.25]
+        assert segments[1] == (3.0, 4.25)
+
+    def test_canonical_and_free_form_lines_across_blocks(self, tmp_path):
+        f = tmp_path / "t.txt"
+        f.write_bytes(
+            b"[00:00:00.000 -> 00:00:01.000] | canonical\r\n"
+            b"   [00:00:01.000->00:00:02.000]   | loose spacing\n"
+            b"# [00:00:02.000 -> 00:00:03.000] | cut\n"
+            b"\n"
+            b"[00:00:02.500 -> 00:00:03.500]|tight\n"
+            b"[00:00:03.000 -> 00:00:05.000] | overlaps, merged"
+        )
+        with patch("vcut.editor.READ_BLOCK_BYTES", 16):
+            assert parse_edited_file(f) == [(0.0, 1.0), (1.0, 2.0), (2.5, 5.0)]
+
+    def test_first_error_in_file_order(self, tmp_path):
+        f = tmp_path / "t.txt"
+        f.write_text(
+            "[00:00:05.000 -> 00:00:09.000] | a\n"
+            "[00:00:04.000 -> 00:00:06.000] | out of order\n"
+            "[00:00:07.000 -> 00:00:06.000] | backwards\n"
+            "[00:61:00.000 -> 00:62:00.000] | invalid\n"
+        )
+        with pytest.raises(ValueError, match=r"Out-of-order segment in t.txt \(line 2\)"):
+            parse_edited_file(f)
+
+    def test_invalid_timestamp_line_number(self, tmp_path):
+        f = tmp_path / "t.txt"
+        f.write_text("[00:00:01.000 -> 00:00:02.000] | ok\n[00:00:03.000 -> 00:60:00.000] | bad\n")
+        with pytest.raises(ValueError, match=r"line 2.*minutes must be < 60"):
+            parse_edited_file(f)
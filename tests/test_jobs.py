@@ -0,0 +1,118 @@
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+import pytest
+
+from vcut import jobs
+from vcut.jobs import (
+    Job, Worker, add_job, claim_job, finish_job, kind_stats, list_jobs, open_queue, recover_stale, release_job,
+)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = open_queue(tmp_path / "queue.sqlite3")
+    yield conn
+    conn.close()
+
+
+class TestQueue:
+    def test_claims_by_priority_then_age(self, conn, tmp_path):
+        first = add_job(conn, "render", ["a.mp4"], tmp_path)
+        urgent = add_job(conn, "render", ["b.mp4"], tmp_path, priority=5)
+        add_job(conn, "transcribe", ["c.mp4"], tmp_path, priority=9)
+
+        assert claim_job(conn, "render", "w:1").id == urgent
+        job = claim_job(conn, "render", "w:1")
+        assert (job.id, job.args, job.cwd, job.attempts) == (first, ["a.mp4"], str(tmp_path), 1)
+        assert claim_job(conn, "render", "w:1") is None
+
+    def test_unknown_kind(self, conn, tmp_path):
+        with pytest.raises(ValueError):
+            add_job(conn, "edit", ["a.mp4"], tmp_path)
+
+    def test_failed_job_is_retried_after_a_delay(self, conn, tmp_path):
+        add_job(conn, "render", ["a.mp4"], tmp_path, retries=1)
+        job = claim_job(conn, "render", "w:1")
+        assert finish_job(conn, job, 1, "boom") == "queued"
+        assert claim_job(conn, "render", "w:1") is None  # still waiting out the delay
+
+        with patch("vcut.jobs.time.time", return_value=time.time() + jobs.RETRY_DELAY_SECONDS + 1):
+            job = claim_job(conn, "render", "w:1")
+        assert job.attempts == 2
+        assert finish_job(conn, job, 1, "boom again") == "failed"
+        assert list_jobs(conn)[0]["error"] == "boom again"
+
+    def test_release_does_not_use_an_attempt(self, conn, tmp_path):
+        add_job(conn, "render", ["a.mp4"], tmp_path)
+        release_job(conn, claim_job(conn, "render", "w:1"))
+        job = claim_job(conn, "render", "w:1")
+        assert job.attempts == 1
+        assert finish_job(conn, job, 0) == "done"
+
+    def test_recovers_jobs_of_dead_workers_on_this_host(self, conn, tmp_path):
+        add_job(conn, "render", ["a.mp4"], tmp_path, retries=1)
+        add_job(conn, "render", ["b.mp4"], tmp_path)
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        host = jobs.socket.gethostname()
+        claim_job(conn, "render", f"{host}:{dead.pid}")
+        claim_job(conn, "render", jobs.worker_name())
+
+        assert recover_stale(conn) == 1
+        states = {job["args"][0]: job["state"] for job in list_jobs(conn)}
+        assert states == {"a.mp4": "queued", "b.mp4": "running"}
+
+    def test_metrics(self, conn, tmp_path):
+        add_job(conn, "render", ["a.mp4"], tmp_path)
+        add_job(conn, "render", ["b.mp4"], tmp_path)
+        finish_job(conn, claim_job(conn, "render", "w:1"), 0, cpu_seconds=1.5, max_rss=1024)
+
+        done, queued = list_jobs(conn)[1], list_jobs(conn)[0]
+        assert (done["state"], done["cpu_seconds"], done["max_rss"]) == ("done", 1.5, 1024)
+        assert done["ran"] is not None and queued["ran"] is None
+        stats = kind_stats(conn)["render"]
+        assert (stats["done"], stats["queued"]) == (1, 1)
+        assert stats["mean_run"] >= 0
+
+
+def fake_command(job: Job) -> list[str]:
+    # Sleeps for args[0] seconds and exits with args[1]
+    return [sys.executable, "-c", f"import time, sys; time.sleep({job.args[0]}); sys.exit({job.args[1]})"]
+
+
+class TestWorker:
+    def test_runs_jobs_within_slots_and_records_results(self, tmp_path):
+        path = tmp_path / "queue.sqlite3"
+        conn = open_queue(path)
+        for _ in range(3):
+            add_job(conn, "render", ["0.2", "0"], tmp_path)
+        add_job(conn, "transcribe", ["0", "3"], tmp_path)
+
+        peak = []
+        real_fill = Worker.fill
+
+        def fill(worker):
+            real_fill(worker)
+            peak.append(sum(job.kind == "render" for _, job, _, _ in worker.running.values()))
+
+        with patch.object(Job, "command", fake_command), patch.object(Worker, "fill", fill):
+            Worker(path, {"transcribe": 1, "render": 2}, poll=0.01).run(drain=True)
+
+        assert max(peak) == 2
+        states = {job["id"]: job["state"] for job in list_jobs(conn)}
+        assert states == {1: "done", 2: "done", 3: "done", 4: "failed"}
+        assert list_jobs(conn)[0]["error"] == "Exit code 3"
+        assert (tmp_path / "queue-logs" / "1.log").read_text().startswith("--- attempt 1/1")
+        conn.close()
+
+    def test_zero_slots_leave_a_kind_alone(self, tmp_path):
+        path = tmp_path / "queue.sqlite3"
+        conn = open_queue(path)
+        add_job(conn, "transcribe", ["0", "0"], tmp_path)
+        with patch.object(Job, "command", fake_command):
+            Worker(path, {"transcribe": 0, "render": 1}, poll=0.01).run(drain=True)
+        assert list_jobs(conn)[0]["state"] == "queued"
+        conn.close()
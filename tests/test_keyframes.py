@@ -0,0 +1,76 @@
+import os
+from unittest.mock import patch
+
+from vcut.keyframes import KeyframeIndex, index_path_for, load_index, read_index, write_index
+
+
+PACKETS = [i * 0.5 for i in range(20)]
+KEYFRAMES = [0.0, 2.0, 4.0, 6.0, 8.0]
+
+
+class TestKeyframeIndex:
+    INDEX = KeyframeIndex(PACKETS, KEYFRAMES)
+
+    def test_prev_keyframe(self):
+        assert self.INDEX.prev_keyframe(3.9) == 2.0
+        assert self.INDEX.prev_keyframe(4.0) == 4.0
+        assert self.INDEX.prev_keyframe(100.0) == 8.0
+
+    def test_next_keyframe(self):
+        assert self.INDEX.next_keyframe(2.1) == 4.0
+        assert self.INDEX.next_keyframe(2.0) == 2.0
+        assert self.INDEX.next_keyframe(8.5) is None
+
+    def test_frames_between(self):
+        assert self.INDEX.frames_between(2.0, 4.0) == 4
+
+    def test_copy_drift(self):
+        assert self.INDEX.copy_drift([(2.0, 3.0), (5.5, 7.0)]) == [0.0, 1.5]
+
+    def test_no_keyframes_leaves_times_alone(self):
+        assert KeyframeIndex([], []).prev_keyframe(3.3) == 3.3
+
+
+class TestSidecar:
+    def _video(self, tmp_path):
+        video = tmp_path / "video.mp4"
+        video.write_bytes(b"not really a video" * 100)
+        return video
+
+    def test_round_trip_is_memory_mapped(self, tmp_path):
+        video = self._video(tmp_path)
+        sidecar = index_path_for(video)
+        write_index(sidecar, video, PACKETS, KEYFRAMES)
+
+        index = read_index(sidecar, video)
+        assert isinstance(index.keyframes, memoryview)
+        assert list(index.packets) == PACKETS
+        assert list(index.keyframes) == KEYFRAMES
+        index.close()
+
+    def test_stale_when_size_changes(self, tmp_path):
+        video = self._video(tmp_path)
+        sidecar = index_path_for(video)
+        write_index(sidecar, video, PACKETS, KEYFRAMES)
+        with video.open("ab") as f:
+            f.write(b"more")
+        assert read_index(sidecar, video) is None
+
+    def test_touched_file_reuses_index_by_content_hash(self, tmp_path):
+        video = self._video(tmp_path)
+        sidecar = index_path_for(video)
+        write_index(sidecar, video, PACKETS, KEYFRAMES)
+        os.utime(video, ns=(0, 0))
+        index = read_index(sidecar, video)
+        assert index is not None
+        index.close()
+
+    def test_load_index_probes_once(self, tmp_path):
+        video = self._video(tmp_path)
+        with patch("vcut.keyframes.probe_packets", return_value=(PACKETS, KEYFRAMES)) as probe:
+            load_index(video)
+            index = load_index(video)
+        assert probe.call_count == 1
+        assert index_path_for(video).name == "video.mp4.vcutidx"
+        assert list(index.keyframes) == KEYFRAMES
+        index.close()
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+from vcut.keyframes import KeyframeIndex
+from vcut.planner import FFMPEG_STARTUP_SECONDS, plan_render, segment_cost
+
+# Keyframes every 2s, 10 packets per second
+INDEX = KeyframeIndex([i / 10 for i in range(600)], [float(t) for t in range(0, 60, 2)])
+
+
+def index_for(source):
+    return INDEX
+
+
+class TestSegmentCost:
+    def test_copy_is_one_run(self):
+        cost, runs = segment_cost(2.5, 10.0, "copy", INDEX)
+        assert runs == 1
+        assert cost == pytest.approx(FFMPEG_STARTUP_SECONDS + 0.01 + 8.0 * 0.002)
+
+    def test_smart_reencodes_edges_only(self):
+        _, runs = segment_cost(2.5, 9.0, "smart", INDEX)
+        assert runs == 3
+        assert segment_cost(2.5, 9.0, "smart", INDEX)[0] < segment_cost(2.5, 9.0, "reencode", INDEX)[0]
+
+
+class TestPlanRender:
+    def test_no_policy_keeps_cut_list(self):
+        segments = [(1.0, 3.0), (3.2, 5.0), (9.0, 9.1)]
+        plan = plan_render(segments, "copy", index_for)
+        assert plan.render_segments() == segments
+        assert plan.added == 0 and plan.dropped == []
+        assert (plan.cost, plan.runs) == (plan.original_cost, plan.original_runs)
+
+    def test_bridges_short_gaps(self):
+        plan = plan_render([(1.0, 3.0), (3.3, 5.0), (9.0, 12.0)], "reencode", index_for, min_gap=0.5)
+        assert plan.render_segments() == [(1.0, 5.0), (9.0, 12.0)]
+        assert plan.added == pytest.approx(0.3)
+        assert plan.runs == 2 and plan.original_runs == 3
+        assert plan.cost < plan.original_cost
+
+    def test_long_gaps_not_worth_encoding_are_kept(self):
+        # Encoding 0.9s of gap costs more than one extra ffmpeg start
+        plan = plan_render([(1.0, 3.0), (3.9, 5.0)], "reencode", index_for, min_gap=1.0)
+        assert plan.render_segments() == [(1.0, 3.0), (3.9, 5.0)]
+
+    def test_copy_measures_gap_from_keyframe(self):
+        # The second cut would start at the 2.0 keyframe anyway: no footage added
+        plan = plan_render([(0.0, 3.0), (3.5, 5.0)], "copy", index_for, min_gap=0.1)
+        assert plan.render_segments() == [(0.0, 5.0)]
+        assert plan.added == 0
+        assert plan.segments[0].notes == ["joined at keyframe"]
+
+    def test_only_same_source_is_bridged(self):
+        other = Path("/videos/b.mp4")
+        segments = [(1.0, 3.0), (3.1, 4.0, other), (4.1, 5.0, other)]
+        plan = plan_render(segments, "reencode", index_for, min_gap=0.5)
+        assert plan.render_segments() == [(1.0, 3.0), (3.1, 5.0, other)]
+
+    def test_smart_pads_to_nearby_keyframes(self):
+        plan = plan_render([(2.2, 7.9)], "smart", index_for, min_gap=0.5)
+        assert plan.render_segments() == [(2.0, 8.0)]
+        assert plan.added == pytest.approx(0.3)
+        assert plan.runs == 1 and plan.original_runs == 3
+
+    def test_drops_short_segments(self):
+        plan = plan_render([(1.0, 3.0), (10.0, 10.2), (20.0, 22.0)], "copy", index_for, min_segment=0.5)
+        assert plan.render_segments() == [(1.0, 3.0), (20.0, 22.0)]
+        assert [(s.start, s.end) for s in plan.dropped] == [(10.0, 10.2)]
+
+    def test_short_segment_bridged_before_drop(self):
+        plan = plan_render([(1.0, 3.0), (3.1, 3.3)], "reencode", index_for, min_gap=0.2, min_segment=0.5)
+        assert plan.render_segments() == [(1.0, 3.3)]
+        assert plan.dropped == []
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            plan_render([(0.0, 1.0)], "fast", index_for)
@@ -0,0 +1,104 @@
+import os
+import threading
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import pytest
+
+from vcut.keyframes import KeyframeIndex
+from vcut.preview import PreviewServer, Timeline, fragments
+
+# Keyframes every 2s, 10 packets per second
+INDEX = KeyframeIndex([i / 10 for i in range(600)], [float(t) for t in range(0, 60, 2)])
+
+
+def write_transcript(path, lines):
+    path.write_text("".join(f"[{start} -> {end}] | text\n" for start, end in lines))
+
+
+class TestFragments:
+    def test_starts_on_keyframe_and_splits_long_cuts(self):
+        assert fragments(1.0, 11.3, INDEX) == [(0.0, 4.0), (4.0, 8.0), (8.0, 11.3)]
+
+    def test_short_cut_is_one_fragment(self):
+        assert fragments(4.5, 7.0, INDEX) == [(4.0, 7.0)]
+
+    def test_without_index(self):
+        assert fragments(1.0, 11.3, None) == [(1.0, 11.3)]
+
+
+class TestTimeline:
+    def _timeline(self, tmp_path):
+        video = tmp_path / "video.mp4"
+        video.touch()
+        transcript = tmp_path / "video.txt"
+        write_transcript(transcript, [("00:00:01.000", "00:00:05.000"), ("00:00:10.000", "00:00:11.000")])
+        return Timeline(video, transcript, lambda source: INDEX), transcript
+
+    def test_playlist(self, tmp_path):
+        timeline, _ = self._timeline(tmp_path)
+        lines = timeline.playlist().splitlines()
+        assert lines[0] == "#EXTM3U"
+        assert lines[-1] == "#EXT-X-ENDLIST"
+        uris = [line for line in lines if line.startswith("fragment/")]
+        assert uris == [
+            "fragment/0/0.000000-4.000000.ts",
+            "fragment/0/4.000000-5.000000.ts",
+            "fragment/0/10.000000-11.000000.ts",
+        ]
+        assert lines.count("#EXT-X-DISCONTINUITY") == 1
+        assert "#EXT-X-TARGETDURATION:4" in lines
+
+    def test_rebuilt_when_transcript_changes(self, tmp_path):
+        timeline, transcript = self._timeline(tmp_path)
+        timeline.playlist()
+        write_transcript(transcript, [("00:00:20.000", "00:00:21.000")])
+        os.utime(transcript, ns=(1, 1))
+        assert "fragment/0/20.000000-21.000000.ts" in timeline.playlist()
+
+    def test_keeps_last_good_playlist_on_parse_error(self, tmp_path):
+        timeline, transcript = self._timeline(tmp_path)
+        before = timeline.playlist()
+        transcript.write_text("[00:00:05.000 -> 00:00:01.000] | backwards\n")
+        os.utime(transcript, ns=(1, 1))
+        assert timeline.playlist() == before
+
+    def test_fragment_remuxes_from_known_sources_only(self, tmp_path):
+        timeline, _ = self._timeline(tmp_path)
+        timeline.playlist()
+        with patch("vcut.preview.subprocess.run") as mock_run:
+            mock_run.return_value.stdout = b"ts"
+            assert timeline.fragment(0, 4.0, 5.0) == b"ts"
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-ss") + 1] == "4.000000"
+        assert cmd[cmd.index("-frames:v") + 1] == "10"
+        assert cmd.index("-t") < cmd.index("-i")
+        with pytest.raises(KeyError):
+            timeline.fragment(1, 0.0, 1.0)
+
+
+class TestPreviewServer:
+    def test_serves_playlist_and_fragments(self, tmp_path):
+        video = tmp_path / "video.mp4"
+        video.touch()
+        transcript = tmp_path / "video.txt"
+        write_transcript(transcript, [("00:00:01.000", "00:00:03.000")])
+        server = PreviewServer(("127.0.0.1", 0), Timeline(video, transcript, lambda source: INDEX))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with urllib.request.urlopen(f"{base}/playlist.m3u8") as response:
+                assert response.headers["Content-Type"] == "application/vnd.apple.mpegurl"
+                assert b"fragment/0/0.000000-3.000000.ts" in response.read()
+            with patch("vcut.preview.subprocess.run") as mock_run:
+                mock_run.return_value.stdout = b"ts"
+                with urllib.request.urlopen(f"{base}/fragment/0/0.000000-3.000000.ts") as response:
+                    assert response.read() == b"ts"
+            for path in ("/fragment/3/0.000000-1.000000.ts", "/etc/passwd"):
+                with pytest.raises(urllib.error.HTTPError) as e:
+                    urllib.request.urlopen(base + path)
+                assert e.value.code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
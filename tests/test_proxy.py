@@ -0,0 +1,56 @@
+from unittest.mock import patch
+
+from vcut.cache import FileCache
+from vcut.proxy import find_proxy, make_proxy, proxy_command
+
+
+def fake_ffmpeg(cmd, **kwargs):
+    with open(cmd[-1], "wb") as f:
+        f.write(b"proxy")
+
+
+class TestProxy:
+    def _video(self, tmp_path, content=b"original video"):
+        video = tmp_path / "video.mp4"
+        video.write_bytes(content)
+        return video
+
+    def test_made_once_and_reused(self, tmp_path):
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "proxies", ".mp4")
+        assert find_proxy(video, cache=cache) is None
+        with patch("vcut.proxy.subprocess.run", side_effect=fake_ffmpeg) as run:
+            first = make_proxy(video, cache=cache)
+            second = make_proxy(video, cache=cache)
+        assert run.call_count == 1
+        assert first == second == find_proxy(video, cache=cache)
+        assert first.read_bytes() == b"proxy"
+        assert [p.name for p in (tmp_path / "proxies").iterdir() if p.is_file()] == []
+
+    def test_keyed_by_content_and_height(self, tmp_path):
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "proxies", ".mp4")
+        with patch("vcut.proxy.subprocess.run", side_effect=fake_ffmpeg):
+            make_proxy(video, cache=cache)
+        assert find_proxy(video, height=360, cache=cache) is None
+        video.write_bytes(b"re-exported video")
+        assert find_proxy(video, cache=cache) is None
+
+    def test_failed_encode_leaves_nothing(self, tmp_path):
+        video, cache = self._video(tmp_path), FileCache(tmp_path / "proxies", ".mp4")
+
+        def failing(cmd, **kwargs):
+            fake_ffmpeg(cmd)
+            raise RuntimeError("ffmpeg failed")
+
+        with patch("vcut.proxy.subprocess.run", side_effect=failing):
+            try:
+                make_proxy(video, cache=cache)
+            except RuntimeError:
+                pass
+        assert cache.stats() == (0, 0)
+        assert list((tmp_path / "proxies").iterdir()) == []
+
+    def test_command_keeps_timeline_and_densifies_keyframes(self, tmp_path):
+        cmd = proxy_command(tmp_path / "in.mov", tmp_path / "out.mp4", height=360)
+        assert "scale=-2:'min(360,ih)'" in cmd
+        assert cmd[cmd.index("-force_key_frames") + 1] == "expr:gte(t,n_forced*0.5)"
+        assert "-ss" not in cmd
@@ -1,6 +1,68 @@
+import subprocess
+import threading
+from contextlib import contextmanager
+from pathlib import Path
 from unittest.mock import patch
 
-from vcut.render import render
+import pytest
+
+from vcut.cache import FileCache
+from vcut.keyframes import KeyframeIndex
+from vcut.render import PRESEEK_SECONDS, RenderCancelled, encoder_args, render, render_single_pass, smart_pieces
+
+
+class FakeProcess:
+    """A finished ffmpeg as returned by subprocess.Popen."""
+
+    def __init__(self, returncode=0):
+        self.returncode = returncode
+        self.killed = False
+
+    def communicate(self, timeout=None):
+        return b"", b""
+
+    def poll(self):
+        return self.returncode
+
+    def kill(self):
+        self.killed = True
+
+
+class HangingProcess(FakeProcess):
+    """An ffmpeg that keeps running until it is killed."""
+
+    def __init__(self):
+        super().__init__(returncode=None)
+
+    def communicate(self, timeout=None):
+        if not self.killed:
+            raise subprocess.TimeoutExpired("ffmpeg", timeout)
+        self.returncode = -9
+        return b"", b""
+
+
+@contextmanager
+def fake_ffmpeg(side_effect=None):
+    """Record every ffmpeg command, run (concat) or Popen (extractions), in order.
+
+    ``side_effect(cmd)`` is called for each; it may return the process a
+    Popen call should hand back.
+    """
+    calls = []
+
+    def run(cmd, **kwargs):
+        calls.append(cmd)
+        if side_effect:
+            side_effect(cmd)
+
+    def popen(cmd, **kwargs):
+        calls.append(cmd)
+        proc = side_effect(cmd) if side_effect else None
+        return proc if proc is not None else FakeProcess()
+
+    with patch("vcut.render.subprocess.run", side_effect=run), \
+            patch("vcut.render.subprocess.Popen", side_effect=popen):
+        yield calls
 
 
 class TestRender:
@@ -10,11 +72,10 @@ class TestRender:
         output = tmp_path / "out.mp4"
         segments = [(1.0, 5.0)]
 
-        with patch("vcut.render.subprocess.run") as mock_run:
+        with fake_ffmpeg() as calls:
             render(input_video, segments, output, tmp_path, reencode=False)
 
-        extract_call = mock_run.call_args_list[0]
-        cmd = extract_call[0][0]
+        cmd = calls[0]
         assert "-c" in cmd and "copy" in cmd
         ss_idx = cmd.index("-ss")
         i_idx = cmd.index("-i")
@@ -26,15 +87,32 @@ class TestRender:
         output = tmp_path / "out.mp4"
         segments = [(1.0, 5.0)]
 
-        with patch("vcut.render.subprocess.run") as mock_run:
+        with fake_ffmpeg() as calls:
             render(input_video, segments, output, tmp_path, reencode=True)
 
-        extract_call = mock_run.call_args_list[0]
-        cmd = extract_call[0][0]
+        cmd = calls[0]
         assert "-c" not in cmd or "copy" not in cmd
         i_idx = cmd.index("-i")
-        ss_idx = cmd.index("-ss")
-        assert i_idx < ss_idx
+        ss_indices = [i for i, arg in enumerate(cmd) if arg == "-ss"]
+        assert len(ss_indices) == 2
+        assert ss_indices[0] < i_idx < ss_indices[1]
+        assert cmd[cmd.index("-t") + 1] == "4.0"
+
+    def test_reencode_coarse_seek_bounded_by_preseek(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.touch()
+        output = tmp_path / "out.mp4"
+        segments = [(3600.0, 3602.0)]
+
+        with fake_ffmpeg() as calls:
+            render(input_video, segments, output, tmp_path, reencode=True)
+
+        cmd = calls[0]
+        ss_indices = [i for i, arg in enumerate(cmd) if arg == "-ss"]
+        coarse = float(cmd[ss_indices[0] + 1])
+        fine = float(cmd[ss_indices[1] + 1])
+        assert coarse == 3600.0 - PRESEEK_SECONDS
+        assert coarse + fine == 3600.0
 
     def test_concat_file_written(self, tmp_path):
         input_video = tmp_path / "video.mp4"
@@ -42,7 +120,7 @@ class TestRender:
         output = tmp_path / "out.mp4"
         segments = [(0.0, 2.0), (3.0, 5.0)]
 
-        with patch("vcut.render.subprocess.run"):
+        with fake_ffmpeg():
             render(input_video, segments, output, tmp_path, reencode=False)
 
         concat = tmp_path / "concat.txt"
@@ -50,3 +128,307 @@ class TestRender:
         lines = concat.read_text().strip().split("\n")
         assert len(lines) == 2
         assert all(line.startswith("file '") for line in lines)
+
+    def test_concat_order_is_deterministic_with_jobs(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.touch()
+        output = tmp_path / "out.mp4"
+        segments = [(float(i), i + 0.5) for i in range(20)]
+
+        with fake_ffmpeg():
+            render(input_video, segments, output, tmp_path, reencode=False, jobs=8)
+
+        lines = (tmp_path / "concat.txt").read_text().strip().split("\n")
+        assert lines == [f"file '{tmp_path / f'seg_{i:04d}.mp4'}'" for i in range(20)]
+
+    def test_first_failure_cancels_and_skips_concat(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.touch()
+        output = tmp_path / "out.mp4"
+        segments = [(float(i), i + 0.5) for i in range(10)]
+
+        def fail_on_third(cmd, **kwargs):
+            if str(tmp_path / "seg_0002.mp4") in cmd:
+                raise subprocess.CalledProcessError(1, cmd)
+
+        with fake_ffmpeg(fail_on_third) as calls:
+            with pytest.raises(subprocess.CalledProcessError):
+                render(input_video, segments, output, tmp_path, reencode=False, jobs=1)
+
+        assert len(calls) == 3
+        assert not (tmp_path / "concat.txt").exists()
+
+    def test_failure_kills_extractions_already_running(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.touch()
+        hanging = HangingProcess()
+
+        def hang_then_fail(cmd):
+            if cmd[-1].endswith("seg_0000.mp4"):
+                (tmp_path / "seg_0000.mp4").write_bytes(b"partial")
+                return hanging
+            return FakeProcess(returncode=1)
+
+        with fake_ffmpeg(hang_then_fail):
+            with pytest.raises(subprocess.CalledProcessError):
+                render(input_video, [(0.0, 1.0), (2.0, 3.0)], tmp_path / "out.mp4", tmp_path,
+                       reencode=False, jobs=2)
+
+        assert hanging.killed
+        assert not (tmp_path / "seg_0000.mp4").exists()
+
+
+class TestSmartPieces:
+    INDEX = KeyframeIndex([i * 0.5 for i in range(20)], [0.0, 2.0, 4.0, 6.0, 8.0])
+
+    def test_copies_whole_gops_and_reencodes_edges(self):
+        pieces = smart_pieces(1.3, 7.5, self.INDEX)
+        assert pieces == [(1.3, 2.0, True), (2.0, 6.0, False), (6.0, 7.5, True)]
+
+    def test_cut_on_keyframes_is_pure_copy(self):
+        assert smart_pieces(2.0, 6.0, self.INDEX) == [(2.0, 6.0, False)]
+
+    def test_no_complete_gop_reencodes_everything(self):
+        assert smart_pieces(2.5, 5.5, self.INDEX) == [(2.5, 5.5, True)]
+
+    def test_past_last_keyframe(self):
+        assert smart_pieces(8.5, 9.5, self.INDEX) == [(8.5, 9.5, True)]
+
+
+class TestEncoderArgs:
+    def test_matches_source_parameters(self):
+        streams = {
+            "video": {
+                "codec_name": "h264", "profile": "High", "pix_fmt": "yuv420p",
+                "r_frame_rate": "25/1", "time_base": "1/12800",
+            },
+            "audio": {"codec_name": "aac", "sample_rate": "44100", "channels": 2},
+        }
+        args = encoder_args(streams)
+        assert args[args.index("-c:v") + 1] == "libx264"
+        assert args[args.index("-pix_fmt") + 1] == "yuv420p"
+        assert args[args.index("-r") + 1] == "25/1"
+        assert args[args.index("-profile:v") + 1] == "high"
+        assert args[args.index("-video_track_timescale") + 1] == "12800"
+        assert args[args.index("-c:a") + 1] == "aac"
+        assert args[args.index("-ar") + 1] == "44100"
+        assert args[args.index("-ac") + 1] == "2"
+
+    def test_rejects_unknown_codec(self):
+        with pytest.raises(ValueError, match="does not support video codec"):
+            encoder_args({"video": {"codec_name": "prores"}})
+
+
+class TestSmartRender:
+    def test_pieces_in_concat_order(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.touch()
+        output = tmp_path / "out.mp4"
+        index = KeyframeIndex([i * 0.5 for i in range(20)], [0.0, 2.0, 4.0, 6.0, 8.0])
+        streams = {"video": {"codec_name": "h264"}}
+
+        with patch("vcut.render.load_index", return_value=index), \
+                patch("vcut.render.probe_streams", return_value=streams), \
+                fake_ffmpeg() as calls:
+            render(input_video, [(1.0, 7.0)], output, tmp_path, reencode=False, smart=True)
+
+        cmds = calls[:-1]
+        assert len(cmds) == 3
+        by_output = {cmd[-1]: cmd for cmd in cmds}
+        head = by_output[str(tmp_path / "seg_0000.mp4")]
+        copy = by_output[str(tmp_path / "seg_0001.mp4")]
+        tail = by_output[str(tmp_path / "seg_0002.mp4")]
+        assert "libx264" in head and "libx264" in tail
+        assert head[head.index("-ss") + 1] == "0.0"
+        assert "copy" in copy
+        assert copy[copy.index("-frames:v") + 1] == "8"
+        assert head[head.index("-frames:v") + 1] == "2"
+        assert tail[tail.index("-frames:v") + 1] == "2"
+        assert not any("-avoid_negative_ts" in cmd for cmd in cmds)
+        lines = (tmp_path / "concat.txt").read_text().strip().split("\n")
+        assert len(lines) == 3
+
+
+class TestIndexedRender:
+    INDEX = KeyframeIndex([i * 0.5 for i in range(20)], [0.0, 2.0, 4.0, 6.0, 8.0])
+
+    def test_stream_copy_starts_on_keyframe_with_exact_frames(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.touch()
+
+        with fake_ffmpeg() as calls:
+            render(input_video, [(3.0, 5.0)], tmp_path / "out.mp4", tmp_path,
+                   reencode=False, index=self.INDEX)
+
+        cmd = calls[0]
+        assert cmd[cmd.index("-ss") + 1] == "2.0"
+        assert cmd[cmd.index("-t") + 1] == "3.0"
+        assert cmd[cmd.index("-frames:v") + 1] == "6"
+
+    def test_reencode_seeks_to_previous_keyframe(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.touch()
+
+        with fake_ffmpeg() as calls:
+            render(input_video, [(5.5, 7.0)], tmp_path / "out.mp4", tmp_path,
+                   reencode=True, index=self.INDEX)
+
+        cmd = calls[0]
+        ss_indices = [i for i, arg in enumerate(cmd) if arg == "-ss"]
+        assert cmd[ss_indices[0] + 1] == "4.0"
+        assert cmd[ss_indices[1] + 1] == "1.5"
+
+
+class TestCachedRender:
+    def _fake_ffmpeg(self, cmd, **kwargs):
+        Path(cmd[-1]).parent.mkdir(exist_ok=True)
+        Path(cmd[-1]).write_bytes(b"segment")
+
+    def test_rerender_only_extracts_changed_segments(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.write_bytes(b"source")
+        cache = FileCache(tmp_path / "cache", ".mp4")
+
+        with fake_ffmpeg(self._fake_ffmpeg) as calls:
+            render(input_video, [(0.0, 2.0), (3.0, 5.0), (6.0, 8.0)], tmp_path / "a.mp4",
+                   tmp_path / "t1", reencode=False, cache=cache)
+        assert len(calls) == 4
+
+        with fake_ffmpeg(self._fake_ffmpeg) as calls:
+            render(input_video, [(0.0, 2.0), (6.0, 8.0), (9.0, 10.0)], tmp_path / "b.mp4",
+                   tmp_path / "t2", reencode=False, cache=cache)
+        assert len(calls) == 2  # the new segment plus the final concat
+
+        lines = (tmp_path / "t2" / "concat.txt").read_text().strip().split("\n")
+        assert len(lines) == 3
+        assert str(tmp_path / "cache") in lines[0]
+        assert str(tmp_path / "cache") in lines[2]
+
+    def test_mode_is_part_of_the_key(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.write_bytes(b"source")
+        cache = FileCache(tmp_path / "cache", ".mp4")
+
+        with fake_ffmpeg(self._fake_ffmpeg):
+            render(input_video, [(0.0, 2.0)], tmp_path / "a.mp4", tmp_path / "t1",
+                   reencode=False, cache=cache)
+        with fake_ffmpeg(self._fake_ffmpeg) as calls:
+            render(input_video, [(0.0, 2.0)], tmp_path / "b.mp4", tmp_path / "t2",
+                   reencode=True, cache=cache)
+        assert len(calls) == 2
+
+    def test_cancel_caches_finished_segments_and_skips_concat(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.write_bytes(b"source")
+        cache = FileCache(tmp_path / "cache", ".mp4")
+        cancel = threading.Event()
+
+        def cancel_after_second(cmd, **kwargs):
+            self._fake_ffmpeg(cmd)
+            if cmd[-1].endswith("seg_0001.mp4"):
+                cancel.set()
+
+        segments = [(float(i), i + 0.5) for i in range(5)]
+        with fake_ffmpeg(cancel_after_second) as calls:
+            with pytest.raises(RenderCancelled):
+                render(input_video, segments, tmp_path / "a.mp4", tmp_path / "t1",
+                       reencode=False, jobs=1, cache=cache, cancel=cancel)
+        assert len(calls) == 2
+        assert not (tmp_path / "t1" / "concat.txt").exists()
+
+        with fake_ffmpeg(self._fake_ffmpeg) as calls:
+            render(input_video, segments, tmp_path / "a.mp4", tmp_path / "t2", reencode=False, cache=cache)
+        assert len(calls) == 4  # three remaining segments plus the concat
+
+    def test_cancel_kills_the_running_extraction(self, tmp_path):
+        input_video = tmp_path / "video.mp4"
+        input_video.write_bytes(b"source")
+        cache = FileCache(tmp_path / "cache", ".mp4")
+        cancel = threading.Event()
+        hanging = HangingProcess()
+
+        def start_then_cancel(cmd):
+            self._fake_ffmpeg(cmd)
+            cancel.set()
+            return hanging
+
+        with fake_ffmpeg(start_then_cancel) as calls:
+            with pytest.raises(RenderCancelled):
+                render(input_video, [(0.0, 1.0), (2.0, 3.0)], tmp_path / "a.mp4", tmp_path / "t1",
+                       reencode=True, jobs=1, cache=cache, cancel=cancel)
+
+        assert len(calls) == 1
+        assert hanging.killed
+        assert not (tmp_path / "t1" / "seg_0000.mp4").exists()
+        assert cache.stats() == (0, 0)
+
+
+class TestMultiSourceRender:
+    STREAMS = {
+        "video": {"codec_name": "h264", "width": 1280, "height": 720, "pix_fmt": "yuv420p", "r_frame_rate": "25/1"},
+        "audio": {"codec_name": "aac", "sample_rate": "48000", "channels": 2},
+    }
+
+    def test_copies_matching_sources_and_normalizes_the_rest(self, tmp_path):
+        main, same, other = (tmp_path / name for name in ("main.mp4", "same.mp4", "other.mov"))
+        for p in (main, same, other):
+            p.touch()
+        streams = {
+            main: self.STREAMS,
+            same: self.STREAMS,
+            other: {"video": {**self.STREAMS["video"], "width": 1920, "height": 1080}},
+        }
+
+        with patch("vcut.render.probe_streams", side_effect=streams.get), \
+                fake_ffmpeg() as calls:
+            render(main, [(0.0, 2.0), (1.0, 3.0, same), (4.0, 5.0, other)], tmp_path / "out.mp4", tmp_path,
+                   reencode=False)
+
+        by_output = {cmd[-1]: cmd for cmd in calls[:-1]}
+        first, second, third = (by_output[str(tmp_path / f"seg_000{i}.mp4")] for i in range(3))
+        assert "copy" in first and str(main) in first
+        assert "copy" in second and str(same) in second
+        assert str(other) in third and "copy" not in third
+        assert "scale=1280:720:force_original_aspect_ratio=decrease,pad=1280:720:(ow-iw)/2:(oh-ih)/2,setsar=1" in third
+        assert "anullsrc=r=48000:cl=stereo" in third
+        assert third[third.index("-c:a") + 1] == "aac"
+
+    def test_single_source_is_not_probed(self, tmp_path):
+        main = tmp_path / "main.mp4"
+        main.touch()
+        with patch("vcut.render.probe_streams") as probe, fake_ffmpeg():
+            render(main, [(0.0, 2.0), (3.0, 4.0, main)], tmp_path / "out.mp4", tmp_path, reencode=False)
+        probe.assert_not_called()
+
+
+class TestSinglePassRender:
+    INDEX = KeyframeIndex([i * 0.5 for i in range(40)], [0.0, 2.0, 4.0, 6.0, 8.0])
+
+    def test_one_ffmpeg_run_over_the_source(self, tmp_path):
+        main = tmp_path / "it's.mp4"
+        main.touch()
+        with fake_ffmpeg() as calls:
+            render_single_pass(main, [(1.0, 3.0), (4.5, 6.0)], tmp_path / "out.mp4", tmp_path, self.INDEX)
+
+        assert len(calls) == 1
+        cmd = calls[0]
+        assert cmd[cmd.index("-f") + 1] == "concat" and "copy" in cmd
+        quoted = "'" + str(main.resolve()).replace("'", "'\\''") + "'"
+        assert (tmp_path / "concat.ffconcat").read_text().splitlines() == [
+            "ffconcat version 1.0",
+            f"file {quoted}", "inpoint 0.0", "outpoint 3.0",
+            f"file {quoted}", "inpoint 4.0", "outpoint 6.0",
+        ]
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["concat.ffconcat", "it's.mp4"]
+
+    def test_rejects_sources_with_other_streams(self, tmp_path):
+        main, other = tmp_path / "main.mp4", tmp_path / "other.mov"
+        main.touch()
+        other.touch()
+        streams = {main: TestMultiSourceRender.STREAMS, other: {"video": {"codec_name": "prores"}}}
+        with patch("vcut.render.probe_streams", side_effect=streams.get), \
+                patch("vcut.render.load_index", return_value=self.INDEX), \
+                fake_ffmpeg() as calls:
+            with pytest.raises(ValueError, match="other.mov"):
+                render_single_pass(main, [(0.0, 1.0), (0.0, 1.0, other)], tmp_path / "out.mp4", tmp_path, self.INDEX)
+        assert calls == []
@@ -0,0 +1,104 @@
+from pathlib import Path
+
+import pytest
+
+from vcut.search import (
+    find_transcripts, hits_to_segments, index_transcript, open_index, parse_transcript, prune_missing, search,
+)
+from vcut.words import WordColumns
+
+
+def _library(tmp_path):
+    (tmp_path / "talk.mp4").touch()
+    (tmp_path / "talk.txt").write_text(
+        "# a comment\n"
+        "[00:00:00.000 -> 00:00:03.000] | Hello there, machine learning rocks.\n"
+        "[00:00:03.000 -> 00:00:05.000] | Nothing to see [music]\n"
+    )
+    columns = WordColumns()
+    for i, word in enumerate([" Hello", " there,", " machine", " learning", " rocks."]):
+        columns.append(i * 0.5, i * 0.5 + 0.4, word)
+    columns.save(tmp_path / "talk.words.npz")
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "other.mkv").touch()
+    (tmp_path / "sub" / "other.txt").write_text("[00:01:00.000 -> 00:01:02.000] | Machine-learning again\n")
+    (tmp_path / "notes.txt").write_text("[00:00:00.000 -> 00:00:01.000] | machine learning in notes\n")
+    return tmp_path
+
+
+@pytest.fixture
+def index(tmp_path):
+    lib = _library(tmp_path)
+    conn = open_index(tmp_path / "index.sqlite3")
+    for transcript in find_transcripts([lib]):
+        index_transcript(conn, transcript)
+    yield conn
+    conn.close()
+
+
+class TestParseTranscript:
+    def test_lines_and_text(self, tmp_path):
+        lib = _library(tmp_path)
+        assert parse_transcript(lib / "talk.txt") == [
+            (0.0, 3.0, "Hello there, machine learning rocks."),
+            (3.0, 5.0, "Nothing to see [music]"),
+        ]
+
+
+class TestFindTranscripts:
+    def test_directories_only_take_transcripts_with_videos(self, tmp_path):
+        lib = _library(tmp_path)
+        assert find_transcripts([lib]) == [lib / "sub" / "other.txt", lib / "talk.txt"]
+
+    def test_video_stands_for_its_transcript(self, tmp_path):
+        assert find_transcripts([tmp_path / "a.mp4", tmp_path / "b.txt"]) == [tmp_path / "a.txt", tmp_path / "b.txt"]
+
+
+class TestSearch:
+    def test_phrase_across_videos(self, index, tmp_path):
+        hits = search(index, "machine learning")
+        assert [(Path(h["video"]).name, h["start"], h["end"]) for h in hits] == [
+            ("other.mkv", 60.0, 62.0),
+            ("talk.mp4", 1.0, 1.9),  # narrowed to the words
+        ]
+
+    def test_video_filter_and_limit(self, index, tmp_path):
+        assert len(search(index, "machine", video=tmp_path / "talk.mp4")) == 1
+        assert len(search(index, "machine", limit=1)) == 1
+
+    def test_raw_query(self, index):
+        assert len(search(index, "hello OR nothing", raw=True)) == 2
+        assert search(index, "hello OR nothing") == []
+
+    def test_reindex_only_changed(self, index, tmp_path):
+        talk = tmp_path / "talk.txt"
+        assert not index_transcript(index, talk)
+        talk.write_text("[00:00:00.000 -> 00:00:01.000] | goodbye\n")
+        assert index_transcript(index, talk)
+        assert search(index, "hello") == []
+        assert len(search(index, "goodbye")) == 1
+
+    def test_prune_missing(self, index, tmp_path):
+        (tmp_path / "sub" / "other.txt").unlink()
+        assert prune_missing(index) == 1
+        assert len(search(index, "machine")) == 1
+
+
+class TestHitsToSegments:
+    def test_sorted_and_padded(self):
+        hits = [
+            {"transcript": "/v/a.txt", "video": "/v/a.mp4", "start": 5.0, "end": 6.0, "text": "b"},
+            {"transcript": "/v/a.txt", "video": "/v/a.mp4", "start": 0.1, "end": 1.0, "text": "a"},
+        ]
+        assert hits_to_segments(hits, pad=0.25) == [
+            {"start": 0.0, "end": 1.25, "text": "a"},
+            {"start": 4.75, "end": 6.25, "text": "b"},
+        ]
+
+    def test_sources_relative_to_cut_list(self):
+        hits = [
+            {"transcript": "/v/b.txt", "video": "/v/b.mp4", "start": 1.0, "end": 2.0, "text": "b"},
+            {"transcript": "/v/a.txt", "video": "/v/a.mp4", "start": 3.0, "end": 4.0, "text": "a"},
+        ]
+        segments = hits_to_segments(hits, base_dir=Path("/v"))
+        assert [(s["source"], s["start"]) for s in segments] == [("a.mp4", 3.0), ("b.mp4", 1.0)]
@@ -0,0 +1,180 @@
+import os
+import stat
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from vcut.server import (
+    ModelPool, TranscriptionServer, is_running, remote_transcribe, serve_in_background, socket_path,
+)
+
+
+class FakeModel:
+    def transcribe(self, samples, **kwargs):
+        seg = SimpleNamespace(start=0.0, end=1.0, text=" Hi.", words=None)
+        return iter([seg]), SimpleNamespace(language="en", duration=len(samples) / 16000)
+
+
+@pytest.fixture
+def server(tmp_path):
+    path = tmp_path / "vcut.sock"
+    loads = []
+    pool = ModelPool(max_models=1, loader=lambda name: loads.append(name) or FakeModel())
+    srv = TranscriptionServer(path, pool)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield SimpleNamespace(path=path, loads=loads)
+    srv.shutdown()
+    srv.server_close()
+
+
+class TestModelPool:
+    def test_reuses_and_evicts_least_recently_used(self):
+        loads = []
+        pool = ModelPool(max_models=2, loader=lambda name: loads.append(name) or name)
+        pool.get("a")
+        pool.get("b")
+        pool.get("a")
+        pool.get("c")  # evicts b
+        pool.get("a")
+        assert loads == ["a", "b", "c"]
+        assert pool.names() == ["c", "a"]
+
+    def test_slow_load_does_not_block_other_models(self):
+        started, release = threading.Event(), threading.Event()
+        loads = []
+
+        def loader(name):
+            loads.append(name)
+            if name == "slow":
+                started.set()
+                release.wait(5)
+            return name
+
+        pool = ModelPool(max_models=2, loader=loader)
+        pool.get("fast")
+        threads = [threading.Thread(target=pool.get, args=("slow",)) for _ in range(2)]
+        for t in threads:
+            t.start()
+        started.wait(5)
+
+        assert pool.get("fast")[0] == "fast"
+        assert pool.names() == ["fast"]
+        release.set()
+        for t in threads:
+            t.join()
+        assert loads == ["fast", "slow"]
+        assert pool.names() == ["fast", "slow"]
+
+
+class TestServer:
+    def test_ping(self, server):
+        assert is_running(server.path)
+
+    def test_not_running(self, tmp_path):
+        assert not is_running(tmp_path / "missing.sock")
+        assert remote_transcribe(tmp_path / "v.mp4", "tiny.en", None, None, path=tmp_path / "missing.sock") is None
+
+    def test_transcribe_loads_model_once(self, server, tmp_path):
+        video = tmp_path / "v.mp4"
+        video.touch()
+
+        def windows(path, **kwargs):
+            yield 5.0, np.zeros(16000, dtype=np.float32)
+
+        with patch("vcut.server.stream_audio", side_effect=windows), \
+                patch("vcut.server.probe_duration", return_value=6.0):
+            first = remote_transcribe(video, "tiny.en", None, None, path=server.path)
+            second = remote_transcribe(video, "tiny.en", "en", None, path=server.path)
+
+        assert first == [{"start": 5.0, "end": 6.0, "text": "Hi."}]
+        assert second == first
+        assert server.loads == ["tiny.en"]
+
+    def test_no_cache_is_passed_to_the_decoder(self, server, tmp_path):
+        video = tmp_path / "v.mp4"
+        video.touch()
+        caches = []
+
+        def windows(path, cache=None):
+            caches.append(cache)
+            yield 0.0, np.zeros(16000, dtype=np.float32)
+
+        with patch("vcut.server.stream_audio", side_effect=windows), \
+                patch("vcut.server.probe_duration", return_value=1.0):
+            remote_transcribe(video, "tiny.en", None, None, path=server.path)
+            remote_transcribe(video, "tiny.en", None, None, path=server.path, no_cache=True)
+        assert caches[0] is not None
+        assert caches[1] is None
+
+    def test_failed_model_load_opens_no_audio(self, tmp_path):
+        def loader(name):
+            raise ValueError(f"Invalid model size '{name}'")
+
+        video = tmp_path / "v.mp4"
+        video.touch()
+        srv = TranscriptionServer(tmp_path / "vcut.sock", ModelPool(loader=loader))
+        with srv, patch("vcut.server.stream_audio") as stream:
+            with pytest.raises(ValueError, match="Invalid model"):
+                srv.dispatch({"op": "transcribe", "input": str(video), "model": "nope"})
+        stream.assert_not_called()
+
+    def test_audio_is_closed_when_transcription_fails(self, server, tmp_path):
+        video = tmp_path / "v.mp4"
+        video.touch()
+        closed = []
+
+        def windows(path, **kwargs):
+            try:
+                yield 0.0, np.zeros(16000, dtype=np.float32)
+            finally:
+                closed.append(path)
+
+        def fail(audio, *args, **kwargs):
+            next(audio)
+            raise RuntimeError("boom")
+
+        with patch("vcut.server.stream_audio", side_effect=windows), \
+                patch("vcut.server.probe_duration", return_value=1.0), \
+                patch("vcut.server.transcribe", side_effect=fail):
+            with pytest.raises(RuntimeError, match="boom"):
+                remote_transcribe(video, "tiny.en", None, None, path=server.path)
+        assert closed == [video.resolve()]
+
+    def test_errors_are_raised_on_the_client(self, server, tmp_path):
+        with pytest.raises(RuntimeError, match="File not found"):
+            remote_transcribe(tmp_path / "missing.mp4", "tiny.en", None, None, path=server.path)
+
+    def test_socket_is_private_from_bind(self, tmp_path):
+        path = tmp_path / "vcut.sock"
+        modes = []
+        bind = TranscriptionServer.server_bind
+
+        def server_bind(self):
+            bind(self)
+            modes.append(stat.S_IMODE(os.stat(path).st_mode))
+
+        old_umask = os.umask(0o022)
+        try:
+            with patch.object(TranscriptionServer, "server_bind", server_bind):
+                srv = serve_in_background(path, max_models=1)
+            assert os.umask(0o022) == 0o022
+        finally:
+            os.umask(old_umask)
+        srv.shutdown()
+        srv.server_close()
+        assert modes == [0o600]
+
+
+class TestSocketPath:
+    def test_env_override(self, monkeypatch, tmp_path):
+        monkeypatch.setenv("VCUT_SOCKET", str(tmp_path / "x.sock"))
+        assert socket_path() == tmp_path / "x.sock"
+
+    def test_runtime_dir(self, monkeypatch, tmp_path):
+        monkeypatch.delenv("VCUT_SOCKET", raising=False)
+        monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+        assert socket_path() == tmp_path / "vcut.sock"
@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from vcut import trace
+
+
+@pytest.fixture
+def tracer():
+    tracer = trace.enable()
+    yield tracer
+    trace.disable()
+
+
+class TestTrace:
+    def test_disabled_records_nothing(self):
+        with trace.span("stage", size=1) as info:
+            info["bytes"] = 10
+        assert trace.active() is None
+        assert list(trace.traced(iter([1, 2]), "wait")) == [1, 2]
+
+    def test_span_keeps_args_added_in_block(self, tracer):
+        with trace.span("ffmpeg segment", "render", piece=3) as info:
+            info["bytes"] = 2048
+        (event,) = tracer.events
+        assert event["name"] == "ffmpeg segment" and event["ph"] == "X"
+        assert event["args"] == {"piece": 3, "bytes": 2048}
+        assert event["dur"] >= 0
+
+    def test_span_recorded_on_error(self, tracer):
+        with pytest.raises(RuntimeError):
+            with trace.span("fails"):
+                raise RuntimeError
+        assert [e["name"] for e in tracer.events] == ["fails"]
+
+    def test_traced_times_each_wait(self, tracer):
+        assert list(trace.traced(iter("ab"), "wait for audio")) == ["a", "b"]
+        # One wait per item plus the one that found the end
+        assert len(tracer.events) == 3
+
+    def test_tracks_get_their_own_rows(self, tracer, tmp_path):
+        tracer.add("window in worker", "transcribe", 0.0, 1.0, track="worker slot 0")
+        tracer.add("window in worker", "transcribe", 0.5, 1.5, track="worker slot 1")
+        path = tmp_path / "trace.json"
+        tracer.write(path)
+        events = json.loads(path.read_text())["traceEvents"]
+        names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+        spans = [e for e in events if e["ph"] == "X"]
+        assert [names[e["tid"]] for e in spans] == ["worker slot 0", "worker slot 1"]
+
+    def test_summary(self, tracer):
+        tracer.add("seg", "render", 0.0, 1.0, {"bytes": 100})
+        tracer.add("seg", "render", 1.0, 4.0, {"bytes": 50})
+        tracer.add("concat", "render", 4.0, 4.5)
+        seg, concat = tracer.summary()
+        assert (seg["calls"], seg["total"], seg["mean"], seg["max"], seg["bytes"]) == (2, 4.0, 2.0, 3.0, 150)
+        assert concat["bytes"] is None
+
+    def test_ffmpeg_stats(self, tmp_path):
+        out = tmp_path / "seg.mp4"
+        out.write_bytes(b"x" * 10)
+        stderr = b"frame=  10 fps=0.0 q=-1.0 size=0kB speed=12.5x\rframe=  20 fps=0.0 size=1kB speed=1.52e+03x\n"
+        assert trace.ffmpeg_stats(stderr, out) == {"bytes": 10, "speed": 1520.0}
+        assert trace.ffmpeg_stats(b"speed=N/A", tmp_path / "missing.mp4") == {"bytes": None}
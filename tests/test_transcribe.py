@@ -1,6 +1,14 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from types import SimpleNamespace
+from unittest.mock import patch
 
-from vcut.transcribe import format_timestamp, segments_to_text, merge_words_into_chunks
+import numpy as np
+import pytest
+
+from vcut.transcribe import (
+    Journal, format_timestamp, segments_to_text, merge_words_into_chunks, transcribe, transcribe_parallel,
+)
 
 
 class TestFormatTimestamp:
@@ -27,6 +35,9 @@ class TestSegmentsToText:
         result = segments_to_text(segs)
         assert result == "[00:00:00.000 -> 00:00:02.500] | Hello world.\n"
 
+    def test_empty(self):
+        assert segments_to_text([]) == "\n"
+
     def test_multiple_segments(self):
         segs = [
             {"start": 0.0, "end": 2.5, "text": "First."},
@@ -37,6 +48,12 @@ class TestSegmentsToText:
         assert lines[0].startswith("[00:00:00.000 -> 00:00:02.500]")
         assert lines[1].startswith("[00:00:02.500 -> 00:00:05.000]")
 
+    def test_matches_format_timestamp(self):
+        times = [0.0005, 0.0015, 59.9999, 3599.9996, 86399.999, 360000.25]
+        segs = [{"start": t, "end": t + 1, "text": "x"} for t in times]
+        expected = "".join(f"[{format_timestamp(t)} -> {format_timestamp(t + 1)}] | x\n" for t in times)
+        assert segments_to_text(segs) == expected
+
 
 class TestMergeWordsIntoChunks:
     def _make_word(self, start, end, word):
@@ -78,3 +95,151 @@ class TestMergeWordsIntoChunks:
         assert len(result) == 1
         assert result[0]["start"] == 0.0
         assert result[0]["end"] == 2.0
+
+
+class FakeWhisperModel:
+    """Returns one segment per window, two words long, at fixed window-relative times."""
+
+    def __init__(self, model_name, compute_type, cpu_threads=0):
+        self.calls = []
+
+    def transcribe(self, samples, **kwargs):
+        self.calls.append(kwargs.copy())
+        words = [
+            SimpleNamespace(start=0.5, end=1.0, word=" Hello"),
+            SimpleNamespace(start=1.0, end=1.5, word=" there"),
+        ]
+        seg = SimpleNamespace(start=0.5, end=1.5, text=" Hello there", words=words)
+        info = SimpleNamespace(language="en", duration=len(samples) / 16000)
+        return iter([seg]), info
+
+
+class TestTranscribe:
+    def _run(self, **kwargs):
+        windows = [(0.0, np.zeros(16000 * 10, dtype=np.float32)), (10.0, np.zeros(16000 * 5, dtype=np.float32))]
+        fake_module = SimpleNamespace(WhisperModel=FakeWhisperModel)
+        with patch.dict(sys.modules, {"faster_whisper": fake_module}):
+            return transcribe(iter(windows), "tiny.en", None, **kwargs)
+
+    def test_segments_shifted_by_window_offset(self):
+        result = self._run()
+        assert result == [
+            {"start": 0.5, "end": 1.5, "text": "Hello there"},
+            {"start": 10.5, "end": 11.5, "text": "Hello there"},
+        ]
+
+    def test_word_chunks_shifted_by_window_offset(self):
+        result = self._run(chunk_size=1.0)
+        assert [(c["start"], c["end"]) for c in result] == [(0.5, 1.5), (10.5, 11.5)]
+
+    def test_batched_pipeline_keeps_word_timestamps(self):
+        class FakePipeline:
+            def __init__(self, model):
+                self.model = model
+
+            def transcribe(self, samples, **kwargs):
+                return self.model.transcribe(samples, **kwargs)
+
+        model = FakeWhisperModel("tiny.en", "int8")
+        windows = [(0.0, np.zeros(16000 * 10, dtype=np.float32)), (10.0, np.zeros(16000 * 5, dtype=np.float32))]
+        fake_module = SimpleNamespace(BatchedInferencePipeline=FakePipeline)
+        with patch.dict(sys.modules, {"faster_whisper": fake_module}):
+            result = transcribe(iter(windows), "tiny.en", None, chunk_size=1.0, model=model, batch_size=8)
+
+        assert model.calls[0] == {"word_timestamps": True, "batch_size": 8}
+        assert model.calls[1]["language"] == "en"
+        assert [(c["start"], c["end"]) for c in result] == [(0.5, 1.5), (10.5, 11.5)]
+
+
+class LanguageEchoModel:
+    """Detects 'de' unless told otherwise; finishes later windows first."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, samples, **kwargs):
+        self.calls.append(kwargs.copy())
+        seg = SimpleNamespace(start=0.0, end=1.0, text=f" {kwargs.get('language', '?')}", words=None)
+        return iter([seg]), SimpleNamespace(language="de", duration=len(samples) / 16000)
+
+
+class TestTranscribeParallel:
+    def _windows(self, n):
+        return iter([(i * 60.0, np.zeros(16000, dtype=np.float32)) for i in range(n)])
+
+    def test_stitches_in_window_order_and_pins_language(self):
+        model = LanguageEchoModel()
+        with patch("vcut.transcribe._worker_model", model), ThreadPoolExecutor(4) as pool:
+            result = transcribe_parallel(self._windows(6), pool, 4, None, show_progress=False)
+
+        assert [seg["start"] for seg in result] == [i * 60.0 for i in range(6)]
+        assert model.calls[0] == {}
+        assert all(call == {"language": "de"} for call in model.calls[1:])
+        assert [seg["text"] for seg in result[1:]] == ["de"] * 5
+
+    def test_forced_language_and_word_chunks(self):
+        class WordModel:
+            def transcribe(self, samples, **kwargs):
+                words = [SimpleNamespace(start=0.0, end=2.0, word=" hi")]
+                seg = SimpleNamespace(start=0.0, end=2.0, text=" hi", words=words)
+                return iter([seg]), SimpleNamespace(language="en", duration=1.0)
+
+        with patch("vcut.transcribe._worker_model", WordModel()), ThreadPoolExecutor(2) as pool:
+            result = transcribe_parallel(self._windows(3), pool, 2, "en", chunk_size=1.0, show_progress=False)
+
+        assert [(c["start"], c["end"]) for c in result] == [(0.0, 2.0), (60.0, 62.0), (120.0, 122.0)]
+
+
+class TestJournal:
+    def _seg(self, start, end, text):
+        words = [SimpleNamespace(start=start, end=end, word=text)]
+        return SimpleNamespace(start=start, end=end, text=text, words=words)
+
+    def test_resume_drops_unfinished_window(self, tmp_path):
+        path = tmp_path / "out.txt.partial"
+        journal = Journal.create(path, {"model": "tiny"})
+        journal.record_window([self._seg(0.5, 1.5, " Hi")], 10.0, "en")
+        journal._write({"start": 10.5, "end": 11.0, "text": " lost", "words": None})
+        journal._file.write('{"start": 12')  # torn line
+        journal.close()
+
+        resumed = Journal.resume(path)
+        resumed.close()
+        assert resumed.settings == {"model": "tiny"}
+        assert resumed.checkpoint == 10.0
+        assert resumed.language == "en"
+        assert [(s.start, s.text, s.words[0].word) for s in resumed.segments] == [(0.5, " Hi", " Hi")]
+        assert len(path.read_text().splitlines()) == 3
+
+    def test_header_is_on_disk_before_the_first_window(self, tmp_path):
+        path = tmp_path / "out.txt.partial"
+        journal = Journal.create(path, {"model": "tiny"})
+        assert Journal.read_settings(path) == {"model": "tiny"}
+        journal.close()
+
+    @pytest.mark.parametrize("content", ["", '{"settings": {"mod'])
+    def test_resume_rejects_missing_header(self, tmp_path, content):
+        path = tmp_path / "out.txt.partial"
+        path.write_text(content)
+        assert Journal.read_settings(path) is None
+        with pytest.raises(ValueError, match="no settings header"):
+            Journal.resume(path)
+
+    def test_transcribe_continues_from_checkpoint(self, tmp_path):
+        path = tmp_path / "out.txt.partial"
+        journal = Journal.create(path, {})
+        journal.record_window([self._seg(0.5, 1.5, " Before")], 10.0, "fr")
+        journal.close()
+        journal = Journal.resume(path)
+
+        model = FakeWhisperModel("tiny", "int8")
+        windows = [(10.0, np.zeros(16000 * 5, dtype=np.float32))]
+        result = transcribe(iter(windows), "tiny", None, model=model, show_progress=False, journal=journal)
+        journal.close()
+
+        assert result == [
+            {"start": 0.5, "end": 1.5, "text": "Before"},
+            {"start": 10.5, "end": 11.5, "text": "Hello there"},
+        ]
+        assert model.calls[0]["language"] == "fr"
+        assert Journal.resume(path).checkpoint == 15.0
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from vcut.watch import Watcher, diff_segments, file_signature
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+class TestFileSignature:
+    def test_missing_file(self, tmp_path):
+        assert file_signature(tmp_path / "nope.txt") is None
+
+    def test_changes_on_rename_over(self, tmp_path):
+        path = tmp_path / "t.txt"
+        path.write_text("one")
+        before = file_signature(path)
+        (tmp_path / "new.txt").write_text("one two")
+        (tmp_path / "new.txt").replace(path)
+        assert file_signature(path) != before
+
+
+class TestDiffSegments:
+    def test_added_and_removed(self):
+        old = [(0.0, 1.0), (2.0, 3.0), (4.0, 5.0)]
+        new = [(0.0, 1.0), (4.0, 5.5), (4.0, 5.0)]
+        assert diff_segments(old, new) == (1, 1)
+
+    def test_duplicates_count(self):
+        assert diff_segments([(0.0, 1.0)], [(0.0, 1.0), (0.0, 1.0)]) == (1, 0)
+
+
+class TestWatcher:
+    def test_burst_of_saves_is_one_call(self, tmp_path):
+        path = tmp_path / "t.txt"
+        path.write_text("")
+        calls = []
+        with Watcher(path, lambda cancel: calls.append(path.read_text()), poll=0.01, debounce=0.2) as watcher:
+            for i in range(5):
+                path.write_text("x" * (i + 1))
+                time.sleep(0.02)
+            wait_for(lambda: calls)
+            time.sleep(0.3)
+        assert calls == ["xxxxx"]
+        assert watcher.calls == 1
+
+    def test_no_call_without_a_save(self, tmp_path):
+        path = tmp_path / "t.txt"
+        path.write_text("")
+        calls = []
+        with Watcher(path, calls.append, poll=0.01, debounce=0.02):
+            time.sleep(0.1)
+        assert calls == []
+
+    def test_newer_save_cancels_running_call(self, tmp_path):
+        path = tmp_path / "t.txt"
+        path.write_text("")
+        started = threading.Event()
+        results = []
+
+        def on_save(cancel):
+            text = path.read_text()
+            started.set()
+            results.append((text, cancel.wait(timeout=0.5 if text == "first" else 0)))
+
+        with Watcher(path, on_save, poll=0.01, debounce=0.02) as watcher:
+            path.write_text("first")
+            wait_for(started.is_set)
+            path.write_text("second!")
+            wait_for(lambda: len(results) == 2)
+        assert results == [("first", True), ("second!", False)]
+        assert watcher.cancelled == 1
@@ -0,0 +1,105 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from vcut.transcribe import merge_words_into_chunks
+from vcut.words import WordChunker, WordColumns, WordTable, chunk_words, iter_words, words_path_for
+
+
+def _segments(words):
+    return [SimpleNamespace(words=[SimpleNamespace(start=s, end=e, word=w) for s, e, w in words])]
+
+
+def _table(words):
+    return WordTable(
+        np.array([w[0] for w in words], dtype=np.float64),
+        np.array([w[1] for w in words], dtype=np.float64),
+        [w[2] for w in words],
+    )
+
+
+def _reference_chunks(words, chunk_size):
+    """The original word-at-a-time loop, kept here as the spec for chunks()."""
+    results, chunk_start, chunk_words = [], None, []
+    for start, end, word in words:
+        if chunk_start is None:
+            chunk_start = start
+        chunk_words.append(word)
+        if end - chunk_start >= chunk_size:
+            results.append({"start": chunk_start, "end": end, "text": " ".join(w.strip() for w in chunk_words)})
+            chunk_words, chunk_start = [], None
+    if chunk_words:
+        results.append({"start": chunk_start, "end": words[-1][1], "text": " ".join(w.strip() for w in chunk_words)})
+    return results
+
+
+class TestWordsPathFor:
+    def test_next_to_transcript(self):
+        assert words_path_for(Path("/tmp/video.txt")) == Path("/tmp/video.words.npz")
+
+
+class TestWordTable:
+    def test_roundtrip(self, tmp_path):
+        words = [(0.0, 0.4, " Hello"), (0.5, 0.9, " wörld"), (1.0, 1.2, " ✂")]
+        path = tmp_path / "v.words.npz"
+        columns = WordColumns()
+        for word in words:
+            columns.append(*word)
+        columns.save(path)
+
+        table = WordTable.load(path)
+        assert table.words == [" Hello", " wörld", " ✂"]
+        assert table.starts.tolist() == [0.0, 0.5, 1.0]
+        assert table.ends.tolist() == [0.4, 0.9, 1.2]
+
+    def test_load_rejects_other_files(self, tmp_path):
+        path = tmp_path / "v.words.npz"
+        np.savez(path, something=np.zeros(3))
+        with pytest.raises(ValueError):
+            WordTable.load(path)
+
+    @pytest.mark.parametrize("chunk_size", [0.01, 0.5, 1.5, 3.0, 100.0])
+    def test_chunks_match_reference(self, chunk_size):
+        rng = np.random.default_rng(7)
+        starts = np.cumsum(rng.uniform(0.05, 0.6, 500))
+        ends = starts + rng.uniform(0.05, 0.8, 500)  # overlapping, non-monotonic ends
+        words = [(float(s), float(e), f" w{i}") for i, (s, e) in enumerate(zip(starts, ends))]
+
+        chunks = _table(words).chunks(chunk_size)
+        assert chunks == _reference_chunks(words, chunk_size)
+        assert merge_words_into_chunks(_segments(words), chunk_size) == chunks
+
+    def test_empty(self):
+        assert _table([]).chunks(1.0) == []
+
+
+class TestStreaming:
+    @pytest.mark.parametrize("chunk_size", [0.01, 1.5, 100.0])
+    def test_chunk_words_matches_table(self, chunk_size):
+        rng = np.random.default_rng(11)
+        starts = np.cumsum(rng.uniform(0.05, 0.6, 300))
+        ends = starts + rng.uniform(0.05, 0.8, 300)
+        words = [(float(s), float(e), f" w{i}") for i, (s, e) in enumerate(zip(starts, ends))]
+
+        streamed = list(chunk_words(iter_words(_segments(words)), chunk_size))
+        assert streamed == _table(words).chunks(chunk_size)
+
+    def test_chunker_flush(self):
+        chunker = WordChunker(10.0)
+        assert chunker.add(0.0, 0.5, " Hello") is None
+        assert chunker.flush() == {"start": 0.0, "end": 0.5, "text": "Hello"}
+        assert chunker.flush() is None
+
+    def test_columns_save_round_trips(self, tmp_path):
+        columns = WordColumns()
+        for word in iter_words(_segments([(0.0, 0.4, " Hello"), (0.5, 0.9, " wörld")])):
+            columns.append(*word)
+        path = tmp_path / "v.words.npz"
+        columns.save(path)
+
+        assert len(columns) == 2
+        table = WordTable.load(path)
+        assert table.words == [" Hello", " wörld"]
+        assert table.ends.tolist() == [0.4, 0.9]